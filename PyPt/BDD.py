@@ -0,0 +1,374 @@
+from array import array
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Tuple
+
+FALSE = 0
+TRUE = 1
+
+# slots of the operation cache, a power of two
+CACHE_SIZE = 1 << 15
+
+# operations on two functions, other operations get codes from BDD.opCode
+OP_OR = 0
+OP_AND = 1
+OP_DIFF = 2
+
+# Values encoded in a list of variables, listed from the root down.
+# The most significant bit is at the root unless lsbFirst, then values of different lengths share the variables of
+# their leading zeros at the bottom, so a large domain costs little more than the values in it need.
+class Domain:
+    vars: List[int]
+    weights: List[int]                              # the bit each variable stands for
+    varSet: FrozenSet[int]
+
+    def __init__(self, vars: List[int], lsbFirst=False):
+        self.vars = vars
+        n = len(vars)
+        self.weights = [1 << i for i in range(n)] if lsbFirst else [1 << (n - 1 - i) for i in range(n)]
+        self.varSet = frozenset(vars)
+
+    def __len__(self):
+        return len(self.vars)
+
+# A reduced ordered binary decision diagram package.
+# A BDD is an int naming a node, nodes are shared through the unique table, so equal functions are equal ints.
+# Variables are ints as well, a smaller variable is closer to the root.
+# Everything is kept in int arrays instead of Python objects: nodes in three arrays, the unique table is an open
+# addressing table of nodes at most half full, and the operation cache is direct mapped, a result overwrites the one in
+# its slot. So a node costs about 20 bytes and the cache a fixed 16 bytes a slot.
+class BDD:
+    vars: array                                     # node -> its variable
+    lows: array
+    highs: array
+    unique: array                                   # hash of (var, low, high) -> node, FALSE for an empty slot
+    cacheOps: array                                 # slot -> operation, -1 for an empty slot
+    cacheF: array
+    cacheG: array
+    cacheResults: array
+    opCodes: Dict[object, int]
+
+    def __init__(self, numVars: int):
+        self.numVars = numVars
+        # terminals are below all variables
+        self.vars = array("i", [numVars, numVars])
+        self.lows = array("i", [FALSE, TRUE])
+        self.highs = array("i", [FALSE, TRUE])
+        self.unique = array("i", bytes(4 * 1024))
+        self.cacheOps = array("i", [-1]) * CACHE_SIZE
+        self.cacheF = array("i", bytes(4 * CACHE_SIZE))
+        self.cacheG = array("i", bytes(4 * CACHE_SIZE))
+        self.cacheResults = array("i", bytes(4 * CACHE_SIZE))
+        self.opCodes = {}
+
+    def __len__(self):
+        return len(self.vars)
+
+    def mk(self, var: int, low: int, high: int) -> int:
+        if(low == high):
+            return low
+        unique, vars, lows, highs = self.unique, self.vars, self.lows, self.highs
+        mask = len(unique) - 1
+        slot = ((var * 0x9E3779B1) ^ (low * 0x85EBCA77) ^ (high * 0xC2B2AE3D)) & mask
+        node = unique[slot]
+        while(node != FALSE):
+            if(highs[node] == high and lows[node] == low and vars[node] == var):
+                return node
+            slot = (slot + 1) & mask
+            node = unique[slot]
+        node = unique[slot] = len(vars)
+        vars.append(var)
+        lows.append(low)
+        highs.append(high)
+        if(node * 2 > mask):
+            self._rehash(len(unique) * 2)
+        return node
+
+    def _rehash(self, size: int):
+        unique = array("i", bytes(4 * size))
+        vars, lows, highs = self.vars, self.lows, self.highs
+        mask = size - 1
+        for node in range(2, len(vars)):
+            slot = ((vars[node] * 0x9E3779B1) ^ (lows[node] * 0x85EBCA77) ^ (highs[node] * 0xC2B2AE3D)) & mask
+            while(unique[slot] != FALSE):
+                slot = (slot + 1) & mask
+            unique[slot] = node
+        self.unique = unique
+
+    def var(self, node: int) -> int:
+        return self.vars[node]
+
+    # the code of an operation that isn't on two functions, like exists over some variables
+    def opCode(self, key) -> int:
+        code = self.opCodes.get(key)
+        if(code is None):
+            code = self.opCodes[key] = OP_DIFF + 1 + len(self.opCodes)
+        return code
+
+    # the slot of the cache for op(f, g), hashed like nodes in mk, which is inlined into the hot operations
+    def _cacheSlot(self, op: int, f: int, g: int) -> int:
+        return ((f * 0x9E3779B1) ^ (g * 0x85EBCA77) ^ (op * 0xC2B2AE3D)) & (CACHE_SIZE - 1)
+
+    def _lookup(self, slot: int, op: int, f: int, g: int) -> int:
+        if(self.cacheOps[slot] == op and self.cacheF[slot] == f and self.cacheG[slot] == g):
+            return self.cacheResults[slot]
+        return -1
+
+    def _store(self, slot: int, op: int, f: int, g: int, result: int) -> int:
+        self.cacheOps[slot] = op
+        self.cacheF[slot] = f
+        self.cacheG[slot] = g
+        self.cacheResults[slot] = result
+        return result
+
+    def _apply(self, op: int, f: int, g: int) -> int:
+        slot = ((f * 0x9E3779B1) ^ (g * 0x85EBCA77) ^ (op * 0xC2B2AE3D)) & (CACHE_SIZE - 1)
+        if(self.cacheF[slot] == f and self.cacheG[slot] == g and self.cacheOps[slot] == op):
+            return self.cacheResults[slot]
+        vars, lows, highs = self.vars, self.lows, self.highs
+        fv, gv = vars[f], vars[g]
+        var = fv if fv < gv else gv
+        if(fv == var):
+            f0, f1 = lows[f], highs[f]
+        else:
+            f0 = f1 = f
+        if(gv == var):
+            g0, g1 = lows[g], highs[g]
+        else:
+            g0 = g1 = g
+        if(op == OP_OR):
+            result = self.mk(var, self.or_(f0, g0), self.or_(f1, g1))
+        elif(op == OP_AND):
+            result = self.mk(var, self.and_(f0, g0), self.and_(f1, g1))
+        else:
+            result = self.mk(var, self.diff(f0, g0), self.diff(f1, g1))
+        return self._store(slot, op, f, g, result)
+
+    def or_(self, f: int, g: int) -> int:
+        if(f == TRUE or g == TRUE):
+            return TRUE
+        if(f == FALSE or f == g):
+            return g
+        if(g == FALSE):
+            return f
+        if(f > g):
+            f, g = g, f
+        return self._apply(OP_OR, f, g)
+
+    def and_(self, f: int, g: int) -> int:
+        if(f == FALSE or g == FALSE):
+            return FALSE
+        if(f == TRUE or f == g):
+            return g
+        if(g == TRUE):
+            return f
+        if(f > g):
+            f, g = g, f
+        return self._apply(OP_AND, f, g)
+
+    # f and not g
+    def diff(self, f: int, g: int) -> int:
+        if(f == FALSE or g == TRUE or f == g):
+            return FALSE
+        if(g == FALSE):
+            return f
+        return self._apply(OP_DIFF, f, g)
+
+    def exists(self, f: int, vars: FrozenSet[int]) -> int:
+        return self._exists(f, vars, self.opCode(("exists", vars)))
+
+    def _exists(self, f: int, vars: FrozenSet[int], op: int) -> int:
+        if(f == FALSE or f == TRUE):
+            return f
+        slot = self._cacheSlot(op, f, 0)
+        result = self._lookup(slot, op, f, 0)
+        if(result >= 0):
+            return result
+        var = self.vars[f]
+        low, high = self._exists(self.lows[f], vars, op), self._exists(self.highs[f], vars, op)
+        if(var in vars):
+            result = self.or_(low, high)
+        else:
+            result = self.mk(var, low, high)
+        return self._store(slot, op, f, 0, result)
+
+    # exists vars. f and g, without building f and g
+    def relprod(self, f: int, g: int, vars: FrozenSet[int]) -> int:
+        return self._relprod(f, g, vars, self.opCode(("relprod", vars)), self.opCode(("exists", vars)))
+
+    def _relprod(self, f: int, g: int, vars: FrozenSet[int], op: int, existsOp: int) -> int:
+        if(f == FALSE or g == FALSE):
+            return FALSE
+        if(f == TRUE):
+            return self._exists(g, vars, existsOp)
+        if(g == TRUE or f == g):
+            return self._exists(f, vars, existsOp)
+        slot = ((f * 0x9E3779B1) ^ (g * 0x85EBCA77) ^ (op * 0xC2B2AE3D)) & (CACHE_SIZE - 1)
+        if(self.cacheF[slot] == f and self.cacheG[slot] == g and self.cacheOps[slot] == op):
+            return self.cacheResults[slot]
+        nodeVars, lows, highs = self.vars, self.lows, self.highs
+        fv, gv = nodeVars[f], nodeVars[g]
+        var = fv if fv < gv else gv
+        if(fv == var):
+            f0, f1 = lows[f], highs[f]
+        else:
+            f0 = f1 = f
+        if(gv == var):
+            g0, g1 = lows[g], highs[g]
+        else:
+            g0 = g1 = g
+        low = self._relprod(f0, g0, vars, op, existsOp)
+        if(var in vars):
+            result = TRUE if low == TRUE else self.or_(low, self._relprod(f1, g1, vars, op, existsOp))
+        else:
+            result = self.mk(var, low, self._relprod(f1, g1, vars, op, existsOp))
+        return self._store(slot, op, f, g, result)
+
+    # rename variables, the mapping must keep the order of the variables in f
+    def replace(self, f: int, mapping: Dict[int, int], mappingKey) -> int:
+        return self._replace(f, mapping, self.opCode(("replace", mappingKey)))
+
+    def _replace(self, f: int, mapping: Dict[int, int], op: int) -> int:
+        if(f == FALSE or f == TRUE):
+            return f
+        slot = self._cacheSlot(op, f, 0)
+        result = self._lookup(slot, op, f, 0)
+        if(result >= 0):
+            return result
+        var = self.vars[f]
+        result = self.mk(mapping.get(var, var), self._replace(self.lows[f], mapping, op), self._replace(self.highs[f], mapping, op))
+        return self._store(slot, op, f, 0, result)
+
+    # the value in the domain, above the function below
+    def encode(self, domain: Domain, value: int, below: int=TRUE) -> int:
+        node = below
+        for var, weight in zip(reversed(domain.vars), reversed(domain.weights)):
+            if(value & weight):
+                node = self.mk(var, FALSE, node)
+            else:
+                node = self.mk(var, node, FALSE)
+        return node
+
+    # values of several domains at once, above the function below. Their variables may interleave.
+    def encodeEach(self, assignment: List[Tuple[Domain, int]], below: int=TRUE) -> int:
+        bits = sorted(((var, value & weight) for domain, value in assignment for var, weight in zip(domain.vars, domain.weights)), reverse=True)
+        node = below
+        for var, bit in bits:
+            node = self.mk(var, FALSE, node) if bit else self.mk(var, node, FALSE)
+        return node
+
+    # Each value of the domain above the function it maps to, the domain must be above all of them.
+    def encodeMap(self, domain: Domain, mapping: Dict[int, int]) -> int:
+        vars, weights = domain.vars, domain.weights
+        def build(pos, values):
+            if(not values):
+                return FALSE
+            if(pos == len(vars)):
+                return mapping[values[0]]
+            weight = weights[pos]
+            low = [value for value in values if not value & weight]
+            high = [value for value in values if value & weight]
+            return self.mk(vars[pos], build(pos + 1, low), build(pos + 1, high))
+        return build(0, list(mapping))
+
+    # the set of values, built bit by bit instead of one value at a time
+    def encodeAll(self, domain: Domain, values: Iterable[int]) -> int:
+        vars, weights = domain.vars, domain.weights
+        def build(pos, values):
+            if(not values):
+                return FALSE
+            if(pos == len(vars)):
+                return TRUE
+            weight = weights[pos]
+            low = [value for value in values if not value & weight]
+            high = [value for value in values if value & weight]
+            return self.mk(vars[pos], build(pos + 1, low), build(pos + 1, high))
+        return build(0, list(values))
+
+    # What is below the value in the domain, the domain must be above the rest of f. No node is made.
+    def follow(self, f: int, domain: Domain, value: int) -> int:
+        vars, lows, highs = self.vars, self.lows, self.highs
+        for var, weight in zip(domain.vars, domain.weights):
+            if(vars[f] == var):
+                f = highs[f] if value & weight else lows[f]
+        return f
+
+    # values of the domain at the top of f, each with what is below it
+    def paths(self, f: int, domain: Domain) -> Iterator[Tuple[int, int]]:
+        vars, weights = domain.vars, domain.weights
+        stack = [(f, 0, 0)]
+        while(stack):
+            node, pos, value = stack.pop()
+            if(node == FALSE):
+                continue
+            if(pos == len(vars)):
+                yield value, node
+                continue
+            if(self.vars[node] == vars[pos]):
+                low, high = self.lows[node], self.highs[node]
+            else:
+                low = high = node
+            stack.append((high, pos + 1, value | weights[pos]))
+            stack.append((low, pos + 1, value))
+
+    # values of a function that only depends on the domain
+    def values(self, f: int, domain: Domain) -> Iterator[int]:
+        return (value for value, _ in self.paths(f, domain))
+
+    # the number of assignments to vars that make f true
+    def count(self, f: int, vars: List[int]) -> int:
+        position = {var: i for i, var in enumerate(vars)}
+        memo = {}
+        def visit(node):
+            # assignments of the variables from the one of node down
+            if(node == FALSE):
+                return 0
+            if(node == TRUE):
+                return 1
+            if(node in memo):
+                return memo[node]
+            pos = position[self.vars[node]]
+            result = 0
+            for child in (self.lows[node], self.highs[node]):
+                skipped = position.get(self.vars[child], len(vars)) - pos - 1
+                result += visit(child) << skipped
+            memo[node] = result
+            return result
+        return visit(f) << (position.get(self.vars[f], len(vars)))
+
+    # Drop the nodes that no root reaches, nodes are renumbered so the roots are returned renumbered too.
+    # Children are always created before their parents, so keeping the order keeps that true.
+    def collect(self, roots: List[int]) -> List[int]:
+        live = self.reached(roots)
+        renumber = {FALSE: FALSE, TRUE: TRUE}
+        vars, lows, highs = self.vars[:2], self.lows[:2], self.highs[:2]
+        for node in sorted(live):
+            renumber[node] = len(vars)
+            vars.append(self.vars[node])
+            lows.append(renumber[self.lows[node]])
+            highs.append(renumber[self.highs[node]])
+        self.vars, self.lows, self.highs = vars, lows, highs
+        size = 1024
+        while(size < len(vars) * 4):
+            size <<= 1
+        self._rehash(size)
+        self.cacheOps = array("i", [-1]) * CACHE_SIZE
+        return [renumber[root] for root in roots]
+
+    def reached(self, roots: List[int]) -> set:
+        seen = set()
+        stack = list(roots)
+        while(stack):
+            node = stack.pop()
+            if(node in seen or node == FALSE or node == TRUE):
+                continue
+            seen.add(node)
+            stack.append(self.lows[node])
+            stack.append(self.highs[node])
+        return seen
+
+    def size(self, f: int) -> int:
+        return len(self.reached([f]))
+
+    # bytes of the nodes, the unique table and the cache
+    def sizeof(self) -> int:
+        return sum(a.buffer_info()[1] * a.itemsize for a in (self.vars, self.lows, self.highs, self.unique,
+            self.cacheOps, self.cacheF, self.cacheG, self.cacheResults))
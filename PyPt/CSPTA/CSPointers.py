@@ -1,24 +1,33 @@
+from ..PTA.Pointers import Pointer, VarPtr
+from ..PTA.SymbolTable import symbols
 
-import typing
+# A variable in a context other than the empty one. In the empty context a variable is its context insensitive pointer,
+# so objects, attribute pointers and the class hiearchy are shared with the context insensitive analysis.
+# Interned by (context id, index of the variable's pointer), use create() instead of the constructor.
+# It is a VarPtr to the solver, point-to sets of variables are kept by the index of their pointer.
+class CSVarPtr(VarPtr):
+    ctx: int
+    var: VarPtr
 
+    def __init__(self, ctx: int, var: VarPtr):
+        self.ctx = ctx
+        self.var = var
+        self.index = symbols.addPointer(self)
 
-if typing.TYPE_CHECKING:
-    from .Context import ContextChain
-from ..IR.IRStmts import Variable
-from ..PTA.Pointers import VarPtr
+    @staticmethod
+    def create(ctx: int, var: VarPtr) -> Pointer:
+        if(ctx == 0):
+            return var
+        key = (ctx, var.index)
+        ptr = symbols.contextVariables.get(key)
+        if(ptr is None):
+            ptr = symbols.contextVariables[key] = CSVarPtr(ctx, var)
+        return ptr
 
+    @property
+    def id(self):
+        return f"{self.var.id}#{self.ctx}"
 
-class CSVarPtr(VarPtr):
-    ctxChain: 'ContextChain'
-    var: Variable
-    def __init__(self, ctxChain: 'ContextChain', var: Variable):
-        self.ctxChain = ctxChain[:var.belongsTo.scopeLevel]
-        self.var = var
-    def __eq__(self, other):
-        return isinstance(other, CSVarPtr) and self.ctxChain == other.ctxChain and self.var == other.var
-    def __hash__(self):
-        return hash((self.ctxChain, self.var))
-    def __str__(self):
-        ctxChain_str = ", ".join(["#".join([str(e) for e in ctx if e]) for ctx in self.ctxChain])
-        
-        return f"({ctxChain_str}){self.var}"
\ No newline at end of file
+    @property
+    def readable_name(self):
+        return f"{self.var.readable_name}#{self.ctx}"
@@ -1,73 +1,39 @@
-from typing import Any, Tuple, Union
-import typing
-
-if typing.TYPE_CHECKING:
-    from . import CSStmt
-    from .CSObjects import CSObject
-
-from ..IR.IRStmts import IRStmt
-
-CTX_LENGTH = 1
-
-# 2-callsite
-class ContextElement:
-    key: IRStmt
-    def __init__(self, key):
-        self.key = key
-    def __eq__(self, other):
-        return isinstance(other, ContextElement) and self.key == other.key
-    def __hash__(self):
-        return hash(self.key)
-    def __str__(self):
-        return f"{self.key.belongsTo.readable_name}-{self.key.belongsTo.stmts.index(self.key)}"
-
-
-# Context consists of ContextElement, the newest are placed at the end, the first which is ctx[0] is the oldest
-# when context is full, the first element is dropped
-Context = Tuple[ContextElement, ...]
-
-# Context Chains consist of contexts, whose numbers are the same as codeblocks' scopeLevel, and therefore are not fixed.
-# The first context is the outermost function's, 
-ContextChain = Tuple[Context, ...]
-
-
-def emptyContextChain():
-    return ()
-
-# callsite
-def selectContext(csCallSite: 'CSStmt', selfObj: 'CSObject') -> Context:
-    # return selectCallSiteContext(csCallSite, selfObj)
-    return selectMixedContext(csCallSite, selfObj)
-
-def selectCallSiteContext(csCallSite: 'CSStmt', selfObj: 'CSObject') -> Context:
-    ctx, callsite = csCallSite
-    if(len(ctx) == 0):
-        tail = [None] * CTX_LENGTH
-        tail = *tail,
-    else:
-        tail = ctx[-1]
-    return *tail[1:], ContextElement(callsite)
-
-def selectObjectContext(csCallSite: 'CSStmt', selfObj: 'CSObject') -> Context:
-    if(selfObj is None):
-        ctx, callsite = csCallSite
-        if(len(ctx) == 0):
-            tail = [None] * CTX_LENGTH
-            tail = *tail,
-        else:
-            tail = ctx[-1]
-        return tail
-    else:
-        ctx, alloc_site = selfObj.ctxChain, selfObj.alloc_site
-        if(len(ctx) == 0):
-            tail = [None] * CTX_LENGTH
-            tail = *tail,
-        else:
-            tail = ctx[-1]
-        return *tail[1:], ContextElement(alloc_site)
-
-def selectMixedContext(csCallSite: 'CSStmt', selfObj: 'CSObject') -> Context:
-    if(selfObj):
-        return selectObjectContext(csCallSite, selfObj)
-    else:
-        return selectCallSiteContext(csCallSite, selfObj)
+from typing import Dict, List, Tuple
+
+from ..IR.IRStmts import IRStmt, getStmt
+
+# A context is the last k call sites, the oldest first, by the uids of the calls.
+Context = Tuple[int, ...]
+
+# Contexts are interned as dense integer ids, 0 is the empty context.
+# Module and class code blocks are always analyzed in the empty one.
+class ContextTable:
+    contexts: List[Context]                         # id -> context
+    ids: Dict[Context, int]                         # context -> id
+    selected: Dict[Tuple[int, int], int]            # (caller's context, uid of the call) -> callee's context
+
+    def __init__(self, k: int=1):
+        self.k = k
+        self.contexts = [()]
+        self.ids = {(): 0}
+        self.selected = {}
+
+    # the context a function called at this call site is analyzed in
+    def select(self, ctx: int, callsite: IRStmt) -> int:
+        key = (ctx, callsite.uid)
+        selected = self.selected.get(key)
+        if(selected is None):
+            context = (self.contexts[ctx] + (callsite.uid, ))[-self.k:] if self.k else ()
+            selected = self.ids.get(context)
+            if(selected is None):
+                selected = self.ids[context] = len(self.contexts)
+                self.contexts.append(context)
+            self.selected[key] = selected
+        return selected
+
+    def readable(self, ctx: int) -> str:
+        sites = [getStmt(uid) for uid in self.contexts[ctx]]
+        return "[" + ", ".join(f"{site.belongsTo.readable_name}-{site.id}" for site in sites) + "]"
+
+    def __len__(self):
+        return len(self.contexts)
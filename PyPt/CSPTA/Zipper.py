@@ -0,0 +1,99 @@
+from collections import defaultdict
+from typing import Dict, List, Set
+
+from ..IR.FunctionCodeBlock import FunctionCodeBlock
+from ..PointerEquivalence import usedVariables
+from ..PTA.Analysis import Analysis as CIAnalysis
+from ..PTA.Objects import ClassMethodObject, FakeObject, FunctionObject, StaticMethodObject
+from ..PTA.Pointers import AttrPtr, Pointer, VarPtr
+from ..PTA.SymbolTable import symbols
+
+# Finds the functions worth analyzing in contexts from a solved context insensitive analysis, after Zipper.
+# Contexts only help a function if what it is called with flows to what it returns, and it is called at more than one site,
+# otherwise the objects of its callers are not merged by it. Flows are looked for in the pointer flow graph of the analysis,
+# through the function's own variables, attributes of objects (wrapping and unwrapping), and calls of functions
+# whose parameters flow to their return themselves.
+class Zipper:
+    analysis: CIAnalysis
+    functions: Dict[FunctionCodeBlock, FunctionObject]
+    callSites: Dict[FunctionCodeBlock, int]
+    passing: Set[FunctionCodeBlock]                     # functions whose parameters flow to their return
+
+    def __init__(self, analysis: CIAnalysis):
+        self.analysis = analysis
+        self.functions = {}
+        self.callSites = defaultdict(int)
+        self.passing = set()
+
+    def select(self) -> Set[FunctionCodeBlock]:
+        self.findFunctions()
+        self.countCallSites()
+        find = self.analysis.pointerFlow.find
+        # parameter of a function -> the functions returning it, parameters in a cycle share their representative
+        returns = defaultdict(set)
+        for func in self.functions.values():
+            for param in self.params(func):
+                returns[find(param)].add(func)
+        # a function passing its parameters makes its callers pass them too, until nothing changes
+        changed = True
+        while(changed):
+            changed = False
+            for codeBlock, func in self.functions.items():
+                if(codeBlock not in self.passing and self.passes(codeBlock, func, returns)):
+                    self.passing.add(codeBlock)
+                    changed = True
+        return {codeBlock for codeBlock in self.passing if self.callSites[codeBlock] > 1}
+
+    def findFunctions(self):
+        for obj in self.analysis.objectPool.pool.values():
+            if(isinstance(obj, FunctionObject) and not isinstance(obj, FakeObject) and obj.codeBlock in self.analysis.reachable):
+                self.functions[obj.codeBlock] = obj
+
+    def countCallSites(self):
+        pointToSet = self.analysis.pointToSet
+        for index, stmtInfos in self.analysis.bindingStmts.bindings["Call"].items():
+            callees = set()
+            for obj in pointToSet.get(symbols.pointer(index)):
+                if(isinstance(obj, (ClassMethodObject, StaticMethodObject))):
+                    obj = obj.func
+                if(isinstance(obj, FunctionObject) and obj.codeBlock in self.functions):
+                    callees.add(obj.codeBlock)
+            for codeBlock in callees:
+                self.callSites[codeBlock] += len(stmtInfos)
+
+    def params(self, func: FunctionObject) -> List[VarPtr]:
+        params = func.posParams + list(func.kwParams.values())
+        return params + [param for param in (func.varParam, func.kwParam) if param]
+
+    # whether the return of the function is reached from its parameters
+    def passes(self, codeBlock: FunctionCodeBlock, func: FunctionObject, returns: Dict[Pointer, Set[FunctionObject]]) -> bool:
+        pointerFlow = self.analysis.pointerFlow
+        local = {VarPtr.create(var).index for stmt in codeBlock.stmts for var in usedVariables(stmt) if var.belongsTo == codeBlock}
+        local |= {param.index for param in self.params(func)}
+        ret = pointerFlow.find(func.retVar)
+        stack = list({pointerFlow.find(param) for param in self.params(func)})
+        visited = set(stack)
+        while(stack):
+            ptr = stack.pop()
+            if(ptr == ret):
+                return True
+            for succ in pointerFlow.successorReps(ptr):
+                # an argument of functions passing it comes back from their returns
+                nexts = [pointerFlow.find(callee.retVar) for callee in returns.get(succ, ())
+                            if callee.codeBlock in self.passing and callee.codeBlock != codeBlock]
+                if(not nexts):
+                    if(not (isinstance(succ, AttrPtr) or any(member.index in local for member in pointerFlow.members(succ)))):
+                        continue
+                    nexts = [succ]
+                for succ in nexts:
+                    if(succ not in visited):
+                        visited.add(succ)
+                        stack.append(succ)
+        return False
+
+    def statistics(self) -> Dict[str, int]:
+        return {
+            "functions": len(self.functions),
+            "passing functions": len(self.passing),
+            "selected functions": sum(1 for codeBlock in self.passing if self.callSites[codeBlock] > 1),
+        }
@@ -0,0 +1,62 @@
+from typing import Callable, Dict, Hashable, Iterable, List, TypeVar
+
+Node = TypeVar("Node", bound=Hashable)
+
+# Tarjan's algorithm without recursion, so that long chains of pointers don't hit the recursion limit.
+# Components are returned in reverse topological order: a component comes before all components that reach it.
+def stronglyConnectedComponents(nodes: Iterable[Node], successors: Callable[[Node], Iterable[Node]]) -> List[List[Node]]:
+    index: Dict[Node, int] = {}
+    lowlink: Dict[Node, int] = {}
+    onStack = set()
+    stack = []
+    components = []
+    counter = 0
+
+    for root in nodes:
+        if(root in index):
+            continue
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        onStack.add(root)
+        callStack = [(root, iter(successors(root)))]
+        while(callStack):
+            node, succs = callStack[-1]
+            for succ in succs:
+                if(succ not in index):
+                    index[succ] = lowlink[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    onStack.add(succ)
+                    callStack.append((succ, iter(successors(succ))))
+                    break
+                elif(succ in onStack and index[succ] < lowlink[node]):
+                    lowlink[node] = index[succ]
+            else:
+                callStack.pop()
+                if(callStack):
+                    parent = callStack[-1][0]
+                    if(lowlink[node] < lowlink[parent]):
+                        lowlink[parent] = lowlink[node]
+                if(lowlink[node] == index[node]):
+                    component = []
+                    while(True):
+                        member = stack.pop()
+                        onStack.discard(member)
+                        component.append(member)
+                        if(member == node):
+                            break
+                    components.append(component)
+    return components
+
+# Rank nodes so that, outside of cycles, every node is ranked before its successors.
+# Nodes in the same strongly connected component share a rank.
+def topologicalRanks(nodes: Iterable[Node], successors: Callable[[Node], Iterable[Node]]) -> Dict[Node, int]:
+    components = stronglyConnectedComponents(nodes, successors)
+    ranks = {}
+    rank = 0
+    for component in reversed(components):
+        for node in component:
+            ranks[node] = rank
+        rank += 1
+    return ranks
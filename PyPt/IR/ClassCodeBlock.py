@@ -4,6 +4,7 @@ from .IRStmts import Variable
 
 
 class ClassCodeBlock(CodeBlock):
+    __slots__ = ("thisClassVariable", "declaredGlobal", "attributes")
     thisClassVariable: Variable                         # refer to $thisClass
     declaredGlobal: Set[str]                            # a list of names declared global
     attributes: Set[str]
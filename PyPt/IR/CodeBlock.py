@@ -8,6 +8,7 @@ if typing.TYPE_CHECKING:
 
 
 class CodeBlock:
+    __slots__ = ("module", "readable_name", "id", "stmts", "enclosing", "scopeLevel", "fake", "newID", "newTmp")
     module: 'ModuleCodeBlock'
     readable_name: str
     id: str
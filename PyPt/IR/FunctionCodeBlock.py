@@ -1,9 +1,14 @@
 from typing import Dict, List, Set
+import typing
 from .CodeBlock import CodeBlock
 from .IRStmts import Variable
 
+if typing.TYPE_CHECKING:
+    from ..IRGeneration.FunctionGenerator import PendingBody
+
 
 class FunctionCodeBlock(CodeBlock):
+    __slots__ = ("localVariables", "posargs", "kwargs", "vararg", "kwarg", "declaredGlobal", "returnVariable", "pendingBody")
     scopeLevel: int                                     # showing how deep a function is defined, startging with 0
     localVariables: Dict[str, Variable]                 # a map from name to variable
 
@@ -17,6 +22,7 @@ class FunctionCodeBlock(CodeBlock):
 
     declaredGlobal: Set[str]                            # a list of names declared global
     returnVariable: Variable
+    pendingBody: 'PendingBody'                          # the body if it is generated when the analysis reaches it
     def __init__(self, name: str, enclosing:'CodeBlock', id: int, fake=False):
         super().__init__(name, enclosing, fake)
         self.id = f"{enclosing.id}.${id}"               # function's id != qualified name, cause there may be functions sharing the same name.
@@ -30,4 +36,5 @@ class FunctionCodeBlock(CodeBlock):
         self.vararg = None
         self.kwarg = None
         self.returnVariable = Variable("$ret", self)
+        self.pendingBody = None
         self.scopeLevel = enclosing.scopeLevel + 1
\ No newline at end of file
@@ -1,6 +1,9 @@
 
+import itertools
+import sys
 from typing import Any, Dict, List, Tuple, Union
 import typing
+import weakref
 
 if typing.TYPE_CHECKING:
     from .CodeBlock import CodeBlock
@@ -9,10 +12,11 @@ if typing.TYPE_CHECKING:
     from .ModuleCodeBlock import ModuleCodeBlock
 
 
+# Names are computed from (name, belongsTo) when they are needed, only the interned name is stored.
 class Variable:
-    id: str                                # include belongsTo's id
+    __slots__ = ("name", "belongsTo", "isTmp")
+    name: str
     belongsTo: 'CodeBlock'                # 'CodeBlock' to which it belongs
-    readable_name: str
     isTmp: bool
 
     def __str__(self):
@@ -22,36 +26,69 @@ class Variable:
         return f"Variable: {self.id}"
 
     def __init__(self, name: str, belongsTo: 'CodeBlock', temp=False):
-        # self.name = name
+        self.name = sys.intern(name)
         self.belongsTo = belongsTo
-        self.readable_name = f"{name}@{belongsTo.readable_name}"
-        self.id = f"{name}@{belongsTo.id}"
         self.isTmp = temp
+
+    @property
+    def id(self) -> str:
+        # include belongsTo's id
+        return f"{self.name}@{self.belongsTo.id}"
+
+    @property
+    def readable_name(self) -> str:
+        return f"{self.name}@{self.belongsTo.readable_name}"
         
     def __eq__(self, other):
-        return isinstance(other, Variable) and self.id == self.id
+        return isinstance(other, Variable) and self.name == other.name and self.belongsTo == other.belongsTo
 
     def __hash__(self):
-        return hash((self.id, self.belongsTo))
+        return hash((self.name, self.belongsTo))
 
 # Every stmt has a id
 # If that stmt is NewFunction, NewClass, then stmt's id is used in codeblock's id.
+# Every stmt also has a uid, unique among all stmts and given when it is created, stmts are compared and hashed by it.
+# uids are not stable: a stmt read from the IR cache or generated by a worker process gets a new one when it is
+# unpickled, so nothing keyed by uids may be saved or compared across processes.
 class IRStmt:
+    __slots__ = ("belongsTo", "srcPos", "id", "uid", "__weakref__")
     belongsTo: 'CodeBlock'                 # 'CodeBlock' to which this IR belongs
     srcPos: Tuple[int]
     id: int
+    uid: int
     def __init__(self, belongsTo: 'CodeBlock', id: int):
         self.belongsTo = belongsTo
         belongsTo.addIR(self)
         self.id = id
+        newUid(self)
 
     def __repr__(self):
-        return f"IRStmt: {str(self)}"
+        return f"IRStmt {self.uid}: {str(self)}"
+
+    def __eq__(self, other):
+        return isinstance(other, IRStmt) and self.uid == other.uid
 
     def __hash__(self):
-        return hash((self.belongsTo, str(self)))
+        return self.uid
+
+    # uids are only unique in one process, a stmt gets a new one when it is unpickled, see LoweredModule
+    def __getstate__(self):
+        return None, {slot: getattr(self, slot) for cls in type(self).__mro__ for slot in getattr(cls, "__slots__", ())
+                if slot not in ("uid", "__weakref__") and hasattr(self, slot)}
+
+# uid -> stmt, only weakly, stmts go away with their code blocks
+allStmts: 'weakref.WeakValueDictionary[int, IRStmt]' = weakref.WeakValueDictionary()
+uids = itertools.count()
+
+def newUid(stmt: IRStmt):
+    stmt.uid = next(uids)
+    allStmts[stmt.uid] = stmt
+
+def getStmt(uid: int) -> IRStmt:
+    return allStmts[uid]
     
 class Assign(IRStmt):
+    __slots__ = ("target", "source")
     target: Variable
     source: Variable
 
@@ -66,6 +103,7 @@ class Assign(IRStmt):
 
 # target.attr = source
 class SetAttr(IRStmt):
+    __slots__ = ("target", "source", "attr")
     target: Variable
     source: Variable
     attr: str
@@ -74,7 +112,7 @@ class SetAttr(IRStmt):
         super().__init__(belongsTo, id)
         self.target = target
         self.source = source
-        self.attr = attr
+        self.attr = sys.intern(attr)
         # $global.attr = v
         if(target == belongsTo.module.globalVariable):
             target.belongsTo.module.globalNames.add(attr)
@@ -84,6 +122,7 @@ class SetAttr(IRStmt):
 
 # target = source.attr
 class GetAttr(IRStmt):
+    __slots__ = ("target", "source", "attr")
     target: Variable
     source: Variable
     attr: str
@@ -92,13 +131,14 @@ class GetAttr(IRStmt):
         super().__init__(belongsTo, id)
         self.target = target
         self.source = source
-        self.attr = attr
+        self.attr = sys.intern(attr)
 
     def __str__(self):
         return f"{self.target} = {self.source}.{self.attr}"
 
 # target = New ...
 class New(IRStmt):
+    __slots__ = ("target", "objType")
     target: Variable
     objType:str                             # module, function, class, method, instance, builtin
     
@@ -110,6 +150,7 @@ class New(IRStmt):
 
         
 class NewModule(New):
+    __slots__ = ("module",)
     module: Union['ModuleCodeBlock', str]                  
 
     def __init__(self, target:Variable, module: 'CodeBlock', belongsTo: 'CodeBlock', id: int):
@@ -121,6 +162,7 @@ class NewModule(New):
         
 
 class NewFunction(New):
+    __slots__ = ("codeBlock",)
     codeBlock: 'FunctionCodeBlock'
 
     def __init__(self, target:Variable, codeBlock: 'CodeBlock', belongsTo: 'CodeBlock', id: int):
@@ -131,6 +173,7 @@ class NewFunction(New):
         return f"{self.target} = NewFunction"
 
 class NewClass(New):
+    __slots__ = ("codeBlock", "bases")
     codeBlock: 'ClassCodeBlock'
     bases: List[Variable]                # variables that points to a class object
 
@@ -146,6 +189,7 @@ class NewClass(New):
 
 
 class NewBuiltin(New):
+    __slots__ = ("type", "value")
     type: str
     value: Any                          # optional, for example the value of str, int, double can be use
     def __init__(self, target:Variable, type: str, value: Any, belongsTo: 'CodeBlock', id: int):
@@ -157,6 +201,7 @@ class NewBuiltin(New):
         return f"{self.target} = New {self.type}"
 
 class NewStaticMethod(New):
+    __slots__ = ("func",)
     func: Variable
     def __init__(self, target: Variable, func: Variable, belongsTo: 'CodeBlock', id: int):
         super().__init__(target, 'staticmethod', belongsTo, id)
@@ -174,6 +219,7 @@ class NewStaticMethod(New):
 
 
 class NewSuper(New):
+    __slots__ = ("type", "bound")
     type: Variable
     bound: Variable
     def __init__(self, target: Variable, type: Union[Variable, None], bound: Union[Variable, None],belongsTo: 'CodeBlock', id: int):
@@ -186,6 +232,7 @@ class NewSuper(New):
 # Important: calling a class object equarls to creating an instance! 
 # adding a function/module code block should add all class code block inside!
 class Call(IRStmt):
+    __slots__ = ("target", "callee", "posargs", "kwargs")
     target: Variable               
     callee: Variable
     posargs: List[Variable]
@@ -207,13 +254,14 @@ class Call(IRStmt):
         
 
 class DelAttr(IRStmt):
+    __slots__ = ("var", "attr")
     var: Variable
     attr: str
     
     def __init__(self, v: Variable, attr: str, belongsTo: 'CodeBlock', id: int):
         super().__init__(belongsTo, id)
         self.var = v
-        self.attr = attr
+        self.attr = sys.intern(attr)
 
     def __str__(self):
         return f"Del {self.var}.{self.attr}"
@@ -1,9 +1,10 @@
-from typing import Set
+from typing import Dict, Set, Tuple, Union
 from .CodeBlock import CodeBlock
 from .IRStmts import Variable
 
 
 class ModuleCodeBlock(CodeBlock):
+    __slots__ = ("globalNames", "globalVariable")
     
     globalNames: Set[str]
     globalVariable: Variable                    # $global, all code blocks in a module share a single $global variable 
@@ -14,4 +15,31 @@ class ModuleCodeBlock(CodeBlock):
         self.globalVariable = Variable("$global", self)
         # self.done = False
         self.globalNames = set()
-        self.scopeLevel = 0
\ No newline at end of file
+        self.scopeLevel = 0
+
+# Stands for a module whose code block is not in this process, IR generated by a worker refers to other modules by it.
+class ModuleRef:
+    __slots__ = ("id", )
+    id: str
+    def __init__(self, id: str):
+        self.id = id
+
+# Stands for a module imported by code the analysis has not reached yet,
+# the module is found and generated by the module manager when it is.
+class LazyModule:
+    __slots__ = ("moduleManager", "hook", "get")
+    hook: tuple                                 # arguments of import_hook
+    get: tuple                                  # arguments of getCodeBlock
+    def __init__(self, moduleManager, hook: tuple, get: tuple):
+        self.moduleManager = moduleManager
+        self.hook = hook
+        self.get = get
+
+    @property
+    def readable_name(self):
+        return f"lazy {self.get[0]}"
+
+    # the code block or the name of the module if it can't be found,
+    # and where code blocks already generated grew, code block -> number of statements before
+    def load(self) -> Tuple[Union[ModuleCodeBlock, str], Dict[CodeBlock, int]]:
+        return self.moduleManager.loadLazy(self)
@@ -0,0 +1,80 @@
+import hashlib
+import os
+import pickle
+import sys
+from typing import Dict, Optional
+
+from .IRGeneration.LoweredModule import LoweredModule
+
+# bump it when the IR or how it is generated changes, entries of other versions are never read
+IR_VERSION = 3
+MAX_SIZE = 512 << 20
+
+# Lowered modules on disk, named by the hash of what they are generated from.
+# An entry is touched when it is read, and the least recently used ones are removed when the cache is too large.
+class IRCache:
+    def __init__(self, directory: str, maxSize: int=MAX_SIZE):
+        self.directory = directory
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        os.makedirs(directory, exist_ok=True)
+
+    # the IR of a module depends on its name as well, its code blocks are named after it
+    def key(self, fqname: str, source: bytes) -> str:
+        h = hashlib.sha256(f"{IR_VERSION}\0{sys.version}\0{fqname}\0".encode())
+        h.update(source)
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".ir")
+
+    # without reading it, whether load would find it
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def load(self, key: str) -> Optional[LoweredModule]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                lowered = pickle.load(f)
+            os.utime(path)
+        except(Exception):
+            # missing, or written by something else
+            self.misses += 1
+            return None
+        self.hits += 1
+        return lowered
+
+    def store(self, key: str, lowered: LoweredModule):
+        path = self._path(key)
+        # written aside and renamed, so other runs never read half of an entry
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(lowered, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if(entry.name.endswith(".ir")):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        size = sum(entry[1] for entry in entries)
+        for _, entrySize, path in sorted(entries):
+            if(size <= self.maxSize):
+                break
+            try:
+                os.remove(path)
+            except(OSError):
+                continue
+            size -= entrySize
+            self.evicted += 1
+
+    def statistics(self) -> Dict[str, int]:
+        return {
+            "ir cache hits": self.hits,
+            "ir cache misses": self.misses,
+            "ir cache evicted": self.evicted,
+        }
@@ -1,5 +1,5 @@
 import ast
-from typing import Set, Union
+from typing import List, Set, Union
 import typing
 
 from ..IR.IRStmts import Assign, GetAttr, Variable
@@ -19,8 +19,8 @@ class ClassGenerator(CodeBlockGenerator):
     codeBlock: ClassCodeBlock
     attributes: Set[str]
 
-    def __init__(self, codeBlock, moduleManager: 'ModuleManager'):
-        super().__init__(moduleManager)
+    def __init__(self, codeBlock, moduleManager: 'ModuleManager', lines: List[str]=None):
+        super().__init__(moduleManager, lines)
         self.codeBlock = codeBlock
         
 
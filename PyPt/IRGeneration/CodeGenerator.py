@@ -1,6 +1,6 @@
 import ast
 import builtins
-from typing import Set, Union
+from typing import List, Set, Union
 import typing
 from xml.dom.minidom import Attr
 
@@ -83,7 +83,7 @@ def resolveName(codeBlock: CodeBlock, name: str) -> Union[Variable, Attribute]:
 # When it is stored, it can be one of Attribute, Subscript, Starred, Variable, List or Tuple
 class CodeBlockGenerator(ast.NodeVisitor):
     codeBlock: CodeBlock
-    def __init__(self, moduleManager: 'ModuleManager'):
+    def __init__(self, moduleManager: 'ModuleManager', lines: List[str]=None):
         # self.root = node
         # print(f"Into {name} @ {moduleName}")
         
@@ -91,6 +91,8 @@ class CodeBlockGenerator(ast.NodeVisitor):
         self.lambdaCount = 0
         self.tmpVariables = set()
         self.moduleManager = moduleManager
+        # lines of the source of the module, if bodies of functions are generated when the analysis reaches them
+        self.lines = lines
 
     def visit(self, node: ast.AST):
         node.result = None
@@ -566,14 +568,16 @@ class CodeBlockGenerator(ast.NodeVisitor):
             else:
                 aliases[alias.asname] = alias.name
              
-        if(hasstar and isinstance(imported, ModuleCodeBlock)):
+        if(hasstar):
             # if(not imported.done):
             #     raise Exception(f"Circular import between {self.codeBlock.moduleName} and {imported.moduleName}!")
-            for name in imported.globalNames:
-                if(name not in builtin_names and name[0] != "_"):
-                    # ignore those start with "_"
-                    aliases[name] = name
+            for name in self.moduleManager.starImport(imported, tmpModule):
+                aliases[name] = name
 
+        self.importNames(tmpModule, aliases)
+
+    # local name -> imported name
+    def importNames(self, tmpModule: Variable, aliases: typing.Dict[str, str]):
         for newName, oldName in aliases.items():
             resolved = resolveName(self.codeBlock, newName)
             if(isinstance(resolved, Variable)):
@@ -611,7 +615,7 @@ class CodeBlockGenerator(ast.NodeVisitor):
         from .FunctionGenerator import FunctionGenerator
         func_id = self.getNewID()
         func = FunctionCodeBlock(node.name, self.codeBlock, func_id)
-        generator = FunctionGenerator(func, self.moduleManager)
+        generator = FunctionGenerator(func, self.moduleManager, self.lines)
         generator.parse(node)
         
 
@@ -663,7 +667,7 @@ class CodeBlockGenerator(ast.NodeVisitor):
         from .FunctionGenerator import FunctionGenerator
         func_id = self.getNewID()
         func = FunctionCodeBlock(f"$lambda{self.lambdaCount}", self.codeBlock, func_id)
-        generator = FunctionGenerator(func, self.moduleManager)
+        generator = FunctionGenerator(func, self.moduleManager, self.lines)
         self.lambdaCount += 1
 
         generator.parse(node)
@@ -697,7 +701,7 @@ class CodeBlockGenerator(ast.NodeVisitor):
         from .ClassGenerator import ClassGenerator
         class_id = self.getNewID()
         cls = ClassCodeBlock(node.name, self.codeBlock, class_id)
-        generator = ClassGenerator(cls, self.moduleManager)
+        generator = ClassGenerator(cls, self.moduleManager, self.lines)
         generator.parse(node)
         # TODO: a better way to deal with it when base is a starred?
         bases = []
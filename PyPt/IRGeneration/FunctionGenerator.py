@@ -1,6 +1,6 @@
 import ast
 
-from typing import Any, Set
+from typing import Any, Dict, List, Tuple, Union
 import typing
 
 from ..IR.ClassCodeBlock import ClassCodeBlock
@@ -19,18 +19,31 @@ if typing.TYPE_CHECKING:
 
 class FunctionGenerator(CodeBlockGenerator):
     codeBlock: FunctionCodeBlock
-    yielded: Set[Variable]
+    yielded: Dict[Variable, None]       # kept in order, so the IR is the same from run to run
     sended: Variable
-    def __init__(self, codeBlock: FunctionCodeBlock, moduleManager: 'ModuleManager'):
+    def __init__(self, codeBlock: FunctionCodeBlock, moduleManager: 'ModuleManager', lines: List[str]=None):
         
-        super().__init__(moduleManager)
+        super().__init__(moduleManager, lines)
         self.codeBlock = codeBlock
-        self.yielded = set()
+        self.yielded = {}
         self.sended = Variable("$sended", self.codeBlock)
 
     def parse(self, node: ast.AST):
         assert(isinstance(node, ast.FunctionDef) or isinstance(node, ast.Lambda) or isinstance(node, ast.AsyncFunctionDef))
-        return super().parse(node)
+        if(self.lines is None):
+            return super().parse(node)
+        # parameters and local variables are needed by the code outside, the body is left until the analysis reaches it
+        self.preprocess(node)
+        self.codeBlock.pendingBody = PendingBody(self.moduleManager, self.lines, node)
+        # names the body binds in the module are there for star imports
+        for child in ast.walk(node):
+            if(isinstance(child, ast.Global)):
+                self.codeBlock.module.globalNames.update(child.names)
+
+    def parseBody(self, node: ast.AST):
+        for stmt in node.body:
+            self.visit(stmt)
+        self.postprocess(node)
 
     def preprocess(self, node):
         # get all locals, including args, function defintion, class Definition
@@ -138,7 +151,7 @@ class FunctionGenerator(CodeBlockGenerator):
         
         self.generic_visit(node)
         if(node.value):
-            self.yielded.add(node.value.result)
+            self.yielded[node.value.result] = None
         # else:
         #     self.yielded.add(None)
         # node.result = self.sended
@@ -151,5 +164,47 @@ class FunctionGenerator(CodeBlockGenerator):
         tmp = self.newTmpVariable()
         self.addGetAttr(tmp, Attribute(node.value.result, "$values"))
         
-        self.yielded.add(tmp)
+        self.yielded[tmp] = None
         # node.result = self.sended
+
+
+# The body of a function generated when the analysis reaches it.
+# Only where the function is in the source of its module is kept, it is parsed again then.
+class PendingBody:
+    __slots__ = ("moduleManager", "lines", "span")
+    lines: List[str]                                # shared by the functions of a module
+    span: Tuple[int, int, int, int]                 # lineno, col_offset, end_lineno, end_col_offset
+    def __init__(self, moduleManager: 'ModuleManager', lines: List[str], node: ast.AST):
+        self.moduleManager = moduleManager
+        self.lines = lines
+        self.span = (node.lineno, node.col_offset, node.end_lineno, node.end_col_offset)
+
+    # where loading the modules it imports added statements, see LazyModule.load
+    def lower(self, codeBlock: FunctionCodeBlock) -> Dict[CodeBlock, int]:
+        return self.moduleManager.lowerFunction(codeBlock)
+
+    def generate(self, codeBlock: FunctionCodeBlock):
+        generator = FunctionGenerator(codeBlock, self.moduleManager, self.lines)
+        node = self.node()
+        if(isinstance(node, ast.Lambda)):
+            node.body = [node.body]
+        generator.parseBody(node)
+
+    def node(self) -> Union[ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda]:
+        lineno, col, endLineno, endCol = self.span
+        # offsets are of utf-8 bytes
+        first = self.lines[lineno - 1].encode()
+        if(lineno == endLineno):
+            source = first[col:endCol].decode()
+        else:
+            last = self.lines[endLineno - 1].encode()[:endCol].decode()
+            source = "\n".join([first[col:].decode()] + self.lines[lineno:endLineno - 1] + [last])
+        # parsed where it was, so that functions in it are found in the lines as well
+        if(source.startswith("lambda")):
+            node = ast.parse(f"(\n{' ' * col}{source}\n)", mode="eval").body
+            return ast.increment_lineno(node, lineno - 2)
+        if(col == 0):
+            return ast.increment_lineno(ast.parse(source).body[0], lineno - 1)
+        # the rest of the lines are indented as they were
+        node = ast.parse(f"if 1:\n{first[:col].decode()}{source}").body[0].body[0]
+        return ast.increment_lineno(node, lineno - 2)
@@ -0,0 +1,35 @@
+import ast
+from typing import List
+
+from .ModuleGenerator import builtin_names
+
+
+# Finds what the generators would ask the module manager, without generating the IR, see LoweredModule.calls.
+# Bodies of functions and classes are generated where they are defined,
+# so visiting the statements in order asks in the same order as the generators.
+class ImportScanner(ast.NodeVisitor):
+    calls: List[tuple]
+
+    def __init__(self):
+        self.calls = []
+
+    def scan(self, node: ast.Module) -> List[tuple]:
+        self.visit(node)
+        # see ModuleGenerator.preprocess
+        self.visit(ast.ImportFrom(module="builtins", names=[ast.alias(name=name) for name in builtin_names], level=0))
+        return self.calls
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self.calls.append(("hook", alias.name, None, 0))
+            if(alias.asname is None):
+                self.calls.append(("get", alias.name.partition(".")[0], 0))
+            else:
+                self.calls.append(("get", alias.name, 0))
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        fromlist = [alias.name for alias in node.names]
+        self.calls.append(("hook", node.module or "", fromlist, node.level))
+        self.calls.append(("get", node.module, node.level))
+        if("*" in fromlist):
+            self.calls.append(("star", ))
@@ -0,0 +1,87 @@
+import ast
+from typing import Dict, List, Set, Union
+
+from ..IR.CodeBlock import CodeBlock
+from ..IR.IRStmts import NewClass, NewFunction, NewModule, Variable, newUid
+from ..IR.ModuleCodeBlock import ModuleCodeBlock
+from .ModuleGenerator import ModuleGenerator
+
+
+# The IR of a module generated without knowing any other module.
+# Where a module is imported, NewModule refers to the index of the getCodeBlock call instead,
+# and calls keeps what the generators asked the module manager, so the imports can be replayed later:
+# ("hook", name, fromlist, level), ("get", name, level) and ("star", ).
+# Star imports bind nothing yet, their names depend on the imported module.
+class LoweredModule:
+    __slots__ = ("codeBlock", "calls", "newModules", "starImports", "firstBound")
+    codeBlock: ModuleCodeBlock
+    calls: List[tuple]
+    newModules: List[NewModule]
+    starImports: List[Variable]                     # tmpModule of each star import
+    firstBound: Dict[str, int]                      # global name -> the first import_hook call it is bound before
+
+    def __init__(self, codeBlock: ModuleCodeBlock, calls: List[tuple], starImports: List[Variable], firstBound: Dict[str, int]):
+        self.codeBlock = codeBlock
+        self.calls = calls
+        self.newModules = [stmt for cb in allCodeBlocksOf(codeBlock) for stmt in cb.stmts if isinstance(stmt, NewModule) and isinstance(stmt.module, int)]
+        self.starImports = starImports
+        self.firstBound = firstBound
+
+    # stmts are pickled without their uids, they are given new ones all at once
+    def __setstate__(self, state):
+        for slot, value in state[1].items():
+            setattr(self, slot, value)
+        for cb in allCodeBlocksOf(self.codeBlock):
+            for stmt in cb.stmts:
+                newUid(stmt)
+
+    # global names bound before the import_hook call at position
+    def boundNamesAt(self, position: int) -> Set[str]:
+        return {name for name, first in self.firstBound.items() if first <= position}
+
+
+# Stands for the module manager when a module is generated alone.
+class ImportRecorder:
+    def __init__(self, codeBlock: ModuleCodeBlock):
+        self.codeBlock = codeBlock
+        self.calls = []
+        self.starImports = []
+        self.firstBound = {}
+        self.hooks = 0
+        self.gets = 0
+
+    def import_hook(self, name: str, caller: str, fromlist: List[str]=None, level: int=0) -> None:
+        globalNames = self.codeBlock.globalNames
+        if(len(globalNames) > len(self.firstBound)):
+            for globalName in globalNames:
+                self.firstBound.setdefault(globalName, self.hooks)
+        self.calls.append(("hook", name, fromlist, level))
+        self.hooks += 1
+
+    def getCodeBlock(self, name: str, callerName: str=None, level: int=0) -> int:
+        self.calls.append(("get", name, level))
+        self.gets += 1
+        return self.gets - 1
+
+    def starImport(self, imported: Union[int, str], tmpModule: Variable) -> List[str]:
+        self.calls.append(("star", ))
+        self.starImports.append(tmpModule)
+        return []
+
+
+def lowerModule(fqname: str, source: bytes) -> LoweredModule:
+    tree = ast.parse(source)
+    codeBlock = ModuleCodeBlock(fqname)
+    recorder = ImportRecorder(codeBlock)
+    ModuleGenerator(codeBlock, moduleManager=recorder).parse(tree)
+    return LoweredModule(codeBlock, recorder.calls, recorder.starImports, recorder.firstBound)
+
+
+# the code block and all code blocks defined in it
+def allCodeBlocksOf(codeBlock: CodeBlock) -> List[CodeBlock]:
+    codeBlocks = [codeBlock]
+    for cb in codeBlocks:
+        for stmt in cb.stmts:
+            if(isinstance(stmt, (NewFunction, NewClass))):
+                codeBlocks.append(stmt.codeBlock)
+    return codeBlocks
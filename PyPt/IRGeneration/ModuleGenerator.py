@@ -1,6 +1,7 @@
 import ast
 import builtins
 import typing
+from typing import List
 from ..IR.ModuleCodeBlock import ModuleCodeBlock
 from .CodeGenerator import CodeBlockGenerator
 
@@ -14,8 +15,8 @@ builtin_names = ["object"]
 class ModuleGenerator(CodeBlockGenerator):
     codeBlock: ModuleCodeBlock
     # module has no enclosing block
-    def __init__(self, codeBlock: ModuleCodeBlock, moduleManager: 'ModuleManager'):
-        super().__init__(moduleManager)
+    def __init__(self, codeBlock: ModuleCodeBlock, moduleManager: 'ModuleManager', lines: List[str]=None):
+        super().__init__(moduleManager, lines)
         self.codeBlock = codeBlock
 
     def preprocess(self, node: ast.Module):
@@ -0,0 +1,208 @@
+import re
+import sys
+from typing import Dict, List, Optional, Set, Tuple
+
+from .Graph import stronglyConnectedComponents
+from .ModuleResolver import _PKG_DIRECTORY, _PY_SOURCE, KINDS, ModuleResolver
+
+# An import statement at the start of a line, after its indentation. What it imports follows the match.
+IMPORT = re.compile(rb"^[ \t]*(?:from[ \t]+(\.*)[ \t]*([\w.]*)[ \t]+import|import)[ \t]+", re.MULTILINE)
+# the rest of a logical line, lines ending with a backslash are continued
+REST = re.compile(rb"(?:[^\n#;\\]|\\\r?\n)*")
+COMMENT = re.compile(rb"#[^\n]*")
+
+# Finds the import statements of a module without parsing it, as (level, module, fromlist), fromlist is None for "import".
+# Only statements that start a line are seen, not those after "if x:" on the same line,
+# and lines of strings that look like imports are taken for imports, names that are not identifiers are left out.
+def scanImports(source: bytes) -> List[Tuple[int, str, Optional[List[str]]]]:
+    statements = []
+    for match in IMPORT.finditer(source):
+        end = match.end()
+        if(source.startswith(b"(", end)):
+            close = source.find(b")", end)
+            text = COMMENT.sub(b"", source[end + 1:close if close >= 0 else len(source)])
+        else:
+            text = REST.match(source, end).group()
+        names = []
+        for part in text.replace(b"\\", b" ").split(b","):
+            words = part.split()
+            if(len(words) == 1 or (len(words) == 3 and words[1] == b"as")):
+                names.append(words[0].decode("ascii", "replace"))
+        dots, module = match.group(1, 2)
+        if(dots is None):
+            statements += [(0, name, None) for name in names if name != "*"]
+        elif(names):
+            statements.append((len(dots), module.decode("ascii", "replace"), names))
+    return statements
+
+# The modules a program imports, found from the entries by scanning import statements instead of generating the IR.
+# Modules are found like the module manager finds them, a module the module manager can't generate is not in the graph.
+# It tells how large the analysis will be before it starts, and which modules to generate before they are found.
+class ImportGraph:
+    files: Dict[str, str]               # module name -> file of its source
+    packages: Dict[str, str]            # package name -> its directory
+    imports: Dict[str, Set[str]]        # module name -> names of the modules it imports
+    sources: Dict[str, bytes]           # module name -> its source, if they are kept
+
+    def __init__(self, cwd: str, externalPath: List[str], resolver: ModuleResolver=None, excludes: List[str]=None, maxDepth: int=9999, keepSources: bool=False):
+        self.cwd = cwd
+        self.externalPath = externalPath
+        self.resolver = resolver or ModuleResolver()
+        self.excludes = excludes or []
+        self.maxDepth = maxDepth
+        self.keepSources = keepSources
+        self.files = {}
+        self.packages = {}
+        self.sizes = {}
+        self.lines = {}
+        self.depths = {}
+        self.imports = {}
+        self.sources = {}
+        self.missing = set()
+        self.queue = []
+
+    # a script, under the name the module manager gives it
+    def addFile(self, name: str, file: str):
+        with open(file, "rb") as fp:
+            self.add(name, file, fp.read(), 0)
+        self.scan()
+
+    # a module, and its __main__ if it is a package, like the module manager adds an entry module
+    def addModule(self, fqname: str):
+        if(self.find(fqname, 0) and fqname in self.packages):
+            self.find(fqname + ".__main__", 0)
+        self.scan()
+
+    def add(self, fqname: str, file: str, source: bytes, depth: int):
+        self.files[fqname] = file
+        self.sizes[fqname] = len(source)
+        self.lines[fqname] = source.count(b"\n") + 1
+        self.depths[fqname] = depth
+        self.imports[fqname] = set()
+        if(self.keepSources):
+            self.sources[fqname] = source
+        self.queue.append((fqname, source))
+
+    def scan(self):
+        while(self.queue):
+            fqname, source = self.queue.pop()
+            for statement in scanImports(source):
+                self.imports[fqname] |= self.importsOf(fqname, *statement)
+
+    # see ModuleManager._import_hook
+    def importsOf(self, fqname: str, level: int, module: str, fromlist: Optional[List[str]]) -> Set[str]:
+        depth = self.depths[fqname]
+        head, _, tail = module.partition(".")
+        found = None
+        if(level):
+            parent = self.relativeParent(fqname, level)
+            if(parent is None):
+                return set()
+            found = f"{parent}.{head}" if head else parent
+            if(not self.find(found, depth)):
+                found = None
+        # like find_head_package, the head is looked for at the top if it is not relative to the parent
+        if(found is None and head):
+            found = head if self.find(head, depth) else None
+        if(found is None):
+            return set()
+        imported = {found}
+        for part in tail.split(".") if tail else []:
+            found = f"{found}.{part}"
+            if(not self.find(found, depth)):
+                return imported
+            imported.add(found)
+        if(fromlist and found in self.packages):
+            if("*" in fromlist):
+                fromlist = set(fromlist) | self.submodules(found)
+            for sub in fromlist:
+                if(sub != "*" and self.find(f"{found}.{sub}", depth)):
+                    imported.add(f"{found}.{sub}")
+        return imported
+
+    # see ModuleManager.determine_parent
+    def relativeParent(self, fqname: str, level: int) -> Optional[str]:
+        if(fqname in self.packages):
+            level -= 1
+        if(level == 0):
+            return fqname
+        if(fqname.count(".") < level):
+            return None
+        return fqname.rsplit(".", level)[0]
+
+    # see ModuleManager.find_all_submodules
+    def submodules(self, package: str) -> Set[str]:
+        submodules = set()
+        for name, isDir in (self.resolver.listing(self.packages[package]) or {}).items():
+            for suffix, _ in KINDS:
+                if(not isDir and name.endswith(suffix)):
+                    submodules.add(name[:-len(suffix)])
+                    break
+        submodules.discard("__init__")
+        return submodules
+
+    # Finds a module and adds it to the graph, if the module manager would generate it. See ModuleManager.import_module.
+    def find(self, fqname: str, depth: int) -> bool:
+        if(fqname in self.files):
+            return True
+        if(fqname in self.missing or fqname in self.excludes):
+            return False
+        self.missing.add(fqname)
+        parent, _, partname = fqname.rpartition(".")
+        directory = None
+        try:
+            if(parent):
+                if(not self.find(parent, depth) or parent not in self.packages):
+                    return False
+                fp, pathname, (_, _, kind) = self.resolver.find_module(partname, [self.packages[parent]])
+            elif(fqname in sys.builtin_module_names):
+                return False
+            else:
+                try:
+                    fp, pathname, (_, _, kind) = self.resolver.find_module(fqname, [self.cwd])
+                except(ImportError):
+                    fp, pathname, (_, _, kind) = self.resolver.find_module(fqname, self.externalPath)
+                    depth += 1
+            if(kind == _PKG_DIRECTORY):
+                directory = pathname
+                fp, pathname, (_, _, kind) = self.resolver.find_module("__init__", [directory])
+        except(ImportError):
+            return False
+        try:
+            if(kind != _PY_SOURCE or depth > self.maxDepth):
+                return False
+            source = fp.read()
+        finally:
+            if(fp):
+                fp.close()
+        if(directory):
+            self.packages[fqname] = directory
+        self.missing.discard(fqname)
+        self.add(fqname, pathname, source, depth)
+        return True
+
+    # modules to generate, those that take longest first, so that the last ones to finish are short
+    def largestFirst(self) -> List[str]:
+        return sorted(self.files, key=lambda fqname: self.sizes[fqname], reverse=True)
+
+    # Strongly connected components of the graph, a component comes before those that import it.
+    def components(self) -> List[List[str]]:
+        return stronglyConnectedComponents(self.files, lambda fqname: self.imports[fqname])
+
+    def statistics(self) -> Dict[str, int]:
+        cycles = [component for component in self.components() if len(component) > 1]
+        return {
+            "scanned modules": len(self.files),
+            "import edges": sum(len(imported) for imported in self.imports.values()),
+            "source lines": sum(self.lines.values()),
+            "source bytes": sum(self.sizes.values()),
+            "import cycles": len(cycles),
+            "largest cycle": max((len(component) for component in cycles), default=0),
+        }
+
+    def export(self) -> dict:
+        return {
+            "modules": {fqname: {"file": file, "size": self.sizes[fqname], "lines": self.lines[fqname], "imports": sorted(self.imports[fqname])} for fqname, file in self.files.items()},
+            "components": [sorted(component) for component in self.components()],
+            "statistics": self.statistics(),
+        }
@@ -1,19 +1,32 @@
 """This file is based on python3.9/modulefinder.py"""
 
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import dis
-from typing import List, Union
+from typing import Dict, List, Set, Tuple, Union
 import importlib._bootstrap_external
 import importlib.machinery
+import importlib.util
 import marshal
 import os
 import io
 import sys
 import ast
+import typing
 
-from .IR.ModuleCodeBlock import ModuleCodeBlock
-from .IRGeneration.ModuleGenerator import ModuleGenerator
+from .IR.ModuleCodeBlock import LazyModule, ModuleCodeBlock, ModuleRef
+from .IRGeneration.ModuleGenerator import ModuleGenerator, builtin_names
+from .IRGeneration.ImportScanner import ImportScanner
+from .IRGeneration.LoweredModule import LoweredModule, lowerModule
+from .ImportGraph import ImportGraph
+from .ModuleResolver import _C_BUILTIN, _PKG_DIRECTORY, _PY_COMPILED, _PY_SOURCE, ModuleResolver
 
 from .IR.CodeBlock import CodeBlock
+from .IR.FunctionCodeBlock import FunctionCodeBlock
+
+if typing.TYPE_CHECKING:
+    from .IRCache import IRCache
+    from .Summary import Summary
 
 
 from .IR.IRStmts import NewModule, SetAttr, Variable
@@ -25,66 +38,6 @@ STORE_GLOBAL = dis.opmap['STORE_GLOBAL']
 STORE_OPS = STORE_NAME, STORE_GLOBAL
 EXTENDED_ARG = dis.EXTENDED_ARG
 
-# Old imp constants:
-
-_SEARCH_ERROR = 0
-_PY_SOURCE = 1
-_PY_COMPILED = 2
-_C_EXTENSION = 3
-_PKG_DIRECTORY = 5
-_C_BUILTIN = 6
-_PY_FROZEN = 7
-
-# Modulefinder does a good job at simulating Python's, but it can not
-# handle __path__ modifications packages make at runtime.  Therefore there
-# is a mechanism whereby you can register extra paths in this map for a
-# package, and it will be honored.
-
-
-def _find_module(name, path=None):
-    """An importlib reimplementation of imp.find_module (for our purposes)."""
-
-    # It's necessary to clear the caches for our Finder first, in case any
-    # modules are being added/deleted/modified at runtime. In particular,
-    # test_modulefinder.py changes file tree contents in a cache-breaking way:
-
-    importlib.machinery.PathFinder.invalidate_caches()
-
-    spec = importlib.machinery.PathFinder.find_spec(name, path)
-
-    if spec is None or spec.loader is None:
-        raise ImportError("No module named {name!r}".format(name=name), name=name)
-
-    # Some special cases:
-
-    if spec.loader is importlib.machinery.BuiltinImporter:
-        return None, None, ("", "", _C_BUILTIN)
-
-    if spec.loader is importlib.machinery.FrozenImporter:
-        return None, None, ("", "", _PY_FROZEN)
-
-    file_path = spec.origin
-
-    if spec.loader.is_package(name):
-        return None, os.path.dirname(file_path), ("", "", _PKG_DIRECTORY)
-
-    if isinstance(spec.loader, importlib.machinery.SourceFileLoader):
-        kind = _PY_SOURCE
-
-    elif isinstance(spec.loader, importlib.machinery.ExtensionFileLoader):
-        kind = _C_EXTENSION
-
-    elif isinstance(spec.loader, importlib.machinery.SourcelessFileLoader):
-        kind = _PY_COMPILED
-
-    else:  # Should never happen.
-        return None, None, ("", "", _SEARCH_ERROR)
-
-    file = io.open_code(file_path)
-    suffix = os.path.splitext(file_path)[-1]
-
-    return file, file_path, (suffix, "rb", kind)
-
 class ModuleExcluded(Exception):
     pass
 
@@ -96,6 +49,8 @@ class Module:
         self.__path__ = path
         self.__codeBlock__ = None
         self.__generator__ = None
+        self.__lowered__ = None
+        self.__imports__ = None
         
         # # The set of global names that are assigned to in the module.
         # # This includes those names imported through starimports of
@@ -116,7 +71,7 @@ class Module:
 
 class ModuleManager:
 
-    def __init__(self,cwd=None, /, maxDepth=9999, excludes=None, verbose=False):
+    def __init__(self,cwd=None, /, maxDepth=9999, excludes=None, verbose=False, jobs=1, irCache: 'IRCache'=None, summary: 'Summary'=None, lazy=False, lazyFunctions=False, resolver: ModuleResolver=None):
         
         if(cwd):
             self.cwd = cwd
@@ -124,30 +79,64 @@ class ModuleManager:
             self.cwd = os.getcwd()
 
         self.externalPath = sys.path[1:]
+        # shared by the entries, and by other module managers it is given to
+        self.resolver = resolver or ModuleResolver()
         self.modules = {}
         self.badmodules = {}
         self.excludes = excludes or []
         self.verbose = verbose
         self.maxDepth = maxDepth
         self.entrys = []
+        # With more than one job or a cache of IR, modules are found first and their IR is generated alone,
+        # by a process pool or read from the cache. It is linked to other modules afterwards,
+        # the time when things happened while finding modules tells what the imports saw.
+        self.jobs = jobs
+        self.irCache = irCache
+        self.deferred = jobs > 1 or irCache is not None
+        self.time = 0
+        self.unloaded = []                          # modules found but not generated
+        self.submodules = []                        # (parent, partname, module, time) to bind when they are generated
+        self.boundSubmodules = defaultdict(list)    # module name -> [(time, partname)]
+        self.lowered = {}                           # module name -> its LoweredModule
+        self.starImportsInto = defaultdict(list)    # module name -> [(tmpModule, imported module name, time, position)]
+        self.starNames = {}                         # time of a star import -> names it imports
+        # With more than one job, the modules a scan of the import graph predicts are given to the pool before they are found,
+        # the largest first. Finding them then waits for their IR instead of parsing them, the rest are generated as above.
+        self.executor = None
+        self.prefetched = {}                        # module name -> (its source, future of its LoweredModule)
+        # modules in the summary are not generated, their code blocks are stubs of the summary
+        self.summary = summary
+        # Lazily, modules imported by a module are not found when it is generated.
+        # The import is kept in a LazyModule, and the analysis loads it when it reaches the import.
+        # Modules star imported are still found at once, their names are needed to generate the importer.
+        self.lazy = lazy
+        self.pendingImport = None                   # arguments of the last import_hook call, lazily
+        self.grown = None                           # code block -> number of statements before a lazy load added some
+        # Bodies of functions are generated when the analysis reaches them as well.
+        # Modules whose IR is generated alone, by workers or read from the cache, are generated whole.
+        self.lazyFunctions = lazyFunctions
         
     def addEntry(self, /, file=None, module=None) -> None:
 
         if(file):
             filepath = os.path.join(self.cwd, file)
+            name = f'__main{len(self.entrys) if self.entrys else ""}__'
+            self.prefetch(file=(name, filepath))
             
             try:
                 with io.open_code(filepath) as fp:
                     stuff = ("", "rb", _PY_SOURCE)
-                    m = self.load_module(f'__main{len(self.entrys) if self.entrys else ""}__', fp, filepath, stuff, 0)
+                    m = self.load_module(name, fp, filepath, stuff, 0)
                     self.entrys.append(m)
             except(IOError):
                 raise ImportError(f"Can't open file {filepath}. Please check if the file exists.")
 
         if(module):
+            self.prefetch(module=module)
             try:
                 self._import_hook(module, None)
             except(ModuleExcluded):
+                self.generateAll()
                 return
             
             if(self.modules[module].__path__):
@@ -158,12 +147,178 @@ class ModuleManager:
                 #     raise ModuleNotFoundException(f"{module} is a package, but {module}.__main__ can't be imported. Please check if it exists.")
             else:
                 self.entrys.append(self.modules[module])
-            
+
+        self.generateAll()
+
+    # imports a module without making it an entry, a summary is built from modules imported so
+    def addLibrary(self, module: str) -> None:
+        self.prefetch(module=module)
+        self._import_hook(module, None)
+        self.generateAll()
+
+    # an empty import graph, whose modules are found like this finds them
+    def importGraph(self, keepSources: bool=False) -> ImportGraph:
+        return ImportGraph(self.cwd, self.externalPath, self.resolver, excludes=self.excludes, maxDepth=self.maxDepth, keepSources=keepSources)
+
+    # gives the pool the modules the entry is predicted to import, that are not found yet
+    def prefetch(self, /, file: Tuple[str, str]=None, module: str=None) -> None:
+        if(self.jobs <= 1 or self.lazy):
+            return
+        graph = self.importGraph(keepSources=True)
+        try:
+            if(file):
+                graph.addFile(*file)
+            else:
+                graph.addModule(module)
+        except(OSError):
+            # addEntry tells
+            return
+        for fqname in graph.largestFirst():
+            if(fqname in self.modules or fqname in self.prefetched or (self.summary and fqname in self.summary.modules)):
+                continue
+            source = graph.sources[fqname]
+            if(self.irCache and self.irCache.contains(self.irCache.key(fqname, source))):
+                continue
+            self.prefetched[fqname] = (source, self.pool().submit(_lowerModule, (fqname, source)))
+
+    def pool(self) -> ProcessPoolExecutor:
+        if(self.executor is None):
+            self.executor = ProcessPoolExecutor(max_workers=self.jobs)
+        return self.executor
+
+    # modules predicted but not imported are not waited for
+    def closePool(self):
+        if(self.executor is not None):
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+        self.prefetched = {}
+
+    # Generates the IR of the modules found since last time, in parallel, and links it.
+    # The IR of a module refers to imported modules by the index of the getCodeBlock call, replaced by what it returned here.
+    def generateAll(self):
+        if(not self.unloaded):
+            self.closePool()
+            return
+        missing = [m for m in self.unloaded if m.__lowered__ is None]
+        while(missing):
+            # the largest first, so that the last ones to finish are short
+            missing.sort(key=lambda m: len(m.__imports__.source), reverse=True)
+            tasks = [(m.__name__, m.__imports__.source) for m in missing]
+            chunksize = max(1, len(tasks) // (self.jobs * 4))
+            for m, lowered in zip(missing, self.pool().map(_lowerModule, tasks, chunksize=chunksize)):
+                m.__lowered__ = lowered
+                if(self.irCache):
+                    self.irCache.store(m.__imports__.key, lowered)
+                if(lowered.calls != m.__imports__.calls):
+                    self.replayLowered(m)
+            # modules only the generators import are found by replaying, they are lowered next
+            missing = [m for m in self.unloaded if m.__lowered__ is None]
+        self.closePool()
+
+        for m in self.unloaded:
+            m.__codeBlock__ = m.__lowered__.codeBlock
+        starImports = []
+        for m in self.unloaded:
+            lowered, imports = m.__lowered__, m.__imports__
+            for stmt in lowered.newModules:
+                cb = imports.resolved[stmt.module]
+                stmt.module = self.modules[cb.id].__codeBlock__ if isinstance(cb, ModuleRef) else cb
+            for tmpModule, (name, time, position) in zip(lowered.starImports, imports.starImports):
+                if(name is not None):
+                    starImport = (tmpModule, name, time, position)
+                    starImports.append(starImport)
+                    self.starImportsInto[m.__name__].append(starImport)
+            self.lowered[m.__name__] = lowered
+            m.__lowered__ = m.__imports__ = None
+        self.unloaded = []
+
+        for parent, partname, m, time in self.submodules:
+            self.bindSubmodule(parent, partname, m)
+            self.boundSubmodules[parent.__name__].append((time, partname))
+        self.submodules = []
+
+        for starImport in sorted(starImports, key=lambda starImport: starImport[2]):
+            tmpModule = starImport[0]
+            names = self._starNamesAt(starImport)
+            ModuleGenerator(tmpModule.belongsTo, self).importNames(tmpModule, {name: name for name in names})
+
+        if(self.irCache):
+            self.irCache.evict()
+
+    # Asks what the generators of m asked, the IR of m is linked with the answers later.
+    def replayImports(self, m, imports: 'ImportReplay'):
+        m.__imports__ = imports
+        for call in imports.calls:
+            if(call[0] == "hook"):
+                _, name, fromlist, level = call
+                self.import_hook(name, m.__name__, fromlist, level=level)
+                imports.position += 1
+            elif(call[0] == "get"):
+                _, name, level = call
+                imports.resolved.append(self.getCodeBlock(name, m.__name__, level=level))
+            elif(call[0] == "star"):
+                if(isinstance(imports.resolved[-1], LazyModule)):
+                    imports.resolved[-1] = self.resolveLazy(imports.resolved[-1])
+                imports.starImports.append(self.starImportState(imports.resolved[-1]))
+        imports.done = True
+
+    # The scanner didn't ask what the generators of m asked, what they asked is replayed instead,
+    # as when m is lowered without workers.
+    def replayLowered(self, m):
+        imports = ImportReplay(None)
+        imports.key = m.__imports__.key
+        imports.calls = m.__lowered__.calls
+        self.replayImports(m, imports)
+
+    # the state of a module when it is star imported while finding modules
+    def starImportState(self, imported: Union[ModuleCodeBlock, ModuleRef, str]) -> Tuple[str, int, int]:
+        if(not isinstance(imported, (ModuleCodeBlock, ModuleRef))):
+            return None, None, None
+        self.time += 1
+        imports = self.modules[imported.id].__imports__
+        position = imports.position if imports and not imports.done else None
+        return imported.id, self.time, position
+
+    def _starNamesAt(self, starImport) -> List[str]:
+        tmpModule, name, time, position = starImport
+        if(time not in self.starNames):
+            self.starNames[time] = sorted(self._starNames(self._boundNamesAt(name, time, position)))
+        return self.starNames[time]
+
+    # names a module had bound at some time, position is where it was if it was being generated
+    def _boundNamesAt(self, name: str, time: int, position: int) -> Set[str]:
+        # modules of a summary are never being generated
+        codeBlock = self.modules[name].__codeBlock__
+        names = set(codeBlock.globalNames if position is None else self.lowered[name].boundNamesAt(position))
+        names.update(partname for t, partname in self.boundSubmodules[name] if t < time)
+        for starImport in self.starImportsInto[name]:
+            if(starImport[2] < time):
+                names.update(self._starNamesAt(starImport))
+        return names
+
+    # names imported by "from ... import *"
+    def starImport(self, imported: Union[ModuleCodeBlock, LazyModule, str], tmpModule: Variable) -> List[str]:
+        if(isinstance(imported, LazyModule)):
+            imported = self.resolveLazy(imported)
+        if(not isinstance(imported, ModuleCodeBlock)):
+            return []
+        return sorted(self._starNames(imported.globalNames))
+
+    def _starNames(self, names: Set[str]) -> List[str]:
+        # ignore those start with "_"
+        return [name for name in names if name not in builtin_names and name[0] != "_"]
+
     def getEntrys(self) -> List[CodeBlock]:
         return [m.__codeBlock__ for m in self.entrys]
 
 
-    def getCodeBlock(self, name: str, callerName: str=None, level: int=0) -> Union[ModuleCodeBlock, str]:
+    def getCodeBlock(self, name: str, callerName: str=None, level: int=0) -> Union[ModuleCodeBlock, LazyModule, str]:
+        if(self.lazy):
+            hook, self.pendingImport = self.pendingImport, None
+            return LazyModule(self, hook, (name, callerName, level))
+        return self.findCodeBlock(name, callerName, level)
+
+    def findCodeBlock(self, name: str, callerName: str=None, level: int=0) -> Union[ModuleCodeBlock, str]:
         callerName = callerName and self.modules[callerName]
         parent = self.determine_parent(callerName, level)
         if parent and name:
@@ -177,6 +332,27 @@ class ModuleManager:
             return self.modules[fqname].__codeBlock__
         else:
             return fqname
+
+    # finds the module a LazyModule stands for, generateAll generates it if there are more than one jobs
+    def resolveLazy(self, lazy: LazyModule) -> Union[ModuleCodeBlock, ModuleRef, str]:
+        self.importNow(*lazy.hook)
+        return self.findCodeBlock(*lazy.get)
+
+    def loadLazy(self, lazy: LazyModule) -> Tuple[Union[ModuleCodeBlock, str], Dict[CodeBlock, int]]:
+        self.grown = {}
+        self.resolveLazy(lazy)
+        self.generateAll()
+        grown, self.grown = self.grown, None
+        return self.findCodeBlock(*lazy.get), grown
+
+    # generates the body of a function the analysis reaches, the modules it imports may add statements like loadLazy
+    def lowerFunction(self, codeBlock: FunctionCodeBlock) -> Dict[CodeBlock, int]:
+        pendingBody, codeBlock.pendingBody = codeBlock.pendingBody, None
+        self.grown = {}
+        pendingBody.generate(codeBlock)
+        self.generateAll()
+        grown, self.grown = self.grown, None
+        return grown
         
     def allCodeBlocks(self):
         return [m.__codeBlock__ for m in self.modules.values() if m.__codeBlock__ is not None]
@@ -343,6 +519,9 @@ class ModuleManager:
 
         if parent and parent.__path__ is None:
             raise ImportError("No module named " + fqname)
+
+        if(self.summary and fqname in self.summary.modules):
+            return self.load_summarized(caller, fqname)
             
         fp, pathname, stuff, isExternal = self.find_module(partname,
                                                 parent and parent.__path__, parent)
@@ -365,16 +544,32 @@ class ModuleManager:
             # if(not parent.__generator__):
             #     parent.__generator__ = ModuleCodeBlockGenerator(parent.__name__, moduleManager=self)
             #     parent.__codeBlock__ = parent.__generator__.codeBlock
-            p_codeblock = parent.__codeBlock__
-            p_generator = parent.__generator__
-            m_codeblock = m.__codeBlock__
-            m_generator = m.__generator__
-            tmp = p_codeblock.newTmpVariable()
-            NewModule(tmp, m_codeblock, p_codeblock, p_codeblock.getNewID())
-            SetAttr(p_codeblock.globalVariable, partname, tmp, p_codeblock, p_codeblock.getNewID())
+            if(self.deferred):
+                self.time += 1
+                self.submodules.append((parent, partname, m, self.time))
+            else:
+                self.bindSubmodule(parent, partname, m)
 
         
         return m
+
+    # what it imports is in the summary as well, and so is binding it to its parent
+    def load_summarized(self, caller, fqname):
+        m = self.add_module(fqname)
+        m.__file__, m.__path__, _ = self.summary.modules[fqname]
+        m.__depth__ = caller.__depth__ if caller else 0
+        m.__codeBlock__ = self.summary.moduleCodeBlock(fqname)
+        return m
+
+    # parent.partname = m
+    def bindSubmodule(self, parent, partname, m):
+        p_codeblock = parent.__codeBlock__
+        m_codeblock = m.__codeBlock__
+        if(self.grown is not None):
+            self.grown.setdefault(p_codeblock, len(p_codeblock.stmts))
+        tmp = p_codeblock.newTmpVariable()
+        NewModule(tmp, m_codeblock, p_codeblock, p_codeblock.getNewID())
+        SetAttr(p_codeblock.globalVariable, partname, tmp, p_codeblock, p_codeblock.getNewID())
         
             
 
@@ -394,9 +589,13 @@ class ModuleManager:
             m = self.add_module(fqname)
             m.__file__ = pathname
             m.__depth__ = depth
-            tree = ast.parse(fp.read())
+            if(self.deferred):
+                return self.load_deferred(m, fp.read())
+            source = fp.read()
+            tree = ast.parse(source)
+            lines = importlib.util.decode_source(source).split("\n") if self.lazyFunctions else None
             m.__codeBlock__ = ModuleCodeBlock(fqname)
-            m.__generator__ = ModuleGenerator(m.__codeBlock__, moduleManager=self)
+            m.__generator__ = ModuleGenerator(m.__codeBlock__, moduleManager=self, lines=lines)
             m.__generator__.parse(tree)
             return m
         elif type == _PY_COMPILED:
@@ -415,6 +614,34 @@ class ModuleManager:
             # m.__codeBlock__.done = True
 
 
+    # the IR of m is read from the cache, or generated alone, in a worker if there are more than one jobs
+    def load_deferred(self, m, source: bytes):
+        fqname = m.__name__
+        imports = ImportReplay(source)
+        if(self.irCache):
+            imports.key = self.irCache.key(fqname, source)
+            m.__lowered__ = self.irCache.load(imports.key)
+        prefetched = self.prefetched.pop(fqname, None)
+        if(m.__lowered__ is None and prefetched and prefetched[0] == source):
+            m.__lowered__ = prefetched[1].result()
+            if(self.irCache):
+                self.irCache.store(imports.key, m.__lowered__)
+        if(m.__lowered__ is None):
+            if(self.jobs > 1):
+                imports.calls = ImportScanner().scan(ast.parse(source))
+            else:
+                m.__lowered__ = lowerModule(fqname, source)
+                if(self.irCache):
+                    self.irCache.store(imports.key, m.__lowered__)
+        if(m.__lowered__ is not None):
+            imports.calls = m.__lowered__.calls
+            # workers don't need it
+            imports.source = None
+        m.__codeBlock__ = ModuleRef(fqname)
+        self.unloaded.append(m)
+        self.replayImports(m, imports)
+        return m
+
     def _add_badmodule(self, name, caller):
         if name not in self.badmodules:
             self.badmodules[name] = {}
@@ -429,6 +656,13 @@ class ModuleManager:
     # fromlist: import what names
     # no return
     def import_hook(self, name: str, caller: str, fromlist: list[str]=None, level: int=0) -> None:
+        if(self.lazy):
+            # getCodeBlock, which is called next, keeps it in a LazyModule
+            self.pendingImport = (name, caller, fromlist, level)
+            return
+        self.importNow(name, caller, fromlist, level)
+
+    def importNow(self, name: str, caller: str, fromlist: list[str]=None, level: int=0) -> None:
         caller = caller and self.modules[caller]
 
         if name in self.badmodules:
@@ -481,12 +715,26 @@ class ModuleManager:
             if name in sys.builtin_module_names:
                 return None, None, ("", "", _C_BUILTIN), False
             try:
-                return *_find_module(name, [self.cwd]), False
+                return *self.resolver.find_module(name, [self.cwd]), False
                 
             except ImportError:
                 pass
 
-            return *_find_module(name, self.externalPath), True
+            return *self.resolver.find_module(name, self.externalPath), True
         else:
-            return *_find_module(name, path), False
-        
\ No newline at end of file
+            return *self.resolver.find_module(name, path), False
+        
+
+# what a module asked while finding modules, and what it got
+class ImportReplay:
+    def __init__(self, source: bytes):
+        self.source = source
+        self.key = None                             # in the IR cache
+        self.calls = []
+        self.position = 0                           # import_hook calls so far
+        self.done = False
+        self.resolved = []                          # what each getCodeBlock call returned
+        self.starImports = []                       # (module name, time, position of the module if it was being found)
+
+def _lowerModule(task: Tuple[str, bytes]) -> LoweredModule:
+    return lowerModule(*task)
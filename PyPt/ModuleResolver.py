@@ -0,0 +1,169 @@
+import importlib.machinery
+import io
+import os
+import pickle
+import sys
+from typing import Dict, List, Optional
+
+# bump it when what is saved changes, files of other versions are never read
+RESOLVER_VERSION = 1
+
+# Old imp constants:
+
+_SEARCH_ERROR = 0
+_PY_SOURCE = 1
+_PY_COMPILED = 2
+_C_EXTENSION = 3
+_PKG_DIRECTORY = 5
+_C_BUILTIN = 6
+_PY_FROZEN = 7
+
+# in the order the path finder of importlib tries them
+KINDS = [(suffix, _C_EXTENSION) for suffix in importlib.machinery.EXTENSION_SUFFIXES] \
+    + [(suffix, _PY_SOURCE) for suffix in importlib.machinery.SOURCE_SUFFIXES] \
+    + [(suffix, _PY_COMPILED) for suffix in importlib.machinery.BYTECODE_SUFFIXES]
+
+
+def _find_module(name, path=None):
+    """An importlib reimplementation of imp.find_module (for our purposes)."""
+
+    # It's necessary to clear the caches for our Finder first, in case any
+    # modules are being added/deleted/modified at runtime. In particular,
+    # test_modulefinder.py changes file tree contents in a cache-breaking way:
+
+    importlib.machinery.PathFinder.invalidate_caches()
+
+    spec = importlib.machinery.PathFinder.find_spec(name, path)
+
+    if spec is None or spec.loader is None:
+        raise ImportError("No module named {name!r}".format(name=name), name=name)
+
+    # Some special cases:
+
+    if spec.loader is importlib.machinery.BuiltinImporter:
+        return None, None, ("", "", _C_BUILTIN)
+
+    if spec.loader is importlib.machinery.FrozenImporter:
+        return None, None, ("", "", _PY_FROZEN)
+
+    file_path = spec.origin
+
+    if spec.loader.is_package(name):
+        return None, os.path.dirname(file_path), ("", "", _PKG_DIRECTORY)
+
+    if isinstance(spec.loader, importlib.machinery.SourceFileLoader):
+        kind = _PY_SOURCE
+
+    elif isinstance(spec.loader, importlib.machinery.ExtensionFileLoader):
+        kind = _C_EXTENSION
+
+    elif isinstance(spec.loader, importlib.machinery.SourcelessFileLoader):
+        kind = _PY_COMPILED
+
+    else:  # Should never happen.
+        return None, None, ("", "", _SEARCH_ERROR)
+
+    file = io.open_code(file_path)
+    suffix = os.path.splitext(file_path)[-1]
+
+    return file, file_path, (suffix, "rb", kind)
+
+
+# Finds modules the way _find_module does, from listings of the directories on the search path.
+# Each directory is listed once, then lookups are answered from memory, those of modules that can't be found as well.
+# Listings can be kept in a file between runs, a directory is listed again if it has been modified since.
+# Entries of the search path that are not directories, like zip files, are left to the path finder of importlib.
+# Like _find_module, a directory without __init__ is not a package, namespace packages can't be found.
+class ModuleResolver:
+    file: str
+    listings: Dict[str, Optional[Dict[str, bool]]]      # directory -> name -> whether it is a directory, None if not a directory
+    saved: Dict[str, tuple]                             # directory -> (mtime, listing) read from the file, checked when it is used
+    mtimes: Dict[str, int]                              # directory -> mtime, of those listed in this run
+
+    def __init__(self, file: str=None):
+        self.file = file
+        self.listings = {}
+        self.saved = {}
+        self.mtimes = {}
+        self.lookups = 0
+        self.listed = 0
+        self.reused = 0
+        if(file):
+            self.load()
+
+    def load(self):
+        try:
+            with open(self.file, "rb") as f:
+                state = pickle.load(f)
+        except(Exception):
+            # missing, or written by something else
+            return
+        if(isinstance(state, dict) and state.get("version") == RESOLVER_VERSION and state.get("python") == sys.version):
+            self.saved = state["listings"]
+
+    def save(self):
+        if(not self.file or not self.listed):
+            return
+        listings = dict(self.saved)
+        listings.update((directory, (mtime, self.listings[directory])) for directory, mtime in self.mtimes.items())
+        state = {"version": RESOLVER_VERSION, "python": sys.version, "listings": listings}
+        # written aside and renamed, so other runs never read half of it
+        tmp = f"{self.file}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.file)
+
+    def listing(self, directory: str) -> Optional[Dict[str, bool]]:
+        if(directory in self.listings):
+            return self.listings[directory]
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except(OSError):
+            # missing, the path finder skips it
+            self.listings[directory] = {}
+            return {}
+        saved = self.saved.get(directory)
+        if(saved and saved[0] == mtime):
+            self.reused += 1
+            self.listings[directory] = listing = saved[1]
+            return listing
+        try:
+            with os.scandir(directory) as entries:
+                listing = {entry.name: entry.is_dir() for entry in entries}
+        except(NotADirectoryError):
+            listing = None
+        except(OSError):
+            listing = {}
+        self.listed += 1
+        self.listings[directory] = listing
+        self.mtimes[directory] = mtime
+        return listing
+
+    def find_module(self, name: str, path: List[str]):
+        self.lookups += 1
+        for directory in path:
+            listing = self.listing(directory)
+            if(listing is None):
+                try:
+                    return _find_module(name, [directory])
+                except(ImportError):
+                    continue
+            # a package is found before a module of the same name
+            if(listing.get(name)):
+                package = os.path.join(directory, name)
+                init = self.listing(package) or {}
+                for suffix, _ in KINDS:
+                    if(init.get("__init__" + suffix) is False):
+                        return None, package, ("", "", _PKG_DIRECTORY)
+            for suffix, kind in KINDS:
+                if(listing.get(name + suffix) is False):
+                    file_path = os.path.join(directory, name + suffix)
+                    return io.open_code(file_path), file_path, (os.path.splitext(file_path)[-1], "rb", kind)
+        raise ImportError("No module named {name!r}".format(name=name), name=name)
+
+    def statistics(self) -> Dict[str, int]:
+        return {
+            "resolver lookups": self.lookups,
+            "directories listed": self.listed,
+            "listings reused": self.reused,
+        }
@@ -5,32 +5,48 @@ from typing import Dict, List, Set, Tuple, Union
 from PyPt.PTA.ObjectPool import OBJ_BUILTIN, OBJ_CLASS, OBJ_CLASS_METHOD, OBJ_FAKE, OBJ_FUNCTION, OBJ_MODULE, OBJ_STATIC_METHOD, OBJ_SUPER, ObjectPool
 
 from .AttrGraph import AttrGraph
+from ..Graph import stronglyConnectedComponents
 from ..IR.ClassCodeBlock import ClassCodeBlock
 
-from ..IR.ModuleCodeBlock import ModuleCodeBlock
+from ..IR.ModuleCodeBlock import LazyModule, ModuleCodeBlock
 
 from ..IR.CodeBlock import CodeBlock
+from ..IR.FunctionCodeBlock import FunctionCodeBlock
 
 from ..IR.IRStmts import Assign, Call, DelAttr, GetAttr, IRStmt, NewBuiltin, NewClass, NewFunction, NewModule, NewStaticMethod, NewSuper, SetAttr, Variable
 from .ClassHiearchy import MRO, ClassHiearchy
-from .Objects import BuiltinObject, ClassMethodObject, ClassObject, FakeObject, FunctionObject,  ModuleObject, Object, StaticMethodObject, SuperObject
+from .Objects import HEAP_SITE, BuiltinObject, ClassMethodObject, ClassObject, FakeObject, FunctionObject,  ModuleObject, Object, StaticMethodObject, SuperObject
 from .BindingStmts import BindingStmts
+from .Budget import DEGRADE_CONTAINERS, DEGRADE_CONTEXTS, DEGRADE_STOP, DEGRADE_WIDEN, LADDER, Budget
+from .Widening import UNKNOWN_KIND, Widening, summaryID
 from .PointerFlow import PointerFlow
 from .Pointers import AttrPtr, Pointer, VarPtr
-from .PointToSet import PointToSet
+from .PointToSet import PointToSet, createPointToSet
+from .SymbolTable import SymbolTable, symbols
+from .WorkList import ADD_POINTS_TO, BIND_STMT, WorkList, createWorkList
 
 FAKE_PREFIX = "$r_"
+# calling a class calls the __init__ it resolves to through a variable with this prefix
+INIT_PREFIX = "$init_method_of_"
 # builtin_functions = ["abs", "aiter", "all", "any", "anext", "ascii", "bin", "bool", "breakpoint", "bytearray", "bytes", "callable", "chr", "classmethod", "compile", "complex", "delattr", "dict", "dir", "divmod", "enumerate", "eval", "exec", "filter", "float", "format", "frozenset", "getattr", "globals", "hasattr", "hash", "help", "hex", "id", "input", "int", "isinstance", "issubclass", "iter", "len", "list", "locals", "map", "max", "memoryview", "min", "next", "object", "oct", "open", "ord", "pow", "print", "property", "range", "repr", "reversed", "round", "set", "setattr", "slice", "sorted", "staticmethod", "str", "sum", "super", "tuple", "type", "vars", "zip", "__import__"]
 
 def isFakeAttr(attr: str):
     return attr.startswith(FAKE_PREFIX)
 
+# objects flowing into fake attributes may be transformed
+def isTransforming(ptr: Pointer):
+    return isinstance(ptr, AttrPtr) and isFakeAttr(ptr.attr)
+
+# attributes elements of tuples are kept in, with $values they are the elements of containers
+TUPLE_ELEMENTS = "$tupleElements"
+VALUES = "$values"
+
+def isElementAttr(attr: str):
+    return attr == TUPLE_ELEMENTS or (attr.startswith("$") and attr[1:].lstrip("-").isdigit())
+
 Resolver = Union[ClassObject, SuperObject]
 ResolveInfo = Tuple[Resolver, MRO, int]
 
-ADD_POINTS_TO = 1
-BIND_STMT = 2
-
 class Analysis:
     pointToSet: PointToSet
     callgraph: Dict[str, Set[str]]
@@ -42,20 +58,34 @@ class Analysis:
     classHiearchy: ClassHiearchy
     persist_attr: Dict[ClassObject, Dict[str, Set[ResolveInfo]]]
     resolved_attr: Dict[Resolver, Set[str]]
-    workList: List[Tuple[Pointer, Set[Object]]]
-    def __init__(self, verbose=False):
-        self.pointToSet = PointToSet()
+    workList: WorkList
+    def __init__(self, verbose=False, worklist="fifo", collapseCycles=True, pointToSet="set", budget: Budget=None, widening: Widening=None, heap: str=HEAP_SITE):
+        self.symbols = SymbolTable()
+        symbols.use(self.symbols)
+        self.pointToSet = createPointToSet(pointToSet)
         self.callgraph = defaultdict(set)
         self.pointerFlow = PointerFlow()
         self.attrGraph = AttrGraph()
         self.bindingStmts = BindingStmts()
-        self.objectPool = ObjectPool()
+        self.objectPool = ObjectPool(heap)
         self.reachable = set()
         self.classHiearchy = ClassHiearchy(self.pointToSet)
         self.persist_attr = defaultdict(dict)
         self.resolved_attr = defaultdict(set)
-        self.workList = []
+        self.workList = createWorkList(worklist, self.pointerFlow)
+        self.collapseCycles = collapseCycles
+        self.checkedEdges = set()
+        self.collapsedCycles = 0
         self.verbose = verbose
+        self.budget = budget
+        # steps of the ladder taken, those that changed nothing aren't listed in degradations
+        self.degradeLevel = 0
+        self.degradations = []
+        self.widening = widening
+        # the limit widening starts with when the budget asks for it
+        self.widenLimit = 32
+        self.widened = {}
+        self.collapsedContainers = False
 
         self.processStmts = {
             # "GetAttr": self.processGetAttr,
@@ -74,12 +104,17 @@ class Analysis:
         if(not codeBlock or codeBlock in self.reachable):
             return
         self.reachable.add(codeBlock)
+        if(isinstance(codeBlock, FunctionCodeBlock) and codeBlock.pendingBody):
+            self.addGrown(codeBlock.pendingBody.lower(codeBlock))
+        # loading a module lazily may add statements to this code block while they are added
+        self.addStmts(list(codeBlock.stmts))
 
+    def addStmts(self, stmts: List[IRStmt]):
         # Add codes into the pool
-        for stmt in codeBlock.stmts:
+        for stmt in stmts:
             self.workList.append((BIND_STMT, stmt))
 
-        for stmt in codeBlock.stmts:
+        for stmt in stmts:
             if(isinstance(stmt, Assign)):
                 sourcePtr = VarPtr.create(stmt.source)
                 targetPtr = VarPtr.create(stmt.target)
@@ -98,6 +133,8 @@ class Analysis:
                 self.addSetEdge(targetPtr, sourcePtr, stmt.attr, self.pointToSet.get(targetPtr))
 
             elif(isinstance(stmt, NewModule)):
+                if(isinstance(stmt.module, LazyModule)):
+                    self.loadModule(stmt)
                 if(isinstance(stmt.module, ModuleCodeBlock)):
                     obj = self.objectPool.create(OBJ_MODULE, stmt.module)
                     targetPtr = VarPtr.create(stmt.target)
@@ -144,107 +181,163 @@ class Analysis:
                 self.workList.append((ADD_POINTS_TO, targetPtr, {obj}))
         
 
+    # The module is found and generated the first time an import of it is reached.
+    def loadModule(self, stmt: NewModule):
+        stmt.module, grown = stmt.module.load()
+        self.addGrown(grown)
+
+    # Binding submodules adds statements to their packages, which may be reachable already.
+    def addGrown(self, grown: Dict[CodeBlock, int]):
+        grown = [codeBlock.stmts[size:] for codeBlock, size in grown.items() if codeBlock in self.reachable]
+        for stmts in grown:
+            self.addStmts(stmts)
+
     def analyze(self, entrys: CodeBlock):
+        symbols.use(self.symbols)
         for entry in entrys:
             if(isinstance(entry, ModuleCodeBlock)):
                 obj = self.objectPool.create(OBJ_MODULE, entry)
                 self.workList.append((ADD_POINTS_TO, VarPtr.create(entry.globalVariable), {obj}))
             self.addReachable(entry)
 
-        
+        self.solve()
+
+    def solve(self):
+        symbols.use(self.symbols)
+        # counted down here, so that checking the budget costs nothing in between
+        budget = self.budget
+        countdown = -1
+        if(budget is not None):
+            budget.start()
+            countdown = 1
         while(len(self.workList) > 0):
+            countdown -= 1
+            if(countdown == 0):
+                if(not self.degrade(budget.level())):
+                    break
+                countdown = budget.next()
 
             if(self.verbose):
                 print(f"PTA worklist remains {len(self.workList):<10} to process.                \r", end="")
 
-            type, *args = self.workList[0]
-            del self.workList[0]
+            type, *args = self.workList.pop()
 
             if(type == ADD_POINTS_TO):
-                ptr, objs = args
-                if(len(objs) == 0):
-                    continue
+                self.propagate(*args)
 
-                objs = self.pointToSet.putAll(ptr, objs)
-                if(objs):
-                    for succ in self.pointerFlow.successors(ptr):
-                        self.flow(ptr,succ, objs)
+            elif(type == BIND_STMT):
+                self.bindStmt(*args)
 
-                if(not isinstance(ptr, VarPtr)):
-                    continue
-                for target, attr in self.attrGraph.getTargets(ptr):
-                    self.addGetEdge(target, ptr, attr, objs)
-                
-                for source, attr in self.attrGraph.setSources(ptr):
-                    self.addSetEdge(ptr, source, attr, objs)
+    def propagate(self, ptr: Pointer, objs: Set[Object]):
+        ptr = self.pointerFlow.find(ptr)
+        if(self.widened):
+            objs = {self.widened.get(obj, obj) for obj in objs}
+        objs = self.pointToSet.putAll(ptr, objs)
+        if(not objs):
+            return
+        if(self.widening is not None):
+            objs = self.widenSurplus(ptr, objs)
+
+        cycleCandidates = []
+        for succ in self.pointerFlow.successors(ptr):
+            self.flow(ptr, succ, objs)
+            if(self.collapseCycles and self.pointToSet.equal(succ, ptr)
+                    and (ptr, succ) not in self.checkedEdges):
+                cycleCandidates.append(succ)
+
+        for member in self.pointerFlow.members(ptr):
+            self.processPointer(member, objs)
+
+        for succ in cycleCandidates:
+            self.checkedEdges.add((ptr, succ))
+            self.detectCycle(succ)
+
+    # statements that depend on the point-to set of this pointer
+    def processPointer(self, ptr: Pointer, objs: Set[Object]):
+        if(not isinstance(ptr, VarPtr)):
+            return
+        for target, attr in self.attrGraph.getTargets(ptr):
+            self.addGetEdge(target, ptr, attr, objs)
+        
+        for source, attr in self.attrGraph.setSources(ptr):
+            self.addSetEdge(ptr, source, attr, objs)
 
-                for opname, process in self.processStmts.items():
-                    for stmtInfo in self.bindingStmts.get(opname, ptr):
-                        process(stmtInfo, objs)
+        for opname, process in self.processStmts.items():
+            for stmtInfo in self.bindingStmts.get(opname, ptr):
+                process(stmtInfo, objs)
 
+    # Lazy cycle detection: a successor already having the same point-to set hints a cycle.
+    # Fake attributes transform objects flowing into them, so cycles through them are never collapsed.
+    def detectCycle(self, start: Pointer):
+        def successors(ptr):
+            return [succ for succ in self.pointerFlow.successorReps(ptr) if not isTransforming(succ)]
 
-            if(type == BIND_STMT):
-                stmt, = args
-                
-                # if(isinstance(stmt, SetAttr)):
-                #     # print(f"Bind SetAttr: {stmt.target} - {stmt}")
-                #     varPtr = VarPtr.create(stmt.target)
-                #     stmtInfo = (stmt, )
-                #     self.bindingStmts.bind("SetAttr", varPtr, stmtInfo)
-                #     self.processSetAttr(stmtInfo, self.pointToSet.get(varPtr))
-
-                # elif(isinstance(stmt, GetAttr)):
-                #     # print(f"Bind GetAttr: {stmt.source} - {stmt}")
-                #     varPtr = VarPtr.create(stmt.source)
-                #     stmtInfo = (stmt, )
-                #     self.bindingStmts.bind("GetAttr", varPtr, stmtInfo)
-                #     self.processGetAttr(stmtInfo, self.pointToSet.get(varPtr))
-
-                if(isinstance(stmt, NewClass)):
-                    for i in range(len(stmt.bases)):
-                        # print(f"Bind Base: {stmt.bases[i]} - {stmt} - {i}")
-                        varPtr = VarPtr.create(stmt.bases[i])
-                        stmtInfo = (stmt, i)
-                        self.bindingStmts.bind("NewClass", varPtr, stmtInfo)
-                        self.processNewClass(stmtInfo, self.pointToSet.get(varPtr))
-
-                elif(isinstance(stmt, Call)):
-                    # print(f"Bind Call: {stmt.callee} - {stmt}")
-                    varPtr = VarPtr.create(stmt.callee)
-                    stmtInfo = (stmt, )
-                    self.bindingStmts.bind("Call", varPtr, stmtInfo)
-                    self.processCall(stmtInfo, self.pointToSet.get(varPtr))
-
-                elif(isinstance(stmt, DelAttr)):
-                    # print(f"Bind DelAttr: {stmt.var} - {stmt}")
-                    varPtr = VarPtr.create(stmt.var)
-                    stmtInfo = (stmt, )
-                    self.bindingStmts.bind("DelAttr", varPtr, stmtInfo)
-                    self.processDelAttr(stmtInfo, self.pointToSet.get(varPtr))
-                
-                # elif(isinstance(stmt, NewClassMethod)):
-                #     varPtr = VarPtr.create(stmt.func)
-                #     stmtInfo = (stmt, )
-                #     self.bindingStmts.bind("NewClassMethod", varPtr, stmtInfo)
-                #     self.processNewClassMethod(stmtInfo, self.pointToSet.get(varPtr))
-
-                elif(isinstance(stmt, NewStaticMethod)):
-                    varPtr = VarPtr.create(stmt.func)
-                    stmtInfo = (stmt, )
-                    self.bindingStmts.bind("NewStaticMethod", varPtr, stmtInfo)
-                    self.processNewStaticMethod(stmtInfo, self.pointToSet.get(varPtr))
-
-                elif(isinstance(stmt, NewSuper)):
-                    
-                    varPtr = VarPtr.create(stmt.type)
-                    stmtInfo = (stmt, "type")
-                    self.bindingStmts.bind("NewSuper", varPtr, stmtInfo)
-                    self.processNewSuper(stmtInfo, self.pointToSet.get(varPtr))
-
-                    varPtr = VarPtr.create(stmt.bound)
-                    stmtInfo = (stmt, "bound")
-                    self.bindingStmts.bind("NewSuper", varPtr, stmtInfo)
-                    self.processNewSuper(stmtInfo, self.pointToSet.get(varPtr))
+        start = self.pointerFlow.find(start)
+        if(isTransforming(start)):
+            return
+        for component in stronglyConnectedComponents([start], successors):
+            if(len(component) > 1):
+                self.collapse(component)
+
+    def collapse(self, component: List[Pointer]):
+        rep = self.pointerFlow.merge(component)
+        deltas = self.pointToSet.merge(rep, self.pointerFlow.members(rep))
+        self.collapsedCycles += 1
+
+        merged = self.pointToSet.get(rep)
+        if(merged):
+            for succ in self.pointerFlow.successors(rep):
+                self.flow(rep, succ, merged)
+        for member, delta in deltas.items():
+            if(delta):
+                self.processPointer(member, delta)
+
+    def bindStmt(self, stmt: IRStmt):
+        if(isinstance(stmt, NewClass)):
+            for i in range(len(stmt.bases)):
+                # print(f"Bind Base: {stmt.bases[i]} - {stmt} - {i}")
+                varPtr = VarPtr.create(stmt.bases[i])
+                stmtInfo = (stmt, i)
+                self.bindingStmts.bind("NewClass", varPtr, stmtInfo)
+                self.processNewClass(stmtInfo, self.pointToSet.get(varPtr))
+
+        elif(isinstance(stmt, Call)):
+            # print(f"Bind Call: {stmt.callee} - {stmt}")
+            varPtr = VarPtr.create(stmt.callee)
+            stmtInfo = (stmt, )
+            self.bindingStmts.bind("Call", varPtr, stmtInfo)
+            self.processCall(stmtInfo, self.pointToSet.get(varPtr))
+
+        elif(isinstance(stmt, DelAttr)):
+            # print(f"Bind DelAttr: {stmt.var} - {stmt}")
+            varPtr = VarPtr.create(stmt.var)
+            stmtInfo = (stmt, )
+            self.bindingStmts.bind("DelAttr", varPtr, stmtInfo)
+            self.processDelAttr(stmtInfo, self.pointToSet.get(varPtr))
+        
+        # elif(isinstance(stmt, NewClassMethod)):
+        #     varPtr = VarPtr.create(stmt.func)
+        #     stmtInfo = (stmt, )
+        #     self.bindingStmts.bind("NewClassMethod", varPtr, stmtInfo)
+        #     self.processNewClassMethod(stmtInfo, self.pointToSet.get(varPtr))
+
+        elif(isinstance(stmt, NewStaticMethod)):
+            varPtr = VarPtr.create(stmt.func)
+            stmtInfo = (stmt, )
+            self.bindingStmts.bind("NewStaticMethod", varPtr, stmtInfo)
+            self.processNewStaticMethod(stmtInfo, self.pointToSet.get(varPtr))
+
+        elif(isinstance(stmt, NewSuper)):
+            
+            varPtr = VarPtr.create(stmt.type)
+            stmtInfo = (stmt, "type")
+            self.bindingStmts.bind("NewSuper", varPtr, stmtInfo)
+            self.processNewSuper(stmtInfo, self.pointToSet.get(varPtr))
+
+            varPtr = VarPtr.create(stmt.bound)
+            stmtInfo = (stmt, "bound")
+            self.bindingStmts.bind("NewSuper", varPtr, stmtInfo)
+            self.processNewSuper(stmtInfo, self.pointToSet.get(varPtr))
 
     def addFlow(self, source: Pointer, target: Pointer):
         if(self.pointerFlow.put(source, target)):
@@ -301,10 +394,10 @@ class Analysis:
 
         mro, start = resolveInfo
 
-        childAttr = AttrPtr(obj, FAKE_PREFIX + attr)
+        childAttr = AttrPtr.create(obj, FAKE_PREFIX + attr)
         for i in range(start, len(mro)):
             parent = mro[i]
-            parentAttr = AttrPtr(parent, attr)
+            parentAttr = AttrPtr.create(parent, attr)
             self.addFlow(parentAttr, childAttr)
             try:
                 self.persist_attr[parent][attr].add((obj, mro, i))
@@ -342,15 +435,25 @@ class Analysis:
     def addSetEdge(self, target: VarPtr, source: VarPtr, attr: str, objs: Set[Object]):
         # stmt,  = *stmtInfo,
         # assert(isinstance(stmt, SetAttr))
+        if(self.collapsedContainers and isElementAttr(attr)):
+            attr = VALUES
+        widened = self.widened
         for obj in objs:
-            attrPtr = AttrPtr(obj, attr)
+            if(widened):
+                obj = widened.get(obj, obj)
+            attrPtr = AttrPtr.create(obj, attr)
             self.addFlow(source, attrPtr)
 
     def addGetEdge(self, target: VarPtr, source: VarPtr, attr:str, objs: Set[Object]):
         # stmt, = *stmtInfo, 
         # assert(isinstance(stmt, GetAttr))
+        if(self.collapsedContainers and isElementAttr(attr)):
+            attr = VALUES
+        widened = self.widened
         for obj in objs:
-            
+            if(widened):
+                obj = widened.get(obj, obj)
+
             if(isinstance(obj, FakeObject)):
                
                 fakeObj = self.objectPool.create(OBJ_FAKE, obj, (source, target, attr))
@@ -371,17 +474,17 @@ class Analysis:
             if(isinstance(obj, ClassObject)):
                 self.resolveAttrIfNot(obj, attr)
                 # instance.attr <- class.$r_attr
-                classAttr = AttrPtr(obj, FAKE_PREFIX + attr)
+                classAttr = AttrPtr.create(obj, FAKE_PREFIX + attr)
                 self.addFlow(classAttr, target)
 
             elif(isinstance(obj, SuperObject)):
                 self.resolveAttrIfNot(obj, attr)
                 # instance.attr <- class.$r_attr
-                superAttr = AttrPtr(obj, FAKE_PREFIX + attr)
+                superAttr = AttrPtr.create(obj, FAKE_PREFIX + attr)
                 self.addFlow(superAttr, target)
 
             else:
-                attrPtr = AttrPtr(obj, attr)
+                attrPtr = AttrPtr.create(obj, attr)
                 self.addFlow(attrPtr, target)
 
     def processNewClass(self, stmtInfo: Tuple[NewClass, int], objs: Set[Object]):
@@ -481,11 +584,11 @@ class Analysis:
                 
                 # target <- instance.attr
                 # insAttr = AttrPtr(insObj, FAKE_PREFIX + "__init__")
-                classAttr = AttrPtr(obj, FAKE_PREFIX + "__init__")
+                classAttr = AttrPtr.create(obj, FAKE_PREFIX + "__init__")
                 # self.addFlow(classAttr, insAttr)
                 self.resolveAttrIfNot(obj, "__init__")
 
-                init = Variable(f"$init_method_of_{obj.id}", stmt.belongsTo)
+                init = Variable(f"{INIT_PREFIX}{obj.id}", stmt.belongsTo)
                 initPtr = VarPtr.create(init)
                 self.addFlow(classAttr, initPtr)
                 newStmt = Call(Variable("", stmt.belongsTo), init, stmt.posargs, stmt.kwargs, stmt.belongsTo, stmt.belongsTo.getNewID())
@@ -578,6 +681,95 @@ class Analysis:
     def addCallEdge(self, callsite: IRStmt, callee: str):
         self.callgraph[callsite.belongsTo.readable_name].add(callee)
 
+    # Takes the steps of the ladder up to the level, returns False if the analysis should stop.
+    def degrade(self, level: int) -> bool:
+        while(self.degradeLevel < level):
+            step = LADDER[self.degradeLevel]
+            self.degradeLevel += 1
+            if(step == DEGRADE_CONTEXTS and not self.dropContexts()):
+                continue
+            self.degradations.append(step)
+            if(self.verbose):
+                print(f"PTA is over its budget, {step}.                ")
+            if(step == DEGRADE_WIDEN):
+                self.widenPointToSets()
+            elif(step == DEGRADE_CONTAINERS):
+                self.collapseContainers()
+            elif(step == DEGRADE_STOP):
+                return False
+        return True
+
+    # there are no contexts to drop, see the context sensitive analysis, returns whether any were
+    def dropContexts(self) -> bool:
+        return False
+
+    # Objects past the limit of their kind in the pointer are widened, the summaries flow on instead of them.
+    def widenSurplus(self, ptr: Pointer, objs: Set[Object]) -> Set[Object]:
+        surplus = self.widening.count(ptr, objs)
+        if(not surplus):
+            return objs
+        for obj in surplus:
+            if(obj not in self.widened):
+                self.widen(obj)
+        widened = self.widened
+        summaries = self.pointToSet.putAll(ptr, {widened[obj] for obj in surplus})
+        self.widening.record(ptr, surplus, len(summaries), len(self.pointerFlow.successors(ptr)))
+        return {obj for obj in objs if obj not in widened}.union(summaries)
+
+    # The budget turns widening on, for the point-to sets solved so far too.
+    def widenPointToSets(self):
+        if(self.widening is None):
+            self.widening = Widening(self.widenLimit)
+        for ptr in self.pointToSet.allPointers():
+            ptr = self.pointerFlow.find(ptr)
+            if(ptr in self.widening.counts):
+                continue
+            objs = self.pointToSet.get(ptr)
+            if(len(objs) > self.widening.limit):
+                # the successors have the objects already, they are read and written through the summaries from now on
+                surplus = self.widening.count(ptr, objs)
+                for obj in surplus:
+                    if(obj not in self.widened):
+                        self.widen(obj)
+                self.widening.record(ptr, surplus, 0, 0)
+
+    # From now on the object flows as the summary of its kind, and its attributes are those of the summary.
+    # Its attributes so far flow both ways with them, so those who have read or written them see the same.
+    def widen(self, obj: BuiltinObject):
+        kind = obj.type or UNKNOWN_KIND
+        summary = self.objectPool.add(BuiltinObject(summaryID(kind), kind))
+        self.widened[obj] = summary
+        for attrPtr in list(obj.attrPtrs.values()):
+            self.addBothFlows(attrPtr, AttrPtr.create(summary, attrPtr.attr))
+
+    # Elements of tuples are kept in $values from now on, like those of other containers.
+    def collapseContainers(self):
+        self.collapsedContainers = True
+        for obj in list(self.objectPool.pool.values()):
+            for attrPtr in list(obj.attrPtrs.values()):
+                if(isElementAttr(attrPtr.attr)):
+                    self.addBothFlows(attrPtr, AttrPtr.create(obj, VALUES))
+
+    def addBothFlows(self, a: Pointer, b: Pointer):
+        self.addFlow(a, b)
+        self.addFlow(b, a)
+
+    def statistics(self) -> Dict[str, int]:
+        stats = self.workList.statistics()
+        stats["reachable"] = len(self.reachable)
+        stats["pointers"] = len(self.pointerFlow.forward)
+        stats["flows"] = sum(len(s) for s in self.pointerFlow.forward.values())
+        stats |= self.pointToSet.statistics()
+        stats["collapsed cycles"] = self.collapsedCycles
+        stats["merged pointers"] = len(self.pointerFlow.parent)
+        if(self.budget is not None):
+            stats["budget checks"] = self.budget.checks
+            stats["degradations"] = ", ".join(self.degradations) or "none"
+        if(self.widening is not None):
+            stats["widened objects"] = len(self.widened)
+            stats |= self.widening.statistics()
+        return stats
+
 
         
 
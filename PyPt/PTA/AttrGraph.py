@@ -4,11 +4,12 @@ from typing import Dict, Set, Tuple
 from .Pointers import Pointer, VarPtr
 
 
+# keyed by the index of the pointer
 class AttrGraph:
-    get_forward: Dict[VarPtr, Set[Tuple[VarPtr, str]]]
+    get_forward: Dict[int, Set[Tuple[VarPtr, str]]]
     # get_backward: Dict[VarPtr, Set[Tuple[VarPtr, str]]]
     # set_forward: Dict[VarPtr, Set[Tuple[VarPtr, str]]]
-    set_backward: Dict[VarPtr, Set[Tuple[VarPtr, str]]]
+    set_backward: Dict[int, Set[Tuple[VarPtr, str]]]
     def __init__(self):
         self.get_forward = defaultdict(set)
         # self.get_backward = defaultdict(set)
@@ -18,8 +19,9 @@ class AttrGraph:
     def putGet(self, target: VarPtr, source: VarPtr, attr: str) -> bool:
         forward_tuple = (target, attr)
         # backward_tuple = (source, attr)
-        if(forward_tuple not in self.get_forward[source]):
-            self.get_forward[source].add(forward_tuple)
+        forward = self.get_forward[source.index]
+        if(forward_tuple not in forward):
+            forward.add(forward_tuple)
             # self.get_backward[target].add(backward_tuple)
             return True
         else:
@@ -28,15 +30,16 @@ class AttrGraph:
     def putSet(self, target: VarPtr, source: VarPtr, attr: str) -> bool:
         # forward_tuple = (target, attr)
         backward_tuple = (source, attr)
-        if(backward_tuple not in self.set_backward[target]):
+        backward = self.set_backward[target.index]
+        if(backward_tuple not in backward):
             # self.set_forward[source].add(forward_tuple)
-            self.set_backward[target].add(backward_tuple)
+            backward.add(backward_tuple)
             return True
         else:
             return False
 
     def getTargets(self, source) -> Set[Pointer]:
-        return self.get_forward[source]
+        return self.get_forward.get(source.index, ())
             
     # def getSources(self, target) -> Set[Pointer]:
     #     return self.get_backward[target]
@@ -45,6 +48,6 @@ class AttrGraph:
     #     return self.set_forward[source]
             
     def setSources(self, target) -> Set[Pointer]:
-        return self.set_backward[target]
+        return self.set_backward.get(target.index, ())
 
     
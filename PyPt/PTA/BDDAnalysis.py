@@ -0,0 +1,256 @@
+from collections import defaultdict
+import json
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from ..BDD import BDD, FALSE, TRUE, Domain
+from .Analysis import Analysis, isTransforming
+from . import json_utils
+from .ClassHiearchy import ClassHiearchy
+from .Objects import Object
+from .Pointers import Pointer, VarPtr
+from .PointToSet import PointToSet
+from .SymbolTable import symbols
+from .WorkList import ADD_POINTS_TO, BIND_STMT
+
+BITS = 24
+GC_THRESHOLD = 1 << 16
+
+# The objects of a node of the point-to relation, read from the BDD as they are iterated.
+# Nodes are renumbered when garbage is collected, so a view is only good until then, see BDDAnalysis.solve.
+class BDDObjects:
+    __slots__ = ("pointToSet", "node")
+
+    def __init__(self, pointToSet: 'BDDPointToSet', node: int):
+        self.pointToSet = pointToSet
+        self.node = node
+
+    def __iter__(self) -> Iterator[Object]:
+        pts = self.pointToSet
+        return (symbols.object(index) for index in pts.bdd.values(self.node, pts.objectDomain))
+
+    def __len__(self):
+        return self.pointToSet.bdd.count(self.node, self.pointToSet.objectDomain.vars)
+
+    def __bool__(self):
+        return self.node != FALSE
+
+    def __contains__(self, obj: Object):
+        pts = self.pointToSet
+        return pts.bdd.follow(self.node, pts.objectDomain, obj.index) == TRUE
+
+    # the worklist unions deltas of a pointer
+    def __or__(self, objs: Iterable[Object]) -> 'BDDObjects':
+        pts = self.pointToSet
+        return BDDObjects(pts, pts.bdd.or_(self.node, pts.encodeObjects(objs)))
+
+    __ror__ = __or__
+
+# The points-to relation pt(pointer, object) as one BDD.
+# Pointers and objects are encoded by their indices in the symbol table.
+# Variables of the source and target pointer of a flow are interleaved, objects come after them,
+# so renaming targets to sources keeps the order of the variables, and the objects of a pointer are the node
+# its path leads to, found without making nodes. Pointers are encoded from the most significant bit,
+# objects from the least, so the unused high bits of both are shared by all of them.
+class BDDPointToSet(PointToSet):
+    bdd: BDD
+    pt: int
+
+    def __init__(self, bits: int=BITS):
+        self.bits = bits
+        self.bdd = BDD(3 * bits)
+        self.sourceDomain = Domain([2 * i for i in range(bits)])
+        self.targetDomain = Domain([2 * i + 1 for i in range(bits)])
+        self.objectDomain = Domain([2 * bits + i for i in range(bits)], lsbFirst=True)
+        self.targetToSource = dict(zip(self.targetDomain.vars, self.sourceDomain.vars))
+        self.pt = FALSE
+
+    def _index(self, index: int) -> int:
+        if(index >> self.bits):
+            raise ValueError(f"Index {index} doesn't fit in {self.bits} bits of the BDD.")
+        return index
+
+    def encodeObjects(self, objs: Iterable[Object]) -> int:
+        if(isinstance(objs, BDDObjects)):
+            return objs.node
+        return self.bdd.encodeAll(self.objectDomain, [self._index(obj.index) for obj in objs])
+
+    def encode(self, pointer: Pointer, objs: Iterable[Object]) -> int:
+        return self.bdd.encode(self.sourceDomain, self._index(pointer.index), self.encodeObjects(objs))
+
+    # pt of many pointers at once, from the nodes of their objects
+    def encodeRows(self, rows: Dict[Pointer, int]) -> int:
+        return self.bdd.encodeMap(self.sourceDomain, {self._index(pointer.index): node for pointer, node in rows.items()})
+
+    def edge(self, source: Pointer, target: Pointer) -> int:
+        return self.bdd.encodeEach([(self.sourceDomain, self._index(source.index)), (self.targetDomain, self._index(target.index))])
+
+    # pt of the targets of the flows, given pt of their sources
+    def image(self, flows: int, pt: int) -> int:
+        targets = self.bdd.relprod(flows, pt, self.sourceDomain.varSet)
+        return self.bdd.replace(targets, self.targetToSource, "targetToSource")
+
+    # the objects of the pointer in a relation
+    def row(self, pt: int, pointer: Pointer) -> int:
+        return self.bdd.follow(pt, self.sourceDomain, pointer.index)
+
+    # pointers of a relation, each with the node of its objects
+    def rows(self, pt: int) -> Iterator[Tuple[Pointer, int]]:
+        return ((symbols.pointer(index), node) for index, node in self.bdd.paths(pt, self.sourceDomain))
+
+    def pointers(self, pt: int) -> List[Pointer]:
+        return [pointer for pointer, _ in self.rows(pt)]
+
+    def objectsOf(self, pt: int, pointer: Pointer) -> BDDObjects:
+        return BDDObjects(self, self.row(pt, pointer))
+
+    def put(self, pointer: Pointer, obj: Object) -> bool:
+        return bool(self.putAll(pointer, (obj, )))
+
+    def putAll(self, pointer: Pointer, objs: Iterable[Object]) -> BDDObjects:
+        new = self.bdd.diff(self.encode(pointer, objs), self.pt)
+        self.pt = self.bdd.or_(self.pt, new)
+        return self.objectsOf(new, pointer)
+
+    def get(self, pointer: Pointer) -> BDDObjects:
+        return self.objectsOf(self.pt, pointer)
+
+    def equal(self, a: Pointer, b: Pointer) -> bool:
+        return self.row(self.pt, a) == self.row(self.pt, b)
+
+    def merge(self, rep: Pointer, pointers: List[Pointer]) -> Dict[Pointer, BDDObjects]:
+        bdd = self.bdd
+        union = self.row(self.pt, rep)
+        for pointer in pointers:
+            union = bdd.or_(union, self.row(self.pt, pointer))
+        deltas = {}
+        for pointer in [rep] + pointers:
+            gained = BDDObjects(self, bdd.diff(union, self.row(self.pt, pointer)))
+            self.pt = bdd.or_(self.pt, self.encode(pointer, gained))
+            deltas[pointer] = gained
+        del deltas[rep]
+        return deltas
+
+    def statistics(self) -> Dict[str, int]:
+        return {
+            "point-to facts": self.bdd.count(self.pt, self.sourceDomain.vars + self.objectDomain.vars),
+            "point-to bdd nodes": self.bdd.size(self.pt),
+            "bdd nodes": len(self.bdd),
+            "bdd bytes": self.bdd.sizeof(),
+        }
+
+    def allPointers(self) -> List[Pointer]:
+        return self.pointers(self.pt)
+
+    def getAllAttr(self, obj: Object):
+        return [ptr.attr for ptr in obj.attrPtrs.values() if self.get(ptr)]
+
+    def to_json(self):
+        sets = {str(ptr): set(BDDObjects(self, node)) for ptr, node in self.rows(self.pt)}
+        return json.dumps(sets, default=json_utils.default, indent=4)
+
+
+# Propagates points-to facts as relational products instead of pointer by pointer.
+# Each round takes the new facts, moves them along every flow at once,
+# and only enumerates them for pointers that statements or transforming flows depend on.
+# Copy cycles need no special treatment, so they are never collapsed.
+class BDDAnalysis(Analysis):
+    pointToSet: BDDPointToSet
+    flows: int                                      # flow(source, target)
+    pending: int                                    # facts found but not yet propagated
+    added: Dict[Pointer, int]                       # facts found since the worklist was last empty, by pointer
+    transformingFlows: Dict[Pointer, Set[Pointer]]
+
+    def __init__(self, verbose=False, worklist="fifo", bits: int=BITS):
+        super().__init__(verbose=verbose, worklist=worklist, collapseCycles=False)
+        self.pointToSet = BDDPointToSet(bits)
+        self.classHiearchy = ClassHiearchy(self.pointToSet)
+        self.flows = FALSE
+        self.pending = FALSE
+        self.added = {}
+        # objects flowing into fake attributes are transformed one by one
+        self.transformingFlows = defaultdict(set)
+        self.rounds = 0
+        self.gcThreshold = GC_THRESHOLD
+
+    def solve(self):
+        pts = self.pointToSet
+        bdd = pts.bdd
+        symbols.use(self.symbols)
+        while(True):
+            while(len(self.workList) > 0):
+                type, *args = self.workList.pop()
+                if(type == ADD_POINTS_TO):
+                    ptr, objs = args
+                    self.addPending(ptr, pts.encodeObjects(objs))
+                elif(type == BIND_STMT):
+                    self.bindStmt(*args)
+            if(self.added):
+                self.pending = bdd.or_(self.pending, pts.encodeRows(self.added))
+                self.added = {}
+            # nothing but the relations refers to nodes while the worklist is empty
+            self.collectGarbage()
+
+            delta = bdd.diff(self.pending, pts.pt)
+            self.pending = FALSE
+            if(delta == FALSE):
+                self.collectGarbage(force=True)
+                break
+            self.rounds += 1
+            if(self.verbose):
+                print(f"PTA round {self.rounds:<10}                \r", end="")
+
+            pts.pt = bdd.or_(pts.pt, delta)
+            self.pending = pts.image(self.flows, delta)
+            for ptr, node in pts.rows(delta):
+                if(self.hasDependents(ptr)):
+                    objs = BDDObjects(pts, node)
+                    self.processPointer(ptr, objs)
+                    for target in self.transformingFlows.get(ptr, ()):
+                        self.flow(ptr, target, objs)
+
+    # facts are gathered by pointer and encoded together when the worklist is empty
+    def addPending(self, ptr: Pointer, objs: int):
+        added = self.added
+        added[ptr] = self.pointToSet.bdd.or_(added[ptr], objs) if ptr in added else objs
+
+    # only the relations are kept between rounds
+    def collectGarbage(self, force=False):
+        pts = self.pointToSet
+        if(not force and len(pts.bdd) < self.gcThreshold):
+            return
+        pts.pt, self.flows, self.pending = pts.bdd.collect([pts.pt, self.flows, self.pending])
+        self.gcThreshold = max(GC_THRESHOLD, 2 * len(pts.bdd))
+
+    def hasDependents(self, ptr: Pointer) -> bool:
+        if(ptr in self.transformingFlows):
+            return True
+        if(not isinstance(ptr, VarPtr)):
+            return False
+        return bool(self.attrGraph.getTargets(ptr) or self.attrGraph.setSources(ptr)
+                    or any(self.bindingStmts.get(opname, ptr) for opname in self.processStmts))
+
+    def addFlow(self, source: Pointer, target: Pointer):
+        pts = self.pointToSet
+        if(isTransforming(target)):
+            if(target not in self.transformingFlows[source]):
+                self.transformingFlows[source].add(target)
+                self.flow(source, target, pts.get(source))
+            return
+
+        flows = pts.bdd.or_(self.flows, pts.edge(source, target))
+        if(flows != self.flows):
+            self.flows = flows
+            # the image of one flow is the row of its source
+            objs = pts.row(pts.pt, source)
+            if(objs != FALSE):
+                self.addPending(target, objs)
+
+    def statistics(self) -> Dict[str, int]:
+        pts = self.pointToSet
+        stats = self.workList.statistics()
+        stats["reachable"] = len(self.reachable)
+        stats["rounds"] = self.rounds
+        stats["flows"] = pts.bdd.count(self.flows, sorted(pts.sourceDomain.vars + pts.targetDomain.vars)) + sum(len(s) for s in self.transformingFlows.values())
+        stats["flow bdd nodes"] = pts.bdd.size(self.flows)
+        stats |= pts.statistics()
+        return stats
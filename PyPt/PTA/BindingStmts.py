@@ -6,8 +6,9 @@ from ..IR.IRStmts import Assign, Call, DelAttr, GetAttr, IRStmt, NewClass, NewSt
 from .Pointers import VarPtr
 
 
+# keyed by the index of the pointer
 class BindingStmts:
-    bindings: Tuple[Dict[VarPtr, Set], ...]
+    bindings: Dict[str, Dict[int, Set]]
     def __init__(self):
         opnames = [
             # "GetAttr",
@@ -23,7 +24,7 @@ class BindingStmts:
             self.bindings[opname] = defaultdict(set)
 
     def bind(self, opname, varPtr: VarPtr, stmtInfo: IRStmt):
-        self.bindings[opname][varPtr].add(stmtInfo)
+        self.bindings[opname][varPtr.index].add(stmtInfo)
 
     def get(self, opname, varPtr: VarPtr):
-        return self.bindings[opname][varPtr]
\ No newline at end of file
+        return self.bindings[opname].get(varPtr.index, ())
\ No newline at end of file
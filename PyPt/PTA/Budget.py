@@ -0,0 +1,74 @@
+import os
+import resource
+import sys
+import time
+from typing import Optional, Tuple
+
+# what the analysis gives up, in order, as more of its budget is used up
+DEGRADE_CONTEXTS = "drop context sensitivity"
+DEGRADE_WIDEN = "widen large point-to sets"
+DEGRADE_CONTAINERS = "collapse container attributes"
+DEGRADE_STOP = "stop"
+LADDER = (DEGRADE_CONTEXTS, DEGRADE_WIDEN, DEGRADE_CONTAINERS, DEGRADE_STOP)
+
+try:
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except(ValueError, AttributeError, OSError):
+    PAGE_SIZE = 4096
+
+# resident memory of this process in bytes. Where the current one can't be read, it is the peak resident memory instead,
+# which getrusage gives in bytes on macOS and in KiB elsewhere.
+def currentRSS() -> int:
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except(OSError, IndexError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+# Time and memory the analysis may use. The clock starts with the analysis.
+# Limits are looked at on the first worklist entry, then every so many entries, the solver counts them down itself,
+# so checking costs nothing in between. How many is set at each check from how fast entries went since the last one,
+# so that checks are about period seconds apart, a twentieth of the time limit at most, and interval entries apart at most.
+# The analysis takes the next step of the ladder each time the used fraction of either limit reaches the next of steps.
+class Budget:
+    def __init__(self, seconds: Optional[float]=None, rss: Optional[int]=None, interval: int=4096, steps: Tuple[float, ...]=(0.5, 0.65, 0.8, 0.95), period: float=0.1):
+        assert(len(steps) == len(LADDER))
+        self.seconds = seconds
+        self.rss = rss
+        self.interval = interval
+        self.steps = steps
+        self.period = min(period, seconds / 20) if seconds is not None else period
+        self.started = None
+        self.lastCheck = None
+        self.entries = 1                            # entries between the last two checks
+        self.checks = 0
+
+    def start(self):
+        if(self.started is None):
+            self.started = time.monotonic()
+        self.lastCheck = time.monotonic()
+
+    def used(self) -> float:
+        used = 0.0
+        if(self.seconds is not None):
+            used = max(used, (time.monotonic() - self.started) / self.seconds if self.seconds > 0 else float("inf"))
+        if(self.rss is not None):
+            used = max(used, currentRSS() / self.rss if self.rss > 0 else float("inf"))
+        return used
+
+    # how many steps of the ladder should have been taken by now
+    def level(self) -> int:
+        self.checks += 1
+        used = self.used()
+        return sum(1 for step in self.steps if used >= step)
+
+    # worklist entries until the next check
+    def next(self) -> int:
+        now = time.monotonic()
+        elapsed = now - self.lastCheck
+        self.lastCheck = now
+        if(elapsed > 0):
+            self.entries = max(1, min(self.interval, int(self.entries * self.period / elapsed)))
+        else:
+            self.entries = min(self.interval, self.entries * 2)
+        return self.entries
@@ -0,0 +1,98 @@
+from collections import defaultdict
+from typing import Dict, List, Set
+
+from ..IR.IRStmts import Call, DelAttr, GetAttr, IRStmt, NewClass, NewStaticMethod, NewSuper, SetAttr
+from .Analysis import Analysis
+from .Budget import Budget
+from .Objects import HEAP_SITE, Object
+from .Pointers import Pointer, VarPtr
+from .Widening import Widening
+
+# Computes the callgraph only, point-to sets that can't change it are left incomplete.
+# The callgraph depends on the point-to sets of callees, of the bases of SetAttr and NewClass,
+# and of the operands of NewSuper and DelAttr, these pointers are relevant from the start.
+# A pointer is relevant if a relevant one depends on it: it flows into it, it is the source of a GetAttr into it,
+# or the function of a NewStaticMethod into it. Flows found while solving make more pointers relevant.
+# Objects reaching a pointer that isn't relevant are kept there, they are propagated once it becomes relevant.
+class CallGraphAnalysis(Analysis):
+    relevant: Set[Pointer]                          # representatives of relevant pointers
+    dependencies: Dict[Pointer, Set[Pointer]]       # pointer -> pointers its point-to set depends on
+
+    def __init__(self, verbose=False, worklist="fifo", collapseCycles=True, pointToSet="set", budget: Budget=None, widening: Widening=None, heap: str=HEAP_SITE):
+        super().__init__(verbose=verbose, worklist=worklist, collapseCycles=collapseCycles, pointToSet=pointToSet, budget=budget, widening=widening, heap=heap)
+        self.relevant = set()
+        self.dependencies = defaultdict(set)
+        self.suspended = 0
+        self.resumed = 0
+
+    def isRelevant(self, ptr: Pointer) -> bool:
+        return self.pointerFlow.find(ptr) in self.relevant
+
+    def depend(self, target: Pointer, source: Pointer):
+        self.dependencies[target].add(source)
+        if(self.isRelevant(target)):
+            self.markRelevant(source)
+
+    # Marks the pointer and what it depends on relevant, then propagates the objects they kept.
+    def markRelevant(self, ptr: Pointer):
+        marked = []
+        stack = [ptr]
+        while(stack):
+            rep = self.pointerFlow.find(stack.pop())
+            if(rep in self.relevant):
+                continue
+            self.relevant.add(rep)
+            marked.append(rep)
+            for member in self.pointerFlow.members(rep):
+                stack += self.dependencies.get(member, ())
+
+        for rep in marked:
+            objs = self.pointToSet.get(rep)
+            if(not objs):
+                continue
+            self.resumed += 1
+            for succ in self.pointerFlow.successors(rep):
+                self.flow(rep, succ, objs)
+            for member in self.pointerFlow.members(rep):
+                self.processPointer(member, objs)
+
+    def addStmts(self, stmts: List[IRStmt]):
+        for stmt in stmts:
+            if(isinstance(stmt, GetAttr)):
+                self.depend(VarPtr.create(stmt.target), VarPtr.create(stmt.source))
+            elif(isinstance(stmt, SetAttr)):
+                self.markRelevant(VarPtr.create(stmt.target))
+            elif(isinstance(stmt, NewStaticMethod)):
+                self.depend(VarPtr.create(stmt.target), VarPtr.create(stmt.func))
+        super().addStmts(stmts)
+
+    def bindStmt(self, stmt: IRStmt):
+        if(isinstance(stmt, NewClass)):
+            for base in stmt.bases:
+                self.markRelevant(VarPtr.create(base))
+        elif(isinstance(stmt, Call)):
+            self.markRelevant(VarPtr.create(stmt.callee))
+        elif(isinstance(stmt, DelAttr)):
+            self.markRelevant(VarPtr.create(stmt.var))
+        elif(isinstance(stmt, NewSuper)):
+            self.markRelevant(VarPtr.create(stmt.type))
+            self.markRelevant(VarPtr.create(stmt.bound))
+        super().bindStmt(stmt)
+
+    def addFlow(self, source: Pointer, target: Pointer):
+        self.depend(target, source)
+        super().addFlow(source, target)
+
+    def propagate(self, ptr: Pointer, objs: Set[Object]):
+        ptr = self.pointerFlow.find(ptr)
+        if(ptr in self.relevant):
+            super().propagate(ptr, objs)
+        elif(self.pointToSet.putAll(ptr, objs)):
+            self.suspended += 1
+
+    def statistics(self) -> Dict[str, int]:
+        stats = super().statistics()
+        stats["relevant pointers"] = len(self.relevant)
+        stats["suspended"] = self.suspended
+        stats["resumed"] = self.resumed
+        return stats
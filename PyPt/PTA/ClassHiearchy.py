@@ -50,7 +50,7 @@ class ClassHiearchy:
         if(isinstance(baseObj, FakeObject)):
             self.addClass(baseObj)
         self.subClasses[baseObj].add((classObj, index))
-        return self.addBaseMRO(classObj, index, self.mros[baseObj])
+        return self.addBaseMRO(classObj, index, self.mros.get(baseObj, set()))
 
     def addBaseMRO(self, classObj: ClassObject, index: int, mroList: Set[MRO]) -> Set[MRO]:
         assert(isinstance(classObj, ClassObject))
@@ -69,7 +69,7 @@ class ClassHiearchy:
                 for obj in self.pointToSet.get(bases[start]):
                     if(not isinstance(obj, ClassObject)):
                         continue
-                    for mro in self.mros[obj]:
+                    for mro in self.mros.get(obj, ()):
                         for tail in select(start + 1):
                             tail.insert(0, mro)
                             yield tail
@@ -126,7 +126,7 @@ class ClassHiearchy:
         return head, *res,
 
     def getMROs(self, classObj: ClassObject) -> Set[MRO]:
-        return self.mros[classObj]
+        return self.mros.get(classObj, set())
 
     def to_json(self):
         res = defaultdict(dict)
@@ -0,0 +1,249 @@
+import sys
+from typing import Iterable, Iterator, Set
+
+try:
+    import numpy as np
+except ImportError:
+    # only the array and hybrid sets need numpy
+    np = None
+
+from .Objects import Object
+from .SymbolTable import symbols
+
+# Compact point-to sets over the indices of objects in the symbol table.
+# They give back CompactObjects, views the solver iterates like sets of objects without them being built.
+# A view of a compact set added to another is added index by index, or all at once, without going through objects.
+class CompactSet:
+    # add objects, return a compact set of those that are new
+    def addAll(self, objs: Iterable[Object]) -> 'CompactSet':
+        raise NotImplementedError
+
+    # add everything in another set of the same kind
+    def update(self, other: 'CompactSet'):
+        raise NotImplementedError
+
+    def indices(self) -> Iterable[int]:
+        raise NotImplementedError
+
+    def contains(self, index: int) -> bool:
+        raise NotImplementedError
+
+    def copy(self) -> 'CompactSet':
+        raise NotImplementedError
+
+    def objects(self) -> Set[Object]:
+        return {symbols.object(i) for i in self.indices()}
+
+    def sizeof(self) -> int:
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def __eq__(self, other):
+        raise NotImplementedError
+
+
+# Python int as a bitset, bit i is set if object i is in the set.
+class BitSet(CompactSet):
+    __slots__ = ("bits", )
+    bits: int
+
+    def __init__(self, bits: int=0):
+        self.bits = bits
+
+    def addAll(self, objs: Iterable[Object]) -> 'BitSet':
+        if(isinstance(objs, CompactObjects)):
+            mask = toBitSet(objs.set).bits
+        else:
+            mask = 0
+            for obj in objs:
+                mask |= 1 << obj.index
+        new = mask & ~self.bits
+        self.bits |= new
+        return BitSet(new)
+
+    def update(self, other: 'BitSet'):
+        self.bits |= other.bits
+
+    def indices(self):
+        # reversed binary string, so the position of a "1" is the index
+        s = bin(self.bits)[:1:-1]
+        i = s.find("1")
+        while(i >= 0):
+            yield i
+            i = s.find("1", i + 1)
+
+    def contains(self, index: int) -> bool:
+        return bool((self.bits >> index) & 1)
+
+    def copy(self) -> 'BitSet':
+        return BitSet(self.bits)
+
+    def sizeof(self) -> int:
+        return sys.getsizeof(self) + sys.getsizeof(self.bits)
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __bool__(self):
+        return self.bits != 0
+
+    def __eq__(self, other):
+        return isinstance(other, BitSet) and self.bits == other.bits
+
+
+EMPTY_ARRAY = np.empty(0, dtype=np.int32) if np is not None else None
+
+# Sorted numpy array of indices, differences and unions are vectorized.
+class ArraySet(CompactSet):
+    __slots__ = ("array", )
+    array: np.ndarray
+
+    def __init__(self, array: np.ndarray=EMPTY_ARRAY):
+        self.array = array
+
+    def addAll(self, objs: Iterable[Object]) -> 'ArraySet':
+        if(isinstance(objs, CompactObjects)):
+            incoming = toArray(objs.set)
+        else:
+            objs = list(objs)
+            # sorted and without duplicates, as setdiff1d assumes, so the delta is a sorted array too
+            incoming = np.unique(np.fromiter((obj.index for obj in objs), dtype=np.int32, count=len(objs)))
+        new = np.setdiff1d(incoming, self.array, assume_unique=True)
+        if(not new.size):
+            return ArraySet()
+        self.array = np.union1d(self.array, new)
+        return ArraySet(new)
+
+    def update(self, other: 'ArraySet'):
+        self.array = np.union1d(self.array, other.array)
+
+    def indices(self):
+        return self.array.tolist()
+
+    def contains(self, index: int) -> bool:
+        i = np.searchsorted(self.array, index)
+        return i < self.array.size and self.array[i] == index
+
+    # arrays are replaced, never changed in place
+    def copy(self) -> 'ArraySet':
+        return ArraySet(self.array)
+
+    def sizeof(self) -> int:
+        return sys.getsizeof(self) + (sys.getsizeof(self.array) if self.array is not EMPTY_ARRAY else 0)
+
+    def __len__(self):
+        return self.array.size
+
+    def __bool__(self):
+        return self.array.size > 0
+
+    def __eq__(self, other):
+        return isinstance(other, ArraySet) and np.array_equal(self.array, other.array)
+
+
+# Small sets are sorted arrays, they become bitsets when they grow over the threshold.
+class HybridSet(CompactSet):
+    __slots__ = ("impl", )
+    THRESHOLD = 64
+    impl: CompactSet
+
+    def __init__(self):
+        self.impl = ArraySet()
+
+    def addAll(self, objs: Iterable[Object]) -> CompactSet:
+        new = self.impl.addAll(objs)
+        if(len(new) and isinstance(self.impl, ArraySet) and len(self.impl) > HybridSet.THRESHOLD):
+            self.impl = toBitSet(self.impl)
+        return new
+
+    def update(self, other: 'HybridSet'):
+        if(type(self.impl) is type(other.impl)):
+            self.impl.update(other.impl)
+        else:
+            if(isinstance(self.impl, ArraySet)):
+                self.impl = toBitSet(self.impl)
+            self.impl.update(toBitSet(other.impl))
+        if(isinstance(self.impl, ArraySet) and len(self.impl) > HybridSet.THRESHOLD):
+            self.impl = toBitSet(self.impl)
+
+    def indices(self):
+        return self.impl.indices()
+
+    def contains(self, index: int) -> bool:
+        return self.impl.contains(index)
+
+    def copy(self) -> 'HybridSet':
+        copy = HybridSet()
+        copy.impl = self.impl.copy()
+        return copy
+
+    def sizeof(self) -> int:
+        return sys.getsizeof(self) + self.impl.sizeof()
+
+    def __len__(self):
+        return len(self.impl)
+
+    def __bool__(self):
+        return bool(self.impl)
+
+    def __eq__(self, other):
+        if(not isinstance(other, HybridSet)):
+            return False
+        if(type(self.impl) is type(other.impl)):
+            return self.impl == other.impl
+        # the same objects may be kept as an array or as a bitset, those are compared by contents
+        return len(self.impl) == len(other.impl) and toBitSet(self.impl) == toBitSet(other.impl)
+
+
+def toBitSet(s: CompactSet) -> BitSet:
+    if(isinstance(s, HybridSet)):
+        s = s.impl
+    if(isinstance(s, BitSet)):
+        return s
+    bitset = BitSet()
+    for i in s.indices():
+        bitset.bits |= 1 << i
+    return bitset
+
+def toArray(s: CompactSet) -> np.ndarray:
+    if(isinstance(s, HybridSet)):
+        s = s.impl
+    if(isinstance(s, ArraySet)):
+        return s.array
+    return np.fromiter(s.indices(), dtype=np.int32)
+
+
+# The objects of a compact set, read from it as they are iterated.
+# A view of the set of a pointer sees the objects added to it later.
+class CompactObjects:
+    __slots__ = ("set", )
+    set: CompactSet
+
+    def __init__(self, s: CompactSet):
+        self.set = s
+
+    def __iter__(self) -> Iterator[Object]:
+        return (symbols.object(i) for i in self.set.indices())
+
+    def __len__(self):
+        return len(self.set)
+
+    def __bool__(self):
+        return bool(self.set)
+
+    def __contains__(self, obj: Object):
+        return self.set.contains(obj.index)
+
+    # the worklist unions deltas of a pointer, a copy is made once and added to in place after
+    def __or__(self, objs: Iterable[Object]) -> 'CompactObjects':
+        union = self.set.copy()
+        union.addAll(objs)
+        return CompactObjects(union)
+
+    __ror__ = __or__
+
+    def __ior__(self, objs: Iterable[Object]) -> 'CompactObjects':
+        self.set.addAll(objs)
+        return self
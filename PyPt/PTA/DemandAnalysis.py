@@ -0,0 +1,338 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..IR.ClassCodeBlock import ClassCodeBlock
+from ..IR.CodeBlock import CodeBlock
+from ..IR.FunctionCodeBlock import FunctionCodeBlock
+from ..IR.IRStmts import Assign, Call, DelAttr, GetAttr, IRStmt, NewClass, NewFunction, NewModule, NewStaticMethod, NewSuper, SetAttr, Variable
+from ..IR.ModuleCodeBlock import LazyModule, ModuleCodeBlock
+from .Analysis import Analysis
+from .ObjectPool import OBJ_MODULE
+from .Objects import ClassMethodObject, ClassObject, FunctionObject, Object, StaticMethodObject
+from .Pointers import VarPtr
+from .WorkList import ADD_POINTS_TO
+
+# what is demanded
+DEMAND_BACKWARD = 0             # a variable, its point-to set must be complete
+DEMAND_FORWARD = 1              # a variable, every stmt its objects flow through must be added
+DEMAND_ATTR = 2                 # an attribute name, its point-to sets must be complete for every object
+DEMAND_FORWARD_ATTR = 3         # an attribute name, every stmt reading it must be added
+DEMAND_BLOCK = 4                # a code block, whether it is reachable must be known
+DEMAND_CALLERS = 5              # a function code block, every call of it must be added
+
+# Answers the point-to set of a variable without solving the whole program.
+# Starting from the variable, demands walk the IR: backwards from a variable to the stmts assigning it,
+# from an attribute to the stmts setting it by name, and, to know which calls reach a function,
+# forwards from where the function is created to wherever its object flows.
+# Only the stmts demands reach are given to the solver, the same rules as Analysis then solve them,
+# so the answer is that of the whole program once no demand is left.
+# Queries share what is solved. A query that would give the solver more than maxStmts stmts gives up and returns None,
+# the next query carries on with the demands it left.
+# The IR of every module must be generated, demands look for stmts in all of them, bodies of functions are generated as well.
+class DemandAnalysis(Analysis):
+    relevant: Set[IRStmt]                           # stmts added, or to be added when their code block is reachable
+    waiting: Dict[CodeBlock, List[IRStmt]]          # relevant stmts of code blocks not reachable yet
+    callees: Dict[Call, Set[FunctionCodeBlock]]
+    callers: Dict[FunctionCodeBlock, Set[Call]]
+
+    def __init__(self, entrys: List[CodeBlock], maxStmts: int=None, **options):
+        super().__init__(**options)
+        self.maxStmts = maxStmts
+        self.entrys = set(entrys)
+        self.defs = defaultdict(list)               # variable -> stmts assigning it
+        self.uses = defaultdict(list)               # variable -> stmts its objects flow through
+        self.sets = defaultdict(list)               # attribute -> SetAttr of it
+        self.gets = defaultdict(list)               # attribute -> GetAttr of it
+        self.dels = defaultdict(list)               # attribute -> DelAttr of it
+        self.imports = defaultdict(list)            # module -> NewModule of it
+        self.allocations = {}                       # function or class code block -> NewFunction or NewClass of it
+        self.params = {}                            # parameter -> its function code block
+        self.returns = {}                           # return variable -> its function code block
+        self.index(entrys)
+
+        self.demanded = defaultdict(set)            # kind -> what is demanded
+        self.demands = []
+        self.relevant = set()
+        self.added = 0                              # relevant stmts given to the solver
+        self.waiting = defaultdict(list)
+        self.callees = defaultdict(set)
+        self.callers = defaultdict(set)
+
+        for entry in entrys:
+            if(isinstance(entry, ModuleCodeBlock)):
+                obj = self.objectPool.create(OBJ_MODULE, entry)
+                self.workList.append((ADD_POINTS_TO, VarPtr.create(entry.globalVariable), {obj}))
+            self.addReachable(entry)
+
+    def index(self, entrys: List[CodeBlock]):
+        seen = set(entrys)
+        stack = list(entrys)
+        while(stack):
+            codeBlock = stack.pop()
+            if(isinstance(codeBlock, FunctionCodeBlock)):
+                if(codeBlock.pendingBody):
+                    codeBlock.pendingBody.lower(codeBlock)
+                for param in codeBlock.posargs + list(codeBlock.kwargs.values()) + [codeBlock.vararg, codeBlock.kwarg]:
+                    if(param):
+                        self.params[param] = codeBlock
+                self.returns[codeBlock.returnVariable] = codeBlock
+            for stmt in codeBlock.stmts:
+                self.indexStmt(stmt)
+                if(isinstance(stmt, (NewFunction, NewClass))):
+                    self.allocations[stmt.codeBlock] = stmt
+                    stack.append(stmt.codeBlock)
+                elif(isinstance(stmt, NewModule)):
+                    if(isinstance(stmt.module, LazyModule)):
+                        raise ValueError("Demand queries need every module generated, they can't load modules lazily.")
+                    if(isinstance(stmt.module, ModuleCodeBlock)):
+                        self.imports[stmt.module].append(stmt)
+                        if(stmt.module not in seen):
+                            seen.add(stmt.module)
+                            stack.append(stmt.module)
+
+    def indexStmt(self, stmt: IRStmt):
+        if(isinstance(stmt, Assign)):
+            self.defs[stmt.target].append(stmt)
+            self.uses[stmt.source].append(stmt)
+        elif(isinstance(stmt, GetAttr)):
+            self.defs[stmt.target].append(stmt)
+            self.uses[stmt.source].append(stmt)
+            self.gets[stmt.attr].append(stmt)
+        elif(isinstance(stmt, SetAttr)):
+            self.uses[stmt.source].append(stmt)
+            self.sets[stmt.attr].append(stmt)
+        elif(isinstance(stmt, DelAttr)):
+            self.dels[stmt.attr].append(stmt)
+        elif(isinstance(stmt, Call)):
+            self.defs[stmt.target].append(stmt)
+            for var in [stmt.callee] + stmt.posargs + list(stmt.kwargs.values()):
+                self.uses[var].append(stmt)
+        elif(isinstance(stmt, NewClass)):
+            self.defs[stmt.target].append(stmt)
+            for base in stmt.bases:
+                self.uses[base].append(stmt)
+        elif(isinstance(stmt, NewStaticMethod)):
+            self.defs[stmt.target].append(stmt)
+            self.uses[stmt.func].append(stmt)
+        elif(isinstance(stmt, NewSuper)):
+            self.defs[stmt.target].append(stmt)
+            for var in (stmt.type, stmt.bound):
+                if(var):
+                    self.uses[var].append(stmt)
+        else:
+            # other allocations
+            self.defs[stmt.target].append(stmt)
+
+    # the point-to set of var, None if more than maxStmts stmts are needed
+    def query(self, var: Variable) -> Optional[Set[Object]]:
+        self.demand(DEMAND_BACKWARD, var)
+        while(self.demands or len(self.workList) > 0):
+            self.processDemands()
+            if(self.exceeded()):
+                return None
+            self.solve()
+        return set(self.pointToSet.get(self.pointerFlow.find(VarPtr.create(var))))
+
+    # what a call site may call
+    def queryCall(self, stmt: Call) -> Optional[Set[Object]]:
+        return self.query(stmt.callee)
+
+    def exceeded(self) -> bool:
+        return self.maxStmts is not None and self.added > self.maxStmts
+
+    def demand(self, kind: int, item):
+        if(item not in self.demanded[kind]):
+            self.demanded[kind].add(item)
+            self.demands.append((kind, item))
+
+    def processDemands(self):
+        while(self.demands and not self.exceeded()):
+            kind, item = self.demands.pop()
+            if(kind == DEMAND_BACKWARD):
+                self.demandBackward(item)
+            elif(kind == DEMAND_FORWARD):
+                self.demandForward(item)
+            elif(kind == DEMAND_ATTR):
+                for stmt in self.sets[item] + self.dels[item]:
+                    self.admit(stmt)
+            elif(kind == DEMAND_FORWARD_ATTR):
+                for stmt in self.gets[item] + self.dels[item]:
+                    self.admit(stmt)
+            elif(kind == DEMAND_BLOCK):
+                self.demandBlock(item)
+            elif(kind == DEMAND_CALLERS):
+                # wherever the function goes, calls of it are found
+                stmt = self.allocations[item]
+                self.admit(stmt)
+                self.demand(DEMAND_FORWARD, stmt.target)
+
+    def demandBackward(self, var: Variable):
+        for stmt in self.defs[var]:
+            self.admit(stmt)
+        # parameters get the arguments of every call of the function
+        function = self.params.get(var)
+        if(function):
+            self.demand(DEMAND_CALLERS, function)
+            for stmt in self.callers[function]:
+                self.demandArgs(stmt, DEMAND_BACKWARD)
+        # objects put into them by the solver
+        codeBlock = var.belongsTo
+        if((isinstance(codeBlock, ClassCodeBlock) and var == codeBlock.thisClassVariable)
+                or (isinstance(codeBlock, ModuleCodeBlock) and var == codeBlock.globalVariable)):
+            self.demand(DEMAND_BLOCK, codeBlock)
+
+    def demandForward(self, var: Variable):
+        for stmt in self.uses[var]:
+            self.admit(stmt)
+        for stmt in self.defs[var]:
+            if(isinstance(stmt, NewClass)):
+                self.demand(DEMAND_FORWARD, stmt.codeBlock.thisClassVariable)
+        codeBlock = var.belongsTo
+        if(isinstance(codeBlock, ClassCodeBlock) and var == codeBlock.thisClassVariable):
+            self.demand(DEMAND_FORWARD, self.allocations[codeBlock].target)
+        # what the function returns goes wherever its calls go
+        function = self.returns.get(var)
+        if(function):
+            self.demand(DEMAND_CALLERS, function)
+            for stmt in self.callers[function]:
+                self.demand(DEMAND_FORWARD, stmt.target)
+
+    # whether a module is reachable depends on its imports, a class on its definition, and a function on its calls
+    def demandBlock(self, codeBlock: CodeBlock):
+        if(codeBlock in self.entrys):
+            return
+        if(isinstance(codeBlock, ModuleCodeBlock)):
+            for stmt in self.imports[codeBlock]:
+                self.admit(stmt)
+        elif(isinstance(codeBlock, ClassCodeBlock)):
+            self.admit(self.allocations[codeBlock])
+        elif(isinstance(codeBlock, FunctionCodeBlock)):
+            self.demand(DEMAND_CALLERS, codeBlock)
+
+    def demandArgs(self, stmt: Call, kind: int):
+        for var in stmt.posargs + list(stmt.kwargs.values()):
+            self.demand(kind, var)
+
+    def demandParams(self, function: FunctionCodeBlock, kind: int):
+        for param in function.posargs + list(function.kwargs.values()) + [function.vararg, function.kwarg]:
+            if(param):
+                self.demand(kind, param)
+
+    # A relevant stmt goes to the solver once its code block is reachable, what it depends on is demanded from then on,
+    # so that stmts of code blocks that are never reached don't demand anything.
+    def admit(self, stmt: IRStmt):
+        if(stmt not in self.relevant):
+            self.relevant.add(stmt)
+            self.demand(DEMAND_BLOCK, stmt.belongsTo)
+            if(stmt.belongsTo not in self.reachable):
+                self.waiting[stmt.belongsTo].append(stmt)
+                return
+            self.added += 1
+            self.addStmts([stmt])
+        if(stmt.belongsTo in self.reachable):
+            self.demandOperands(stmt)
+
+    # What the stmt reads from must be complete for it to do what it does in the whole program,
+    # and where it puts objects followed forwards must be followed further.
+    def demandOperands(self, stmt: IRStmt):
+        backward, forward = self.demanded[DEMAND_BACKWARD], self.demanded[DEMAND_FORWARD]
+        if(isinstance(stmt, Assign)):
+            if(stmt.target in backward):
+                self.demand(DEMAND_BACKWARD, stmt.source)
+            if(stmt.source in forward):
+                self.demand(DEMAND_FORWARD, stmt.target)
+        elif(isinstance(stmt, GetAttr)):
+            self.demand(DEMAND_BACKWARD, stmt.source)
+            if(stmt.target in backward):
+                self.demand(DEMAND_ATTR, stmt.attr)
+            if(stmt.source in forward or stmt.attr in self.demanded[DEMAND_FORWARD_ATTR]):
+                self.demand(DEMAND_FORWARD, stmt.target)
+        elif(isinstance(stmt, SetAttr)):
+            self.demand(DEMAND_BACKWARD, stmt.target)
+            if(stmt.attr in self.demanded[DEMAND_ATTR]):
+                self.demand(DEMAND_BACKWARD, stmt.source)
+            if(stmt.source in forward):
+                self.demand(DEMAND_FORWARD_ATTR, stmt.attr)
+                # calling a class calls its __init__ without reading it
+                if(stmt.attr == "__init__"):
+                    self.demand(DEMAND_FORWARD, stmt.target)
+        elif(isinstance(stmt, DelAttr)):
+            self.demand(DEMAND_BACKWARD, stmt.var)
+        elif(isinstance(stmt, Call)):
+            self.demand(DEMAND_BACKWARD, stmt.callee)
+            for callee in self.callees[stmt]:
+                self.calleeFound(stmt, callee)
+            # a class called is the result of the call
+            if(stmt.callee in forward):
+                self.demand(DEMAND_FORWARD, stmt.target)
+        elif(isinstance(stmt, NewClass)):
+            for base in stmt.bases:
+                self.demand(DEMAND_BACKWARD, base)
+            if(stmt.target in forward or any(base in forward for base in stmt.bases)):
+                self.demand(DEMAND_FORWARD, stmt.target)
+                self.demand(DEMAND_FORWARD, stmt.codeBlock.thisClassVariable)
+        elif(isinstance(stmt, NewStaticMethod)):
+            if(stmt.target in backward):
+                self.demand(DEMAND_BACKWARD, stmt.func)
+            if(stmt.func in forward):
+                self.demand(DEMAND_FORWARD, stmt.target)
+        elif(isinstance(stmt, NewSuper)):
+            operands = [var for var in (stmt.type, stmt.bound) if var]
+            for var in operands:
+                self.demand(DEMAND_BACKWARD, var)
+            if(any(var in forward for var in operands)):
+                self.demand(DEMAND_FORWARD, stmt.target)
+
+    # a call found to call the function
+    def calleeFound(self, stmt: Call, function: FunctionCodeBlock):
+        backward, forward = self.demanded[DEMAND_BACKWARD], self.demanded[DEMAND_FORWARD]
+        if(stmt.target in backward):
+            self.demand(DEMAND_BACKWARD, function.returnVariable)
+        if(function.returnVariable in forward):
+            self.demand(DEMAND_FORWARD, stmt.target)
+        params = [param for param in function.posargs + list(function.kwargs.values()) + [function.vararg, function.kwarg] if param]
+        if(any(param in backward for param in params)):
+            self.demandArgs(stmt, DEMAND_BACKWARD)
+        if(any(var in forward for var in [stmt.callee] + stmt.posargs + list(stmt.kwargs.values()))):
+            self.demandParams(function, DEMAND_FORWARD)
+
+    # only the relevant stmts of a code block are added
+    def addReachable(self, codeBlock: CodeBlock):
+        if(not codeBlock or codeBlock in self.reachable):
+            return
+        self.reachable.add(codeBlock)
+        stmts = self.waiting.pop(codeBlock, [])
+        self.added += len(stmts)
+        self.addStmts(stmts)
+        for stmt in stmts:
+            self.demandOperands(stmt)
+
+    def processCall(self, stmtInfo: Tuple[Call], objs: Set[Object]):
+        super().processCall(stmtInfo, objs)
+        stmt, = *stmtInfo,
+        if(stmt not in self.relevant):
+            # a call of __init__ made up by the solver, its arguments are those of the class called
+            self.relevant.add(stmt)
+            for var in stmt.posargs + list(stmt.kwargs.values()):
+                self.uses[var].append(stmt)
+        for obj in objs:
+            if(isinstance(obj, ClassObject)):
+                self.demand(DEMAND_ATTR, "__init__")
+                continue
+            if(isinstance(obj, FunctionObject)):
+                function = obj.codeBlock
+            elif(isinstance(obj, (ClassMethodObject, StaticMethodObject))):
+                function = obj.func.codeBlock
+            else:
+                continue
+            if(function not in self.callees[stmt]):
+                self.callees[stmt].add(function)
+                self.callers[function].add(stmt)
+                self.calleeFound(stmt, function)
+
+    def statistics(self) -> Dict[str, int]:
+        stats = super().statistics()
+        stats["relevant stmts"] = len(self.relevant)
+        stats["added stmts"] = self.added
+        stats["demanded"] = sum(len(items) for items in self.demanded.values())
+        return stats
@@ -0,0 +1,500 @@
+from collections import defaultdict
+import hashlib
+import os
+import pickle
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ..IR.ClassCodeBlock import ClassCodeBlock
+from ..IR.CodeBlock import CodeBlock
+from ..IR.FunctionCodeBlock import FunctionCodeBlock
+from ..IR.IRStmts import IRStmt, NewBuiltin, NewClass, NewFunction, NewModule, Variable
+from ..IR.ModuleCodeBlock import ModuleCodeBlock
+from ..PointerEquivalence import allCodeBlocks
+from .Analysis import FAKE_PREFIX, INIT_PREFIX, Analysis
+from .ObjectPool import OBJ_BUILTIN, OBJ_CLASS, OBJ_CLASS_METHOD, OBJ_FAKE, OBJ_FUNCTION, OBJ_MODULE, OBJ_STATIC_METHOD, OBJ_SUPER
+from .Objects import BuiltinObject, ClassMethodObject, ClassObject, FakeObject, FunctionObject, ModuleObject, Object, StaticMethodObject, SuperObject
+from .Pointers import AttrPtr, Pointer, VarPtr
+from .SymbolTable import symbols
+
+# bump it when the analysis or what is saved changes, states of other versions are never read
+STATE_VERSION = 1
+
+PTR_VAR = 0
+PTR_ATTR = 1
+
+# why a code block is reachable
+REASON_ENTRY = 0
+REASON_BLOCK = 1                # a NewModule or NewClass in a reachable code block
+REASON_PTR = 2                  # a call, through the pointer called
+
+def moduleOf(blockId: str) -> str:
+    return blockId.split(".$")[0]
+
+# Everything the IR of a module says, by ids, so that a module whose IR is unchanged has the same fingerprint in every run.
+# Source positions are left out, moving code around doesn't change what it does.
+def fingerprint(codeBlocks: List[CodeBlock]) -> str:
+    h = hashlib.sha256()
+    for codeBlock in sorted(codeBlocks, key=lambda codeBlock: codeBlock.id):
+        line = [type(codeBlock).__name__, codeBlock.id, codeBlock.readable_name]
+        if(isinstance(codeBlock, FunctionCodeBlock)):
+            line += [canonical(codeBlock.posargs), canonical(codeBlock.kwargs), canonical(codeBlock.vararg), canonical(codeBlock.kwarg)]
+        elif(isinstance(codeBlock, ClassCodeBlock)):
+            line += sorted(codeBlock.attributes)
+        lines = [" ".join(line)]
+        for stmt in codeBlock.stmts:
+            operands = [canonical(getattr(stmt, slot)) for slot in operandSlots(type(stmt)) if hasattr(stmt, slot)]
+            lines.append(f"{type(stmt).__name__} {stmt.id} {' '.join(operands)}")
+        lines.append("")
+        h.update("\n".join(lines).encode())
+    return h.hexdigest()
+
+def canonical(value) -> str:
+    if(isinstance(value, Variable)):
+        return value.id
+    elif(isinstance(value, CodeBlock)):
+        return f"<{value.id}>"
+    elif(isinstance(value, (list, tuple))):
+        return f"[{','.join([canonical(v) for v in value])}]"
+    elif(isinstance(value, dict)):
+        return f"{{{','.join([f'{k}:{canonical(v)}' for k, v in value.items()])}}}"
+    else:
+        return repr(value)
+
+_operandSlots: Dict[type, Tuple[str, ...]] = {}
+
+# slots of a stmt other than those every stmt has
+def operandSlots(stmtType: type) -> Tuple[str, ...]:
+    slots = _operandSlots.get(stmtType)
+    if(slots is None):
+        slots = _operandSlots[stmtType] = tuple(slot for cls in reversed(stmtType.__mro__) for slot in getattr(cls, "__slots__", ())
+                                                if slot not in IRStmt.__slots__)
+    return slots
+
+# module id -> its code blocks, for every module the entries import
+def programModules(entrys: List[CodeBlock]) -> Dict[str, List[CodeBlock]]:
+    modules = {}
+    stack = [entry for entry in entrys if isinstance(entry, ModuleCodeBlock)]
+    while(stack):
+        module = stack.pop()
+        if(module.id in modules):
+            continue
+        modules[module.id] = allCodeBlocks([module])
+        for codeBlock in modules[module.id]:
+            for stmt in codeBlock.stmts:
+                if(isinstance(stmt, NewModule) and isinstance(stmt.module, ModuleCodeBlock)):
+                    stack.append(stmt.module)
+    return modules
+
+
+# Pointers and objects of the solved state by what they are made of, so that they can be found again in the IR of the next run.
+# Records refer to each other by their index.
+class StateWriter:
+    objects: List[Tuple]
+    pointers: List[Tuple]
+    objectIndex: Dict[Object, int]
+    pointerIndex: Dict[Pointer, int]
+
+    def __init__(self):
+        self.objects = []
+        self.pointers = []
+        self.objectIndex = {}
+        self.pointerIndex = {}
+
+    def object(self, obj: Object) -> int:
+        index = self.objectIndex.get(obj)
+        if(index is not None):
+            return index
+        # fake objects disguise as modules, classes and functions, they come first
+        if(isinstance(obj, FakeObject)):
+            if(obj.prefix is None):
+                record = (OBJ_FAKE, obj.unwrapID())
+            else:
+                source, target, attr = obj.getAttr
+                record = (OBJ_FAKE, self.object(obj.prefix), self.pointer(source), self.pointer(target), attr)
+        elif(isinstance(obj, ModuleObject)):
+            record = (OBJ_MODULE, obj.unwrapID())
+        elif(isinstance(obj, FunctionObject)):
+            record = (OBJ_FUNCTION, obj.unwrapID())
+        elif(isinstance(obj, ClassObject)):
+            record = (OBJ_CLASS, obj.unwrapID())
+        elif(isinstance(obj, BuiltinObject)):
+            blockId, _, stmtId = obj.unwrapID().rpartition(".$")
+            record = (OBJ_BUILTIN, blockId, int(stmtId))
+        elif(isinstance(obj, ClassMethodObject)):
+            record = (OBJ_CLASS_METHOD, self.object(obj.classObj), self.object(obj.func))
+        elif(isinstance(obj, StaticMethodObject)):
+            record = (OBJ_STATIC_METHOD, self.object(obj.func))
+        elif(isinstance(obj, SuperObject)):
+            record = (OBJ_SUPER, self.object(obj.type), self.object(obj.bound))
+        index = self.objectIndex[obj] = len(self.objects)
+        self.objects.append(record)
+        return index
+
+    def pointer(self, ptr: Pointer) -> int:
+        index = self.pointerIndex.get(ptr)
+        if(index is not None):
+            return index
+        if(isinstance(ptr, VarPtr)):
+            record = (PTR_VAR, ptr.id, ptr.readable_name)
+        else:
+            record = (PTR_ATTR, self.object(ptr.obj), ptr.attr)
+        index = self.pointerIndex[ptr] = len(self.pointers)
+        self.pointers.append(record)
+        return index
+
+
+# Finds the records of a saved state in the IR of this run.
+# An object is stale if it is allocated in a changed module, or if it is gone.
+class StateReader:
+    def __init__(self, analysis: Analysis, state: Dict[str, Any], modules: Dict[str, List[CodeBlock]], changed: Set[str]):
+        self.analysis = analysis
+        self.state = state
+        self.changed = changed
+        self.blocks = {codeBlock.id: codeBlock for codeBlocks in modules.values() for codeBlock in codeBlocks}
+        self.allocs = {}
+        for codeBlock in self.blocks.values():
+            for stmt in codeBlock.stmts:
+                if(isinstance(stmt, (NewFunction, NewClass))):
+                    self.allocs[stmt.codeBlock.id] = stmt
+                elif(isinstance(stmt, NewBuiltin)):
+                    self.allocs[(codeBlock.id, stmt.id)] = stmt
+        self.objects = {}
+        self.pointers = {}
+
+    def object(self, index: int) -> Optional[Object]:
+        if(index not in self.objects):
+            self.objects[index] = self._object(*self.state["objects"][index])
+        return self.objects[index]
+
+    def _object(self, type: int, *args) -> Optional[Object]:
+        pool = self.analysis.objectPool
+        if(type == OBJ_MODULE):
+            module = self.blocks.get(args[0])
+            return module and pool.create(OBJ_MODULE, module)
+        elif(type == OBJ_FAKE and len(args) == 1):
+            return pool.create(OBJ_FAKE, args[0])
+
+        if(type == OBJ_FAKE):
+            prefix, source, target, attr = args
+            parts = [self.object(prefix), self.pointer(source), self.pointer(target)]
+        elif(type in (OBJ_FUNCTION, OBJ_CLASS, OBJ_BUILTIN)):
+            if(moduleOf(args[0]) in self.changed):
+                return None
+            parts = [self.allocs.get(args[0] if type != OBJ_BUILTIN else args)]
+        else:
+            parts = [self.object(arg) for arg in args]
+        if(any(part is None for part in parts)):
+            return None
+
+        if(type == OBJ_FAKE):
+            prefix, source, target = parts
+            return pool.create(OBJ_FAKE, prefix, (source, target, attr))
+        return pool.create(type, *parts)
+
+    def pointer(self, index: int) -> Optional[Pointer]:
+        if(index not in self.pointers):
+            type, *args = self.state["pointers"][index]
+            if(type == PTR_VAR):
+                id, readable_name = args
+                ptr = None if self.isChanged(index) else VarPtr.get(id, readable_name)
+            else:
+                obj, attr = args
+                obj = self.object(obj)
+                ptr = None if obj is None or self.isChanged(index) else AttrPtr.create(obj, attr)
+            self.pointers[index] = ptr
+        return self.pointers[index]
+
+    # variables of changed modules, and attributes of what changed modules allocate, their modules' globals included
+    def isChanged(self, index: int) -> bool:
+        type, *args = self.state["pointers"][index]
+        if(type == PTR_VAR):
+            return moduleOf(args[0].rpartition("@")[2]) in self.changed
+        type, *args = self.state["objects"][args[0]]
+        return type in (OBJ_MODULE, OBJ_FUNCTION, OBJ_CLASS, OBJ_BUILTIN) and moduleOf(args[0]) in self.changed
+
+
+# (a, b): the point-to set of b may depend on that of a, other than by a flow from a to b
+def dependencies(analysis: Analysis) -> List[Tuple[Pointer, Pointer]]:
+    pts = analysis.pointToSet.get
+    deps = []
+    # merged pointers share their point-to set
+    for rep, group in analysis.pointerFlow.groups.items():
+        for member in group:
+            deps += [(rep, member), (member, rep)]
+
+    def attrPtr(obj: Object, attr: str) -> Optional[AttrPtr]:
+        return obj.attrPtrs.get(symbols.attr(attr))
+
+    # resolving an attribute on a class or super object depends on every class along the MROs
+    classResolvers = defaultdict(set)
+    for resolver, attrs in analysis.resolved_attr.items():
+        classObj = resolver.bound if isinstance(resolver, SuperObject) else resolver
+        for mro in analysis.classHiearchy.getMROs(classObj):
+            for cls in mro:
+                classResolvers[cls].add(resolver)
+
+    def resolved(cls: Object, attr: str=None) -> List[AttrPtr]:
+        ptrs = []
+        for resolver in classResolvers.get(cls, ()):
+            for resolvedAttr in analysis.resolved_attr[resolver]:
+                if(attr is None or attr == resolvedAttr):
+                    ptrs.append(attrPtr(resolver, FAKE_PREFIX + resolvedAttr))
+        return ptrs
+
+    for index, gets in analysis.attrGraph.get_forward.items():
+        source = symbols.pointer(index)
+        classes = [obj for obj in pts(source) if isinstance(obj, (ClassObject, SuperObject))]
+        for target, attr in gets:
+            deps.append((source, target))
+            deps += [(source, attrPtr(obj, FAKE_PREFIX + attr)) for obj in classes]
+
+    for index, sets in analysis.attrGraph.set_backward.items():
+        target = symbols.pointer(index)
+        for source, attr in sets:
+            deps += [(target, attrPtr(obj, attr)) for obj in pts(target)]
+
+    bindings = analysis.bindingStmts.bindings
+    for index, stmtInfos in bindings["Call"].items():
+        callee = symbols.pointer(index)
+        for stmt, in stmtInfos:
+            deps.append((callee, VarPtr.create(stmt.target)))
+            for obj in pts(callee):
+                if(isinstance(obj, FunctionObject)):
+                    func = obj
+                elif(isinstance(obj, (ClassMethodObject, StaticMethodObject))):
+                    func = obj.func
+                elif(isinstance(obj, ClassObject)):
+                    init = VarPtr.create(Variable(f"{INIT_PREFIX}{obj.id}", stmt.belongsTo))
+                    deps += [(callee, init), (callee, attrPtr(obj, FAKE_PREFIX + "__init__"))]
+                    continue
+                else:
+                    continue
+                params = func.posParams + list(func.kwParams.values()) + [func.varParam, func.kwParam]
+                deps += [(callee, param) for param in params]
+
+    for opname in ("NewStaticMethod", "NewSuper"):
+        for index, stmtInfos in bindings[opname].items():
+            deps += [(symbols.pointer(index), VarPtr.create(stmtInfo[0].target)) for stmtInfo in stmtInfos]
+
+    for index, stmtInfos in bindings["NewClass"].items():
+        base = symbols.pointer(index)
+        for stmt, _ in stmtInfos:
+            cls = analysis.objectPool.create(OBJ_CLASS, stmt)
+            deps += [(base, ptr) for ptr in resolved(cls)]
+
+    for index, stmtInfos in bindings["DelAttr"].items():
+        var = symbols.pointer(index)
+        for stmt, in stmtInfos:
+            for obj in pts(var):
+                deps += [(var, ptr) for ptr in resolved(obj, stmt.attr)]
+
+    return [(source, target) for source, target in deps if target is not None]
+
+
+# Keeps the solved state in a file, and on the next run only redoes what changed modules may affect.
+# A module has changed if the fingerprint of its IR has. Then the saved facts are retracted by delete-and-rederive:
+#   - delete: every pointer whose point-to set may depend on a changed module loses it,
+#     that is variables and attributes of changed modules, everything reachable from them by flows,
+#     and what statements binding them wrote: attributes set, parameters called, resolved class attributes.
+#     A code block stays reachable as long as one of the reasons it was reached for survives,
+#     otherwise its variables are deleted as well.
+#   - rederive: the remaining point-to sets are a subset of the result of the new program,
+#     so the solver runs as usual from them and only propagates what is missing.
+# Flows, bindings, the class hiearchy and the callgraph are not saved, they are rebuilt from the point-to sets when statements are bound again.
+class IncrementalAnalysis(Analysis):
+    statePath: str
+    fingerprints: Dict[str, str]
+    changedModules: Set[str]
+
+    def __init__(self, state: str, verbose=False, worklist="fifo", collapseCycles=True, pointToSet="set"):
+        super().__init__(verbose=verbose, worklist=worklist, collapseCycles=collapseCycles, pointToSet=pointToSet)
+        self.statePath = state
+        self.fingerprints = {}
+        self.changedModules = set()
+        self.restoredPointers = 0
+        self.retractedPointers = 0
+        # flows of the saved state between pointers that are restored, and the sizes of their point-to sets when restored
+        self.knownFlows = set()
+        self.restoredSizes = {}
+
+    def analyze(self, entrys: List[CodeBlock]):
+        symbols.use(self.symbols)
+        # fingerprints are taken before solving, calling a class adds statements to the IR
+        modules = programModules(entrys)
+        self.fingerprints = {id: fingerprint(codeBlocks) for id, codeBlocks in modules.items()}
+        state = self.load()
+        if(state is None):
+            self.changedModules = set(self.fingerprints)
+        else:
+            self.restore(state, entrys, modules)
+        super().analyze(entrys)
+        # nothing was retracted, the same state would be written again
+        if(state is None or self.changedModules or self.retractedPointers):
+            self.save(entrys)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.statePath, "rb") as f:
+                state = pickle.load(f)
+        except(Exception):
+            # missing, or written by something else
+            return None
+        if(not isinstance(state, dict) or state.get("version") != STATE_VERSION):
+            return None
+        return state
+
+    def restore(self, state: Dict[str, Any], entrys: List[CodeBlock], modules: Dict[str, List[CodeBlock]]):
+        old = state["fingerprints"]
+        self.changedModules = {id for id in old.keys() | self.fingerprints.keys() if old.get(id) != self.fingerprints.get(id)}
+        reader = StateReader(self, state, modules, self.changedModules)
+        pointToSet = state["pointToSet"]
+
+        # pointers that are gone, and pointers of stale objects
+        seeds = [index for index in range(len(state["pointers"])) if reader.pointer(index) is None]
+        seeds += [index for index, objs in pointToSet.items() if any(reader.object(obj) is None for obj in objs)]
+        tainted = self.retract(state, seeds, {entry.id for entry in entrys})
+
+        for index, objs in pointToSet.items():
+            if(index in tainted):
+                continue
+            ptr = reader.pointer(index)
+            self.pointToSet.putAll(ptr, {reader.object(obj) for obj in objs})
+            self.restoredSizes[ptr] = len(objs)
+            self.restoredPointers += 1
+        self.retractedPointers = len(tainted.intersection(pointToSet))
+
+        for source, targets in state["flows"].items():
+            if(source in tainted or source not in pointToSet):
+                continue
+            sourcePtr = reader.pointer(source)
+            self.knownFlows.update((sourcePtr, reader.pointer(target)) for target in targets if target not in tainted and target in pointToSet)
+
+    # The over-deletion, pointers whose point-to sets may depend on deleted facts.
+    # Reachable code blocks count their reasons, a code block is deleted when it has none left.
+    def retract(self, state: Dict[str, Any], seeds: List[int], entrys: Set[str]) -> Set[int]:
+        flows = state["flows"]
+        dependents = state["dependents"]
+        reasons = state["reachable"]
+        blockPtrs = defaultdict(list)
+        for index, (type, *args) in enumerate(state["pointers"]):
+            if(type == PTR_VAR):
+                blockPtrs[args[0].rpartition("@")[2]].append(index)
+        byBlock = defaultdict(list)
+        byPtr = defaultdict(list)
+        counts = {}
+        for block, blockReasons in reasons.items():
+            counts[block] = len(blockReasons)
+            for kind, *args in blockReasons:
+                if(kind == REASON_BLOCK):
+                    byBlock[args[0]].append(block)
+                elif(kind == REASON_PTR):
+                    byPtr[args[0]].append(block)
+                elif(block not in entrys):
+                    counts[block] -= 1
+
+        tainted = set()
+        deletedBlocks = set()
+        ptrStack = list(seeds)
+        blockStack = [block for block, count in counts.items() if count == 0 or moduleOf(block) in self.changedModules]
+        while(ptrStack or blockStack):
+            if(blockStack):
+                block = blockStack.pop()
+                if(block in deletedBlocks):
+                    continue
+                deletedBlocks.add(block)
+                ptrStack += blockPtrs.get(block, ())
+                parents = byBlock.get(block, ())
+            else:
+                index = ptrStack.pop()
+                if(index in tainted):
+                    continue
+                tainted.add(index)
+                ptrStack += flows.get(index, ())
+                ptrStack += dependents.get(index, ())
+                parents = byPtr.get(index, ())
+            for block in parents:
+                counts[block] -= 1
+                if(counts[block] == 0):
+                    blockStack.append(block)
+        return tainted
+
+    def save(self, entrys: List[CodeBlock]):
+        state = self.export(entrys)
+        # written aside and renamed, so other runs never read half of a state
+        tmp = f"{self.statePath}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.statePath)
+
+    def export(self, entrys: List[CodeBlock]) -> Dict[str, Any]:
+        writer = StateWriter()
+        pointToSet = {}
+        for ptr in self.pointToSet.allPointers():
+            objs = self.pointToSet.get(ptr)
+            if(objs):
+                pointToSet[writer.pointer(ptr)] = [writer.object(obj) for obj in objs]
+
+        flows = defaultdict(list)
+        for source, targets in self.pointerFlow.forward.items():
+            # merged pointers share their point-to set, so they have the flows of their representative
+            for member in self.pointerFlow.members(source):
+                flows[writer.pointer(member)] += [writer.pointer(target) for target in targets]
+
+        dependents = defaultdict(set)
+        for source, target in dependencies(self):
+            dependents[writer.pointer(source)].add(writer.pointer(target))
+
+        reachable = defaultdict(set)
+        for entry in entrys:
+            reachable[entry.id].add((REASON_ENTRY, ))
+        for codeBlock in self.reachable:
+            for stmt in codeBlock.stmts:
+                if(isinstance(stmt, NewModule) and isinstance(stmt.module, ModuleCodeBlock)):
+                    reachable[stmt.module.id].add((REASON_BLOCK, codeBlock.id))
+                elif(isinstance(stmt, NewClass)):
+                    reachable[stmt.codeBlock.id].add((REASON_BLOCK, codeBlock.id))
+        for callee, codeBlock in self.calledBlocks():
+            reachable[codeBlock.id].add((REASON_PTR, writer.pointer(callee)))
+        reachableIds = {codeBlock.id for codeBlock in self.reachable}
+
+        return {
+            "version": STATE_VERSION,
+            "fingerprints": self.fingerprints,
+            "objects": writer.objects,
+            "pointers": writer.pointers,
+            "pointToSet": pointToSet,
+            "flows": dict(flows),
+            "dependents": dict(dependents),
+            "reachable": {id: list(reasons) for id, reasons in reachable.items() if id in reachableIds},
+        }
+
+    # A flow the saved state had, from a pointer that has not grown since, brings nothing new.
+    def addFlow(self, source: Pointer, target: Pointer):
+        if(self.pointerFlow.put(source, target)):
+            if((source, target) in self.knownFlows and len(self.pointToSet.get(source)) == self.restoredSizes[source]):
+                return
+            objs = self.pointToSet.get(source)
+            self.flow(source, target, objs)
+
+    # the code blocks called through each callee
+    def calledBlocks(self) -> List[Tuple[Pointer, CodeBlock]]:
+        called = []
+        for index in self.bindingStmts.bindings["Call"]:
+            callee = symbols.pointer(index)
+            for obj in self.pointToSet.get(callee):
+                if(isinstance(obj, FunctionObject)):
+                    func = obj
+                elif(isinstance(obj, (ClassMethodObject, StaticMethodObject))):
+                    func = obj.func
+                else:
+                    continue
+                if(func.codeBlock):
+                    called.append((callee, func.codeBlock))
+        return called
+
+    def statistics(self) -> Dict[str, int]:
+        stats = super().statistics()
+        stats["changed modules"] = len(self.changedModules)
+        stats["restored pointers"] = self.restoredPointers
+        stats["retracted pointers"] = self.retractedPointers
+        return stats
@@ -1,4 +1,5 @@
-from .Objects import BuiltinObject, ClassMethodObject, ClassObject, FakeObject, FunctionObject, ModuleObject, StaticMethodObject, SuperObject
+from .SymbolTable import symbols
+from .Objects import HEAP_SITE, BuiltinObject, ClassMethodObject, ClassObject, FakeObject, FunctionObject, ModuleObject, StaticMethodObject, SuperObject
 
 
 OBJ_MODULE = 0
@@ -12,10 +13,12 @@ OBJ_FAKE = 7
 OBJ_TYPE_NUM = 8
 
 
+# Builtin objects are keyed by the heap abstraction, other objects by their allocation site.
 class ObjectPool:
     
-    def __init__(self):
+    def __init__(self, heap: str=HEAP_SITE):
         self.pool = {}
+        self.heap = heap
 
     def create(self, type: int, *vararg, **kwarg):
         if(type == OBJ_MODULE):
@@ -25,7 +28,7 @@ class ObjectPool:
         elif(type == OBJ_FUNCTION):
             return self._create(FunctionObject, *vararg, **kwarg)
         elif(type == OBJ_BUILTIN):
-            return self._create(BuiltinObject, *vararg, **kwarg)
+            return self._create(BuiltinObject, *vararg, heap=self.heap, **kwarg)
         elif(type == OBJ_STATIC_METHOD):
             return self._create(StaticMethodObject, *vararg, **kwarg)
         elif(type == OBJ_CLASS_METHOD):
@@ -35,17 +38,28 @@ class ObjectPool:
         elif(type == OBJ_FAKE):
             return self._create(FakeObject, *vararg, **kwarg)
 
+    # objects made of other objects are keyed by their indices, others by their id, which add looks them up by too
     def _create(self, obj_cls, *vararg, **kwarg):
-        id = obj_cls.generateID(*vararg, **kwarg)
-        if(id in self.pool):
-            return self.pool[id]
+        if(hasattr(obj_cls, "generateKey")):
+            key = obj_cls.generateKey(*vararg, **kwarg)
         else:
+            key = obj_cls.generateID(*vararg, **kwarg)
+        obj = self.pool.get(key)
+        if(obj is None):
             obj = obj_cls.create(*vararg, **kwarg)
-            self.pool[id] = obj
-            return obj
+            obj.index = symbols.addObject(obj)
+            obj.attrPtrs = {}
+            self.pool[key] = obj
+        return obj
 
-    def get(self, id):
-        if(id in self.pool):
-            return self.pool[id]
+    # objects made without an allocation site, like those read from a summary, are keyed by their id
+    def add(self, obj):
+        existing = self.pool.get(obj.id)
+        if(existing is not None):
+            return existing
+        obj.index = symbols.addObject(obj)
+        obj.attrPtrs = {}
+        self.pool[obj.id] = obj
+        return obj
 
     
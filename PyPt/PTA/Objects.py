@@ -1,4 +1,4 @@
-from typing import Any, List, Set, Tuple, Union
+from typing import Any, Dict, List, Set, Tuple, Union
 
 from tblib import Code
 from ..IR.ClassCodeBlock import ClassCodeBlock
@@ -7,27 +7,27 @@ from ..IR.FunctionCodeBlock import FunctionCodeBlock
 
 from ..IR.ModuleCodeBlock import ModuleCodeBlock
 
-from .Pointers import VarPtr, VarPtr
+from .Pointers import AttrPtr, VarPtr
 
 from ..IR.IRStmts import GetAttr, NewBuiltin, NewClass, NewFunction, NewModule
 
+# Objects are interned by ObjectPool, which gives every object an index in the symbol table.
 # Object's information should remain static as the pta proceeds.
 # Objects have loose relation with IR, but contain all the necessary information in the IR, and can be easily exported. 
 # That means even without IR, objects can be still represented, and pta can still run. 
 
 class Object:
     id: str
+    index: int
+    attrPtrs: Dict[int, AttrPtr]                  # attribute index -> pointer
     def __init__(self, objType: str):
         self.objType = objType
 
     def __str__(self):
         return self.readable_name if hasattr(self, 'readable_name') else self.id
 
-    def __eq__(self, other):
-        return isinstance(other, Object) and self.id == other.id
-
     def __hash__(self):
-        return hash(self.id) 
+        return self.index
 
     def __repr__(self):
         return self.id
@@ -122,9 +122,12 @@ class FunctionObject(Object):
             
     @staticmethod
     def create(alloc_site: NewFunction):
-        
-        func = alloc_site.codeBlock
-        return FunctionObject(  id=FunctionObject.generateID(alloc_site),
+        return FunctionObject.fromCodeBlock(alloc_site.codeBlock)
+
+    # functions read from a summary have no allocation site
+    @staticmethod
+    def fromCodeBlock(func: FunctionCodeBlock):
+        return FunctionObject(  id=f"Function({func.id})",
                                 readable_name=func.readable_name,
                                 codeBlock=func,
                                 retVar=VarPtr.create(func.returnVariable),
@@ -199,18 +202,30 @@ class ClassObject(Object):
 #         return self.__str__()
     
 
+# How builtin allocations are abstracted: one object per allocation site,
+# per type in each code block, or per type in the whole program.
+HEAP_SITE = "site"
+HEAP_BLOCK = "block"
+HEAP_TYPE = "type"
+HEAP_ABSTRACTIONS = (HEAP_SITE, HEAP_BLOCK, HEAP_TYPE)
+
 class BuiltinObject(Object):
-    
-    def __init__(self, id: str):
+    type: str                           # the builtin type allocated, None if not known
+    def __init__(self, id: str, type: str=None):
         self.id = id
+        self.type = type
 
     @staticmethod
-    def generateID(alloc_site: NewBuiltin):
+    def generateID(alloc_site: NewBuiltin, heap: str=HEAP_SITE):
+        if(heap == HEAP_BLOCK):
+            return f"Builtin({alloc_site.belongsTo.id}.${alloc_site.type})"
+        elif(heap == HEAP_TYPE):
+            return f"Builtin(${alloc_site.type})"
         return f"Builtin({alloc_site.belongsTo.id}.${alloc_site.id})"
 
     @staticmethod
-    def create(alloc_site: NewBuiltin):
-        return BuiltinObject(id=BuiltinObject.generateID(alloc_site))
+    def create(alloc_site: NewBuiltin, heap: str=HEAP_SITE):
+        return BuiltinObject(id=BuiltinObject.generateID(alloc_site, heap), type=alloc_site.type)
     
     def unwrapID(self):
         return self.id[8:-1]
@@ -235,20 +250,25 @@ class ClassMethodObject(Object):
     classObj: ClassObject
     func: FunctionObject
     
-    def __init__(self, id:str, classObj: ClassObject, func: FunctionObject):
+    def __init__(self, classObj: ClassObject, func: FunctionObject):
         self.classObj = classObj
         self.func = func
-        self.id = id
+
+    @property
+    def id(self):
+        return ClassMethodObject.generateID(self.classObj, self.func)
 
     @staticmethod
     def generateID(classObj: ClassObject, func: FunctionObject):
         return f"ClassMethod({classObj.id},{func.id})"
 
+    @staticmethod
+    def generateKey(classObj: ClassObject, func: FunctionObject):
+        return ("ClassMethod", classObj.index, func.index)
+
     @staticmethod
     def create(classObj: ClassObject, func: FunctionObject):
-        return ClassMethodObject( id=ClassMethodObject.generateID(classObj, func),
-                            classObj=classObj,
-                            func=func)
+        return ClassMethodObject(classObj=classObj, func=func)
     def unwrapID(self):
         return self.id[12:-1]
     
@@ -257,18 +277,24 @@ class StaticMethodObject(Object):
     
     func: FunctionObject
     
-    def __init__(self, id:str, func: FunctionObject):
+    def __init__(self, func: FunctionObject):
         self.func = func
-        self.id = id
+
+    @property
+    def id(self):
+        return StaticMethodObject.generateID(self.func)
 
     @staticmethod
     def generateID(func: FunctionObject):
         return f"StaticMethod({func.id})"
 
+    @staticmethod
+    def generateKey(func: FunctionObject):
+        return ("StaticMethod", func.index)
+
     @staticmethod
     def create(func: FunctionObject):
-        return StaticMethodObject( id=StaticMethodObject.generateID(func),
-                            func=func)
+        return StaticMethodObject(func=func)
 
     def unwrapID(self):
         return self.id[13:-1]
@@ -279,20 +305,25 @@ class SuperObject(Object):
     type: ClassObject
     bound: ClassObject
    
-    def __init__(self, id: str, type: ClassObject, bound: ClassObject):
+    def __init__(self, type: ClassObject, bound: ClassObject):
         self.type = type
         self.bound = bound
-        self.id = id
+
+    @property
+    def id(self):
+        return SuperObject.generateID(self.type, self.bound)
 
     @staticmethod
     def generateID(type: ClassObject, bound: ClassObject):
         return f"Super({type.id},{bound.id})"
 
+    @staticmethod
+    def generateKey(type: ClassObject, bound: ClassObject):
+        return ("Super", type.index, bound.index)
+
     @staticmethod
     def create(type: ClassObject, bound: ClassObject):
-        return SuperObject( id=SuperObject.generateID(type, bound),
-                            type=type,
-                            bound=bound)
+        return SuperObject(type=type, bound=bound)
 
     def unwrapID(self):
         return self.id[6:-1]
@@ -318,11 +349,11 @@ class FakeObject(ModuleObject, ClassObject, FunctionObject):
         # disguise
         self.readable_name = self.unwrapID()
         self.codeBlock = None
-        self.retVar = VarPtr(f"$ret@{id}", f"$ret@{self.readable_name}")
+        self.retVar = VarPtr.get(f"$ret@{id}", f"$ret@{self.readable_name}")
         self.posParams = []
         self.kwParams = {}
-        self.varParam = VarPtr("$varParam@{id}", f"$varParam@{self.readable_name}")
-        self.kwParam = VarPtr("$kwParam@{id}", f"$kwParam@{self.readable_name}")
+        self.varParam = VarPtr.get("$varParam@{id}", f"$varParam@{self.readable_name}")
+        self.kwParam = VarPtr.get("$kwParam@{id}", f"$kwParam@{self.readable_name}")
         self.bases = []
         self.attributes = []
             
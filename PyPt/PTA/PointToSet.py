@@ -1,7 +1,8 @@
 
 from collections import defaultdict
 import json
-from typing import Dict, Set
+import sys
+from typing import Dict, Iterable, List, Set
 
 from PyPt.PTA import json_utils
 
@@ -10,68 +11,258 @@ from ..IR.CodeBlock import CodeBlock
 
 from ..IR.IRStmts import Variable
 
+from .CompactSets import ArraySet, BitSet, CompactObjects, CompactSet, HybridSet, np
 from .Objects import Object
 
 from .Pointers import AttrPtr, Pointer, VarPtr
+from .SharedSets import EMPTY, SetTable
+from .SymbolTable import symbols
 
 
+# memo entries of the shared set table before it is first collected
+COLLECT_THRESHOLD = 1 << 12
+
+# Keyed by the indices of the symbol table:
+# varPtrSet[varPtr.index] and attrPtrSet[obj.index][attrIndex]
 class PointToSet:
-    varPtrSet: Dict[VarPtr, Set]
-    attrPtrSet: Dict[Object, Dict[str, Set]]
+    varPtrSet: Dict[int, Set[Object]]
+    attrPtrSet: Dict[int, Dict[int, Set[Object]]]
 
     def __init__(self):
         self.varPtrSet = defaultdict(set)
         self.attrPtrSet = defaultdict(lambda: defaultdict(set))
 
     def put(self, pointer: Pointer, obj: Object) -> bool:
-        if(isinstance(pointer, VarPtr)):
-            var = pointer
-            if(obj not in self.varPtrSet[var]):
-                self.varPtrSet[var].add(obj)
-                return True
-            else:
-                return False
-        elif(isinstance(pointer, AttrPtr)):
-            o = pointer.obj
-            f = pointer.attr
-            if(obj not in self.attrPtrSet[o][f]):
-                self.attrPtrSet[o][f].add(obj)
-                return True
-            else:
-                return False
+        s = self.get(pointer)
+        if(obj not in s):
+            s.add(obj)
+            return True
+        else:
+            return False
     
     def putAll(self, pointer: Pointer, objs: Set[Object]) -> Set[Object]:
-        if(isinstance(pointer, VarPtr)):
-            var = pointer
-            
-            diff = objs - self.varPtrSet[var]
-            self.varPtrSet[var] |= diff
-            return diff
-        elif(isinstance(pointer, AttrPtr)):
-            o = pointer.obj
-            f = pointer.attr
-            
-            diff = objs - self.attrPtrSet[o][f]
-            self.attrPtrSet[o][f] |= diff
-            return diff
+        s = self.get(pointer)
+        diff = objs - s
+        s |= diff
+        return diff
 
     def get(self, pointer: Pointer) -> Set[Object]:
         if(isinstance(pointer, VarPtr)):
-            var = pointer
-            return self.varPtrSet[var]
+            return self.varPtrSet[pointer.index]
+
+        elif(isinstance(pointer, AttrPtr)):
+            return self.attrPtrSet[pointer.obj.index][pointer.attrIndex]
 
+    def _store(self, pointer: Pointer, objs: Set[Object]):
+        if(isinstance(pointer, VarPtr)):
+            self.varPtrSet[pointer.index] = objs
         elif(isinstance(pointer, AttrPtr)):
-            o = pointer.obj
-            f = pointer.attr
-            return self.attrPtrSet[o][f]
-            
+            self.attrPtrSet[pointer.obj.index][pointer.attrIndex] = objs
+
+    # Let all pointers share the set of rep, which becomes the union of theirs.
+    # Returns the objects each pointer gains from the merge.
+    def merge(self, rep: Pointer, pointers: List[Pointer]) -> Dict[Pointer, Set[Object]]:
+        merged = self.get(rep)
+        union = set(merged)
+        for pointer in pointers:
+            union |= self.get(pointer)
+        deltas = {pointer: union - self.get(pointer) for pointer in pointers}
+        merged |= union
+        for pointer in pointers:
+            self._store(pointer, merged)
+        return deltas
+
+    def equal(self, a: Pointer, b: Pointer) -> bool:
+        return self.get(a) == self.get(b)
+
+    def statistics(self) -> Dict[str, int]:
+        sets = list(self.varPtrSet.values()) + [s for d in self.attrPtrSet.values() for s in d.values()]
+        # merged pointers share one set
+        sets = list({id(s): s for s in sets}.values())
+        return {
+            "point-to sets": len(sets),
+            "point-to entries": sum(len(s) for s in sets),
+            "point-to bytes": sum(self.sizeof(s) for s in sets),
+        }
+
+    def sizeof(self, s) -> int:
+        return sys.getsizeof(s)
+
+    # every pointer that has a point-to set, whatever the set is kept as
+    def allPointers(self) -> List[Pointer]:
+        pointers = [symbols.pointer(index) for index in self.varPtrSet]
+        for obj, d in self.attrPtrSet.items():
+            obj = symbols.object(obj)
+            pointers += [AttrPtr.create(obj, symbols.attrName(attr)) for attr in d]
+        return pointers
 
     def getAllAttr(self, obj: Object):
-        
-        return self.attrPtrSet[obj].keys()
+        return [symbols.attrName(attr) for attr in self.attrPtrSet[obj.index]]
+
+    def to_json(self):
+        attrPtrSet = {str(AttrPtr.create(symbols.object(obj), symbols.attrName(attr))):objs for obj, d in self.attrPtrSet.items() for attr, objs in d.items()}
+        varPtrSet = {str(symbols.pointer(index)): s for index, s in self.varPtrSet.items()}
+        return json.dumps(attrPtrSet | varPtrSet, default=json_utils.default, indent=4)
+
+
+# Point-to sets are kept in a compact form, they are read through views, and what is new to a set is compact too.
+class CompactPointToSet(PointToSet):
+    varPtrSet: Dict[int, CompactSet]
+    attrPtrSet: Dict[int, Dict[int, CompactSet]]
+
+    def __init__(self, setType: type):
+        self.varPtrSet = defaultdict(setType)
+        self.attrPtrSet = defaultdict(lambda: defaultdict(setType))
+
+    def _compact(self, pointer: Pointer) -> CompactSet:
+        if(isinstance(pointer, VarPtr)):
+            return self.varPtrSet[pointer.index]
+        elif(isinstance(pointer, AttrPtr)):
+            return self.attrPtrSet[pointer.obj.index][pointer.attrIndex]
+
+    def put(self, pointer: Pointer, obj: Object) -> bool:
+        return len(self._compact(pointer).addAll((obj, ))) > 0
+
+    def putAll(self, pointer: Pointer, objs: Iterable[Object]) -> CompactObjects:
+        return CompactObjects(self._compact(pointer).addAll(objs))
+
+    def get(self, pointer: Pointer) -> CompactObjects:
+        return CompactObjects(self._compact(pointer))
+
+    def equal(self, a: Pointer, b: Pointer) -> bool:
+        return self._compact(a) == self._compact(b)
+
+    def merge(self, rep: Pointer, pointers: List[Pointer]) -> Dict[Pointer, CompactObjects]:
+        merged = self._compact(rep)
+        before = {pointer: self._compact(pointer).copy() for pointer in pointers}
+        for pointer in pointers:
+            compact = self._compact(pointer)
+            if(compact is not merged):
+                merged.update(compact)
+        for pointer in pointers:
+            self._store(pointer, merged)
+        # what a copy of the set before gains from the union
+        return {pointer: CompactObjects(compact.addAll(CompactObjects(merged))) for pointer, compact in before.items()}
+
+    def sizeof(self, s: CompactSet) -> int:
+        return s.sizeof()
 
-    
     def to_json(self):
-        attrPtrSet = {str(AttrPtr(obj, attr)):objs for obj, d in self.attrPtrSet.items() for attr, objs in d.items()}
-        varPtrSet = {str(varPtr): s for varPtr, s in self.varPtrSet.items()}
-        return json.dumps(attrPtrSet | varPtrSet, default=json_utils.default, indent=4)
\ No newline at end of file
+        attrPtrSet = {str(AttrPtr.create(symbols.object(obj), symbols.attrName(attr))):s.objects() for obj, d in self.attrPtrSet.items() for attr, s in d.items()}
+        varPtrSet = {str(symbols.pointer(index)): s.objects() for index, s in self.varPtrSet.items()}
+        return json.dumps(attrPtrSet | varPtrSet, default=json_utils.default, indent=4)
+
+
+# Point-to sets are interned in a table and shared by reference, a pointer only keeps the id of its set.
+# A set never changes, a pointer whose set grows gets the id of the union instead.
+# Pointers merged by the solver share one cell, so they grow together.
+# When the memos of the table outgrow the threshold, only the sets of cells are kept, see SetTable.collect.
+class SharedPointToSet(PointToSet):
+    table: SetTable
+    cells: List[int]                                # cell -> set id
+    varPtrSet: Dict[int, int]                       # varPtr.index -> cell
+    attrPtrSet: Dict[int, Dict[int, int]]           # obj.index -> attrIndex -> cell
+
+    def __init__(self):
+        self.table = SetTable()
+        self.cells = []
+        self.varPtrSet = {}
+        self.attrPtrSet = defaultdict(dict)
+        self.collectThreshold = COLLECT_THRESHOLD
+
+    # between operations only cells refer to sets
+    def collect(self):
+        if(self.table.memoized() < self.collectThreshold):
+            return
+        renumber = self.table.collect(self.cells)
+        self.cells = [renumber[id] for id in self.cells]
+        self.collectThreshold = max(COLLECT_THRESHOLD, 2 * len(self.table.sets))
+
+    def _cell(self, pointer: Pointer) -> int:
+        if(isinstance(pointer, VarPtr)):
+            cells, key = self.varPtrSet, pointer.index
+        elif(isinstance(pointer, AttrPtr)):
+            cells, key = self.attrPtrSet[pointer.obj.index], pointer.attrIndex
+        cell = cells.get(key)
+        if(cell is None):
+            cell = cells[key] = len(self.cells)
+            self.cells.append(EMPTY)
+        return cell
+
+    def put(self, pointer: Pointer, obj: Object) -> bool:
+        return len(self.putAll(pointer, frozenset((obj, )))) > 0
+
+    def putAll(self, pointer: Pointer, objs: Set[Object]) -> Set[Object]:
+        self.collect()
+        cell = self._cell(pointer)
+        current = self.cells[cell]
+        incoming = self.table.intern(objs)
+        diff = self.table.difference(incoming, current)
+        if(diff != EMPTY):
+            self.cells[cell] = self.table.union(current, incoming)
+        return self.table.get(diff)
+
+    def get(self, pointer: Pointer) -> Set[Object]:
+        return self.table.get(self.cells[self._cell(pointer)])
+
+    def equal(self, a: Pointer, b: Pointer) -> bool:
+        return self.cells[self._cell(a)] == self.cells[self._cell(b)]
+
+    def merge(self, rep: Pointer, pointers: List[Pointer]) -> Dict[Pointer, Set[Object]]:
+        self.collect()
+        cell = self._cell(rep)
+        merged = self.cells[cell]
+        for pointer in pointers:
+            merged = self.table.union(merged, self.cells[self._cell(pointer)])
+        deltas = {pointer: self.table.get(self.table.difference(merged, self.cells[self._cell(pointer)])) for pointer in pointers}
+        self.cells[cell] = merged
+        for pointer in pointers:
+            self._store(pointer, cell)
+        return deltas
+
+    def _store(self, pointer: Pointer, cell: int):
+        if(isinstance(pointer, VarPtr)):
+            self.varPtrSet[pointer.index] = cell
+        elif(isinstance(pointer, AttrPtr)):
+            self.attrPtrSet[pointer.obj.index][pointer.attrIndex] = cell
+
+    def statistics(self) -> Dict[str, int]:
+        pointers = list(self.varPtrSet.values()) + [cell for d in self.attrPtrSet.values() for cell in d.values()]
+        setIds = [self.cells[cell] for cell in pointers]
+        distinct = set(setIds)
+        # what the pointers would take if each of them owned its set
+        owned = sum(sys.getsizeof(set(self.table.get(id))) for id in setIds)
+        shared = sum(self.table.sizeof(id) for id in distinct)
+        overhead = self.table.overhead(distinct)
+        return {
+            "point-to sets": len(distinct),
+            "point-to entries": sum(len(self.table.get(id)) for id in distinct),
+            "point-to bytes": shared,
+            "interned sets": len(self.table.sets),
+            "sharing ratio": f"{len(pointers) / len(distinct):.2f}" if distinct else "0.00",
+            "set table bytes": overhead,
+            "bytes saved": owned - shared - overhead,
+            "set cache hits": self.table.cacheHits,
+            "set table collections": self.table.collections,
+        }
+
+    def to_json(self):
+        attrPtrSet = {str(AttrPtr.create(symbols.object(obj), symbols.attrName(attr))):set(self.table.get(self.cells[cell])) for obj, d in self.attrPtrSet.items() for attr, cell in d.items()}
+        varPtrSet = {str(symbols.pointer(index)): set(self.table.get(self.cells[cell])) for index, cell in self.varPtrSet.items()}
+        return json.dumps(attrPtrSet | varPtrSet, default=json_utils.default, indent=4)
+
+
+POINT_TO_SETS = {
+    "set": PointToSet,
+    "bitset": lambda: CompactPointToSet(BitSet),
+    "array": lambda: CompactPointToSet(ArraySet),
+    "hybrid": lambda: CompactPointToSet(HybridSet),
+    "shared": SharedPointToSet,
+}
+
+def createPointToSet(name: str) -> PointToSet:
+    if(name not in POINT_TO_SETS):
+        raise ValueError(f"Unknown point-to set {name}, choose from {', '.join(POINT_TO_SETS)}.")
+    if(name in ("array", "hybrid") and np is None):
+        raise ValueError(f"Point-to set {name} needs numpy.")
+    return POINT_TO_SETS[name]()
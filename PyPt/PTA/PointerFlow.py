@@ -1,32 +1,89 @@
 from collections import defaultdict
 import json
 from . import json_utils
-from typing import Dict, Set
+from typing import Dict, Iterable, List, Set
+
+from ..Graph import topologicalRanks
 from .Pointers import Pointer
 
 
+# Pointers on a copy cycle always end up with the same point-to set, so they can be merged into one node.
+# Merged pointers are kept in a union-find, only representatives have outgoing edges.
+# Edges pointing to a merged pointer are not rewritten, use find() on successors.
 class PointerFlow:
     forward: Dict[Pointer, Set[Pointer]]
     # backward: Dict[Pointer, Set[Pointer]]
+    parent: Dict[Pointer, Pointer]              # merged pointer -> the one it is merged into
+    groups: Dict[Pointer, List[Pointer]]        # representative -> all pointers merged into it, itself included
     def __init__(self):
         self.forward = defaultdict(set)
         # self.backward = defaultdict(set)
+        self.edgeCount = 0
+        self.parent = {}
+        self.groups = {}
+
+    def find(self, ptr: Pointer) -> Pointer:
+        parent = self.parent
+        if(ptr not in parent):
+            return ptr
+        root = ptr
+        while(root in parent):
+            root = parent[root]
+        while(ptr != root):
+            next = parent[ptr]
+            parent[ptr] = root
+            ptr = next
+        return root
+
+    def members(self, ptr: Pointer) -> List[Pointer]:
+        rep = self.find(ptr)
+        return self.groups.get(rep, [rep])
+
+    # merge pointers into one representative, which is returned
+    def merge(self, ptrs: Iterable[Pointer]) -> Pointer:
+        reps = list({self.find(ptr): None for ptr in ptrs})
+        # the biggest group stays as representative
+        reps.sort(key=lambda rep: len(self.groups.get(rep, ())), reverse=True)
+        rep = reps[0]
+        if(len(reps) == 1):
+            return rep
+        group = self.groups.setdefault(rep, [rep])
+        succs = self.forward[rep]
+        for other in reps[1:]:
+            self.parent[other] = rep
+            group += self.groups.pop(other, [other])
+            succs |= self.forward.pop(other, set())
+        self.forward[rep] = {succ for succ in succs if self.find(succ) != rep}
+        return rep
 
     def put(self, source: Pointer, target: Pointer) -> bool:
-        
+        source = self.find(source)
+        if(self.find(target) == source):
+            return False
         if(target not in self.forward[source]):
             self.forward[source].add(target)
+            self.edgeCount += 1
             # self.backward[target].add(source)
             return True
         else:
             return False
 
     def successors(self, source) -> Set[Pointer]:
-        return self.forward[source]
+        return self.forward[self.find(source)]
+
+    def successorReps(self, source) -> Set[Pointer]:
+        succs = self.forward.get(source, ())
+        if(not self.parent):
+            return succs
+        return {self.find(succ) for succ in succs}
             
     # def precedents(self, target) -> Set[Pointer]:
     #     return self.backward[target]
 
+    # pointers on a cycle share the same rank, otherwise a pointer is ranked before its successors
+    def topologicalOrder(self) -> Dict[Pointer, int]:
+        return topologicalRanks(list(self.forward), self.successorReps)
+
     def to_json(self):
         forward = {str(ptr):s for ptr, s in self.forward.items()}
         backward = defaultdict(set)
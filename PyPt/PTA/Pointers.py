@@ -4,45 +4,88 @@ import typing
 if typing.TYPE_CHECKING:
     from .Objects import Object
 from ..IR.IRStmts import Variable
+from .SymbolTable import symbols
 
+# Pointers are interned by the symbol table, so there is only one pointer for a variable,
+# and only one for an attribute of an object. Use create() instead of the constructors.
 class Pointer:
     id: str
+    index: int
     def __repr__(self) -> str:
         return f"VarPtr: {self.id}"
-    def __eq__(self, other):
-        return isinstance(other, Pointer) and self.id == other.id
 
     def __str__(self):
         return self.readable_name if hasattr(self, 'readable_name') else self.id
 
     def __hash__(self):
-        return hash(self.id)
+        return self.index
 
+# Pointers of variables in the IR are looked up by the name of the variable and the id of its code block,
+# their id and readable name are only built from the variable when they are asked for.
 class VarPtr(Pointer):
-    
-    def __init__(self, id: str, readable_name: str):
-        self.id = id
-        self.readable_name = readable_name
+    variable: Variable                          # None for pointers that have no variable in the IR
+
+    def __init__(self, id: str, readable_name: str, variable: Variable=None):
+        self._id = id
+        self._readable_name = readable_name
+        self.variable = variable
+        self.index = symbols.addPointer(self)
+
+    @property
+    def id(self):
+        return self._id if self.variable is None else self.variable.id
+
+    @property
+    def readable_name(self):
+        return self._readable_name if self.variable is None else self.variable.readable_name
 
     @staticmethod
     def create(var: Variable):
-        return VarPtr(var.id, var.readable_name)
+        key = (var.name, var.belongsTo.id)
+        ptr = symbols.variablePtrs.get(key)
+        if(ptr is None):
+            # the pointer may have been made by its id already, like those restored from a summary
+            id = var.id
+            ptr = symbols.variables.get(id)
+            if(ptr is None):
+                ptr = symbols.variables[id] = VarPtr(None, None, var)
+            symbols.variablePtrs[key] = ptr
+        return ptr
+
+    # for pointers that have no variable in the IR
+    @staticmethod
+    def get(id: str, readable_name: str):
+        ptr = symbols.variables.get(id)
+        if(ptr is None):
+            ptr = symbols.variables[id] = VarPtr(id, readable_name)
+        return ptr
+
 
 
-    
 
 class AttrPtr(Pointer):
     obj: 'Object'
     attr: str
-    
-    def __init__(self, obj, attr):
+    attrIndex: int
+
+    def __init__(self, obj, attr, attrIndex):
         self.obj = obj
         self.attr = attr
-        self.id = f"<{obj.id}>.{attr}"
-        if(hasattr(obj, "readable_name")):
-            self.readable_name = f"<{obj.readable_name}>.{attr}"
-        
-        
+        self.attrIndex = attrIndex
+        self.index = symbols.addPointer(self)
 
+    @staticmethod
+    def create(obj: 'Object', attr: str):
+        attrIndex = symbols.attr(attr)
+        ptr = obj.attrPtrs.get(attrIndex)
+        if(ptr is None):
+            ptr = obj.attrPtrs[attrIndex] = AttrPtr(obj, attr, attrIndex)
+        return ptr
 
+    @property
+    def id(self):
+        return f"<{self.obj.id}>.{self.attr}"
 
+    @property
+    def readable_name(self):
+        return f"<{self.obj.readable_name}>.{self.attr}"
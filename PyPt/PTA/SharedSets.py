@@ -0,0 +1,87 @@
+import sys
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+from .Objects import Object
+
+EMPTY = 0
+
+# Hash-consed point-to sets. Every distinct set is stored once as a frozenset and named by an integer,
+# so equal sets are shared by reference and compared by their ids.
+# Unions and differences of ids are memoized, the solver computes the same ones again and again.
+# Memos and sets nobody refers to pile up, collect drops them, see SharedPointToSet.
+class SetTable:
+    sets: List[FrozenSet[Object]]                   # id -> set
+    ids: Dict[FrozenSet[Object], int]               # set -> id
+    unions: Dict[Tuple[int, int], int]
+    differences: Dict[Tuple[int, int], int]
+
+    def __init__(self):
+        self.sets = [frozenset()]
+        self.ids = {self.sets[EMPTY]: EMPTY}
+        self.unions = {}
+        self.differences = {}
+        self.cacheHits = 0
+        self.collections = 0
+
+    def intern(self, objs: Iterable[Object]) -> int:
+        if(not isinstance(objs, frozenset)):
+            objs = frozenset(objs)
+        id = self.ids.get(objs)
+        if(id is None):
+            id = self.ids[objs] = len(self.sets)
+            self.sets.append(objs)
+        return id
+
+    def get(self, id: int) -> FrozenSet[Object]:
+        return self.sets[id]
+
+    def union(self, a: int, b: int) -> int:
+        if(a == b or b == EMPTY):
+            return a
+        if(a == EMPTY):
+            return b
+        key = (a, b) if a < b else (b, a)
+        id = self.unions.get(key)
+        if(id is None):
+            id = self.unions[key] = self.intern(self.sets[a] | self.sets[b])
+        else:
+            self.cacheHits += 1
+        return id
+
+    # objects in a but not in b
+    def difference(self, a: int, b: int) -> int:
+        if(a == b or a == EMPTY):
+            return EMPTY
+        if(b == EMPTY):
+            return a
+        key = (a, b)
+        id = self.differences.get(key)
+        if(id is None):
+            id = self.differences[key] = self.intern(self.sets[a] - self.sets[b])
+        else:
+            self.cacheHits += 1
+        return id
+
+    def memoized(self) -> int:
+        return len(self.unions) + len(self.differences)
+
+    # Keeps the sets of ids and drops the others and the memos. Returns old id -> new id, EMPTY stays EMPTY.
+    def collect(self, ids: Iterable[int]) -> Dict[int, int]:
+        live = sorted(set(ids) | {EMPTY})
+        renumber = {old: new for new, old in enumerate(live)}
+        self.sets = [self.sets[old] for old in live]
+        self.ids = {objs: id for id, objs in enumerate(self.sets)}
+        self.unions = {}
+        self.differences = {}
+        self.collections += 1
+        return renumber
+
+    def sizeof(self, id: int) -> int:
+        return sys.getsizeof(self.sets[id])
+
+    # the table itself, without the sets in ids
+    def overhead(self, ids: Iterable[int]) -> int:
+        ids = set(ids)
+        size = sys.getsizeof(self.sets) + sys.getsizeof(self.ids) + sys.getsizeof(self.unions) + sys.getsizeof(self.differences)
+        size += sum(sys.getsizeof(key) for memo in (self.unions, self.differences) for key in memo)
+        return size + sum(self.sizeof(id) for id in range(len(self.sets)) if id not in ids)
@@ -0,0 +1,59 @@
+from typing import Dict, List, Tuple
+import typing
+
+if typing.TYPE_CHECKING:
+    from .Objects import Object
+    from .Pointers import Pointer, VarPtr
+
+# Dense integer ids for everything the solver touches.
+# Pointers and objects are interned, so they can be compared by identity and hashed by their index,
+# strings are only needed when something is exported.
+# Every analysis owns a table, so indices start from 0 for each of them and a table goes away with its analysis.
+# symbols is the table of the analysis in use, an analysis switches to its own when it is created and when it solves.
+class SymbolTable:
+    variables: Dict[str, 'VarPtr']                  # variable's id -> its pointer
+    variablePtrs: Dict[Tuple[str, str], 'VarPtr']   # (variable's name, its code block's id) -> its pointer, not to build the id to look it up
+    contextVariables: Dict[Tuple[int, int], 'VarPtr']   # (context, index of a variable's pointer) -> its pointer in the context
+    pointers: List['Pointer']                       # index -> pointer
+    objects: List['Object']                         # index -> object
+    attrs: Dict[str, int]                           # attribute name -> index
+    attrNames: List[str]                            # index -> attribute name
+
+    def __init__(self):
+        self.variables = {}
+        self.variablePtrs = {}
+        self.contextVariables = {}
+        self.pointers = []
+        self.objects = []
+        self.attrs = {}
+        self.attrNames = []
+
+    # Makes this the view of the other table, what is interned through it is interned in the other one.
+    def use(self, table: 'SymbolTable'):
+        self.__dict__.update(table.__dict__)
+
+    def addPointer(self, ptr: 'Pointer') -> int:
+        self.pointers.append(ptr)
+        return len(self.pointers) - 1
+
+    def addObject(self, obj: 'Object') -> int:
+        self.objects.append(obj)
+        return len(self.objects) - 1
+
+    def attr(self, name: str) -> int:
+        index = self.attrs.get(name)
+        if(index is None):
+            index = self.attrs[name] = len(self.attrNames)
+            self.attrNames.append(name)
+        return index
+
+    def attrName(self, index: int) -> str:
+        return self.attrNames[index]
+
+    def pointer(self, index: int) -> 'Pointer':
+        return self.pointers[index]
+
+    def object(self, index: int) -> 'Object':
+        return self.objects[index]
+
+symbols = SymbolTable()
@@ -0,0 +1,75 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .Objects import BuiltinObject, Object
+from .Pointers import Pointer
+
+# builtin objects widened into one of their kind, see Analysis.widen
+WIDENED_PREFIX = "Builtin($widened"
+# kind of builtin objects whose type isn't known, like those read from a summary
+UNKNOWN_KIND = "builtin"
+
+def summaryID(kind: str) -> str:
+    return f"{WIDENED_PREFIX}.{kind})"
+
+def isSummary(obj: Object) -> bool:
+    return obj.id.startswith(WIDENED_PREFIX)
+
+# When a pointer has more than limit builtin objects of a kind, the ones past the limit are widened:
+# they become the summary object of their kind everywhere, so that they stop flowing one by one to every successor.
+# Kinds are builtin types, all of them unless kinds is given. Functions, classes and other objects calls are resolved on
+# are never widened. Objects of a kind are counted as they reach a pointer, pointers merged later may have more than limit.
+class Widening:
+    limit: int
+    kinds: Optional[Set[str]]
+    counts: Dict[Pointer, Dict[str, int]]       # pointer -> kind -> objects counted
+    replaced: Dict[Pointer, Dict[str, int]]     # pointer -> kind -> objects widened there
+    saved: int                                  # objects not propagated to the successors of widened pointers
+
+    def __init__(self, limit: int=32, kinds: Iterable[str]=None):
+        self.limit = limit
+        self.kinds = set(kinds) if kinds is not None else None
+        self.counts = defaultdict(lambda: defaultdict(int))
+        self.replaced = defaultdict(lambda: defaultdict(int))
+        self.saved = 0
+
+    def kindOf(self, obj: Object) -> Optional[str]:
+        if(not isinstance(obj, BuiltinObject) or isSummary(obj)):
+            return None
+        kind = obj.type or UNKNOWN_KIND
+        if(self.kinds is None or kind in self.kinds):
+            return kind
+
+    # Counts the objects new to the pointer, returns those past the limit.
+    def count(self, ptr: Pointer, objs: Iterable[Object]) -> List[Object]:
+        counts = None
+        surplus = []
+        for obj in objs:
+            kind = self.kindOf(obj)
+            if(kind is None):
+                continue
+            if(counts is None):
+                counts = self.counts[ptr]
+            counts[kind] += 1
+            if(counts[kind] > self.limit):
+                surplus.append(obj)
+        return surplus
+
+    # the surplus of the pointer is replaced by summaries, added is how many of them are new to it
+    def record(self, ptr: Pointer, surplus: List[Object], added: int, successors: int):
+        replaced = self.replaced[ptr]
+        for obj in surplus:
+            replaced[self.kindOf(obj)] += 1
+        self.saved += (len(surplus) - added) * successors
+
+    # widened pointers, most objects widened first
+    def report(self) -> List[Tuple[str, Dict[str, int]]]:
+        report = [(str(ptr), dict(kinds)) for ptr, kinds in self.replaced.items()]
+        report.sort(key=lambda item: -sum(item[1].values()))
+        return report
+
+    def statistics(self) -> Dict[str, int]:
+        return {
+            "widened pointers": len(self.replaced),
+            "saved propagations": self.saved,
+        }
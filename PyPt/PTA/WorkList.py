@@ -0,0 +1,202 @@
+from collections import defaultdict, deque
+import heapq
+from typing import Deque, Dict, List, Set, Tuple
+
+from .Objects import Object
+from .PointerFlow import PointerFlow
+from .Pointers import Pointer
+
+ADD_POINTS_TO = 1
+BIND_STMT = 2
+
+# Entries are (ADD_POINTS_TO, pointer, objects) or (BIND_STMT, stmt).
+# Pending ADD_POINTS_TO entries for the same pointer are coalesced into one delta set,
+# so a pointer is propagated once per round instead of once per producer.
+# The coalesced entry keeps the position of the earliest one.
+class WorkList:
+    name: str
+    pending: Dict[Pointer, Set[Object]]
+    owned: Set[Pointer]                     # pointers whose pending set is a private copy
+
+    def __init__(self):
+        self.pending = {}
+        self.owned = set()
+        self.pushed = 0
+        self.coalesced = 0
+        self.popped = 0
+
+    def append(self, item: Tuple):
+        self.pushed += 1
+        if(item[0] != ADD_POINTS_TO):
+            self._put(item)
+            return
+
+        _, ptr, objs = item
+        if(not objs):
+            return
+        if(ptr not in self.pending):
+            # objs may be a live point-to set, it is copied only when something is merged into it
+            self.pending[ptr] = objs
+            self._put((ADD_POINTS_TO, ptr))
+        else:
+            self.coalesced += 1
+            if(ptr in self.owned):
+                self.pending[ptr] |= objs
+            else:
+                self.pending[ptr] = self.pending[ptr] | objs
+                self.owned.add(ptr)
+
+    def pop(self) -> Tuple:
+        self.popped += 1
+        self.refresh()
+        item = self._take()
+        if(item[0] == ADD_POINTS_TO):
+            ptr = item[1]
+            self.owned.discard(ptr)
+            return ADD_POINTS_TO, ptr, self.pending.pop(ptr)
+        return item
+
+    def statistics(self) -> Dict[str, int]:
+        return {
+            "worklist": self.name,
+            "pushed": self.pushed,
+            "coalesced": self.coalesced,
+            "popped": self.popped,
+        }
+
+    # called before every pop
+    def refresh(self):
+        pass
+
+    def _put(self, item: Tuple):
+        raise NotImplementedError
+
+    def _take(self) -> Tuple:
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class FIFOWorkList(WorkList):
+    name = "fifo"
+    queue: Deque[Tuple]
+
+    def __init__(self):
+        super().__init__()
+        self.queue = deque()
+
+    def _put(self, item: Tuple):
+        self.queue.append(item)
+
+    def _take(self) -> Tuple:
+        return self.queue.popleft()
+
+    def __len__(self):
+        return len(self.queue)
+
+
+class LIFOWorkList(WorkList):
+    name = "lifo"
+    stack: List[Tuple]
+
+    def __init__(self):
+        super().__init__()
+        self.stack = []
+
+    def _put(self, item: Tuple):
+        self.stack.append(item)
+
+    def _take(self) -> Tuple:
+        return self.stack.pop()
+
+    def __len__(self):
+        return len(self.stack)
+
+
+# Entries with smaller priority are taken first, ties are broken by insertion order.
+# By default statements are bound before any points-to set is propagated.
+class PriorityWorkList(WorkList):
+    name = "priority"
+    heap: List[Tuple[int, int, Tuple]]
+
+    def __init__(self):
+        super().__init__()
+        self.heap = []
+        self.seq = 0
+
+    def priority(self, item: Tuple) -> int:
+        return 0 if item[0] == BIND_STMT else 1
+
+    def _put(self, item: Tuple):
+        heapq.heappush(self.heap, (self.priority(item), self.seq, item))
+        self.seq += 1
+
+    def _take(self) -> Tuple:
+        return heapq.heappop(self.heap)[2]
+
+    def __len__(self):
+        return len(self.heap)
+
+
+# Points-to sets are propagated in the topological order of the pointer flow graph,
+# so that a pointer usually receives all deltas from its predecessors before it is propagated itself.
+# The order is only approximate: it is recomputed when the graph has grown enough since the last time,
+# pointers created since then are taken after all ranked ones.
+class TopologicalWorkList(PriorityWorkList):
+    name = "topological"
+    pointerFlow: PointerFlow
+    ranks: Dict[Pointer, int]
+
+    def __init__(self, pointerFlow: PointerFlow):
+        super().__init__()
+        self.pointerFlow = pointerFlow
+        self.ranks = {}
+        self.rankedEdges = 0
+        self.recomputes = 0
+        self.sccs = 0
+        self.largestSCC = 0
+
+    def priority(self, item: Tuple) -> int:
+        if(item[0] == BIND_STMT):
+            return -1
+        return self.ranks.get(self.pointerFlow.find(item[1]), len(self.ranks))
+
+    def refresh(self):
+        edges = self.pointerFlow.edgeCount
+        if(edges - self.rankedEdges < max(128, self.rankedEdges // 2)):
+            return
+        self.ranks = self.pointerFlow.topologicalOrder()
+        self.rankedEdges = edges
+        self.recomputes += 1
+
+        sizes = defaultdict(int)
+        for rank in self.ranks.values():
+            sizes[rank] += 1
+        self.sccs = len(sizes)
+        self.largestSCC = max(sizes.values(), default=0)
+
+        self.heap = [(self.priority(item), seq, item) for _, seq, item in self.heap]
+        heapq.heapify(self.heap)
+
+    def statistics(self) -> Dict[str, int]:
+        stats = super().statistics()
+        stats["order recomputes"] = self.recomputes
+        stats["sccs"] = self.sccs
+        stats["largest scc"] = self.largestSCC
+        return stats
+
+
+WORKLISTS = {
+    "fifo": FIFOWorkList,
+    "lifo": LIFOWorkList,
+    "priority": PriorityWorkList,
+    "topological": TopologicalWorkList,
+}
+
+def createWorkList(name: str, pointerFlow: PointerFlow) -> WorkList:
+    if(name not in WORKLISTS):
+        raise ValueError(f"Unknown worklist strategy {name}, choose from {', '.join(WORKLISTS)}.")
+    if(name == "topological"):
+        return TopologicalWorkList(pointerFlow)
+    return WORKLISTS[name]()
@@ -0,0 +1,264 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from .Graph import stronglyConnectedComponents
+from .IR.ClassCodeBlock import ClassCodeBlock
+from .IR.CodeBlock import CodeBlock
+from .IR.FunctionCodeBlock import FunctionCodeBlock
+from .IR.IRStmts import Assign, Call, DelAttr, GetAttr, IRStmt, New, NewClass, NewFunction, NewStaticMethod, NewSuper, SetAttr, Variable
+from .IR.ModuleCodeBlock import ModuleCodeBlock
+
+# Offline pointer equivalence by hash-based value numbering (HVN).
+# Every variable gets a label, variables with the same label in the same code block must have the same point-to set,
+# so all of them can be replaced by one representative before the analysis starts.
+#   - allocations and calls get a new label for each statement
+#   - a copy inside one code block carries the label of its source,
+#     a copy from a variable of another code block is labeled by that variable
+#   - loads of the same attribute from the same label get the same label
+#   - the label of a variable is the set of labels it receives, a set of one label is the label itself
+# Variables that the analysis defines or reads by itself (parameters, return values, $global, $thisClass),
+# and variables defined in other code blocks, are never replaced, but they can be representatives.
+class PointerEquivalence:
+    codeBlocks: List[CodeBlock]
+    variables: Dict[str, Variable]                  # id -> variable, in order of appearance
+    copySources: Dict[str, Set[str]]
+    copyTargets: Dict[str, Set[str]]
+    loads: Dict[str, Set[Tuple[str, str]]]         # target -> (source, attr)
+    loadTargets: Dict[str, Set[str]]
+    defLabels: Dict[str, Set[int]]
+    pinned: Set[str]
+    labels: Dict[str, int]
+    keyLabels: Dict[Any, int]
+    replacement: Dict[str, Variable]
+
+    def __init__(self, codeBlocks: List[CodeBlock]):
+        self.codeBlocks = allCodeBlocks(codeBlocks)
+        self.variables = {}
+        self.copySources = defaultdict(set)
+        self.copyTargets = defaultdict(set)
+        self.loads = defaultdict(set)
+        self.loadTargets = defaultdict(set)
+        self.defLabels = defaultdict(set)
+        self.pinned = set()
+        self.labels = {}
+        self.keyLabels = {}
+        self.replacement = {}
+        self.nextLabel = 0
+        self.removedStmts = 0
+
+    def start(self):
+        self.collect()
+        self.label()
+        self.rewrite()
+
+    def newLabel(self) -> int:
+        label = self.nextLabel
+        self.nextLabel += 1
+        return label
+
+    # the same key always gets the same label
+    def keyLabel(self, key) -> int:
+        if(key not in self.keyLabels):
+            self.keyLabels[key] = self.newLabel()
+        return self.keyLabels[key]
+
+    def addVariable(self, var: Variable):
+        if(var is not None and var.id not in self.variables):
+            self.variables[var.id] = var
+
+    def pin(self, var: Variable):
+        if(var is not None):
+            self.addVariable(var)
+            self.pinned.add(var.id)
+
+    def define(self, var: Variable, stmt: IRStmt, label: int=None):
+        self.addVariable(var)
+        if(var.belongsTo != stmt.belongsTo):
+            self.pin(var)
+        else:
+            self.defLabels[var.id].add(self.newLabel() if label is None else label)
+
+    def collect(self):
+        for codeBlock in self.codeBlocks:
+            if(isinstance(codeBlock, ModuleCodeBlock)):
+                self.pin(codeBlock.globalVariable)
+            elif(isinstance(codeBlock, ClassCodeBlock)):
+                self.pin(codeBlock.thisClassVariable)
+            elif(isinstance(codeBlock, FunctionCodeBlock)):
+                self.pin(codeBlock.returnVariable)
+                for param in codeBlock.posargs:
+                    self.pin(param)
+                for param in codeBlock.kwargs.values():
+                    self.pin(param)
+                self.pin(codeBlock.vararg)
+                self.pin(codeBlock.kwarg)
+
+        for codeBlock in self.codeBlocks:
+            for stmt in codeBlock.stmts:
+                for var in usedVariables(stmt):
+                    self.addVariable(var)
+                if(isinstance(stmt, Assign)):
+                    source, target = stmt.source, stmt.target
+                    if(target.belongsTo != stmt.belongsTo):
+                        self.pin(target)
+                    elif(source.belongsTo == stmt.belongsTo):
+                        self.copySources[target.id].add(source.id)
+                        self.copyTargets[source.id].add(target.id)
+                    else:
+                        self.define(target, stmt, self.keyLabel(("var", source.id)))
+                elif(isinstance(stmt, GetAttr)):
+                    source, target = stmt.source, stmt.target
+                    if(target.belongsTo != stmt.belongsTo):
+                        self.pin(target)
+                    elif(source.belongsTo == stmt.belongsTo):
+                        self.loads[target.id].add((source.id, stmt.attr))
+                        self.loadTargets[source.id].add(target.id)
+                    else:
+                        self.define(target, stmt, self.keyLabel(("get", ("var", source.id), stmt.attr)))
+                elif(isinstance(stmt, (New, Call))):
+                    self.define(stmt.target, stmt)
+
+        # pinned variables may be defined by the analysis, and variables without any definition are unknown
+        for id in self.variables:
+            if(id in self.pinned or (id not in self.defLabels and id not in self.copySources and id not in self.loads)):
+                self.defLabels[id].add(self.newLabel())
+
+    def label(self):
+        def dependents(id):
+            return list(self.copyTargets.get(id, ())) + list(self.loadTargets.get(id, ()))
+
+        # components come with sinks first, labels are needed from sources to targets
+        for component in reversed(stronglyConnectedComponents(list(self.variables), dependents)):
+            if(len(component) == 1):
+                self.labelComponent(component, component)
+                continue
+            members = set(component)
+            copyTargets = lambda id: [target for target in self.copyTargets.get(id, ()) if target in members]
+            # only copy cycles have the same point-to set, a cycle through loads doesn't
+            for copyComponent in reversed(stronglyConnectedComponents(component, copyTargets)):
+                self.labelComponent(copyComponent, members)
+
+    def labelComponent(self, component: List[str], dependencyCycle: Iterable[str]):
+        members = set(component)
+        received = set()
+        for id in component:
+            received |= self.defLabels.get(id, set())
+            for source in self.copySources.get(id, ()):
+                if(source not in members):
+                    received.add(self.labels[source])
+            for source, attr in self.loads.get(id, ()):
+                if(source in dependencyCycle):
+                    # loading from itself, like x = x.next
+                    received.add(self.newLabel())
+                else:
+                    received.add(self.keyLabel(("get", self.labels[source], attr)))
+        if(len(received) == 1):
+            label = next(iter(received))
+        else:
+            # an empty set means a copy cycle that receives nothing
+            label = self.keyLabel(frozenset(received))
+        for id in component:
+            self.labels[id] = label
+
+    def rewrite(self):
+        classes = defaultdict(list)
+        for id, var in self.variables.items():
+            classes[(var.belongsTo.id, self.labels[id])].append(var)
+
+        for members in classes.values():
+            if(len(members) == 1):
+                continue
+            pinned = [var for var in members if var.id in self.pinned]
+            rep = pinned[0] if pinned else members[0]
+            for var in members:
+                if(var.id not in self.pinned):
+                    self.replacement[var.id] = rep
+
+        for codeBlock in self.codeBlocks:
+            stmts = []
+            # copies, loads and stores that become the same constraint are kept once
+            seen = set()
+            for stmt in codeBlock.stmts:
+                self.replaceStmt(stmt)
+                if(isinstance(stmt, Assign) and stmt.source.id == stmt.target.id):
+                    self.removedStmts += 1
+                    continue
+                if(isinstance(stmt, Assign)):
+                    key = ("=", stmt.target.id, stmt.source.id)
+                elif(isinstance(stmt, (GetAttr, SetAttr))):
+                    key = (type(stmt), stmt.target.id, stmt.source.id, stmt.attr)
+                else:
+                    key = None
+                if(key is not None):
+                    if(key in seen):
+                        self.removedStmts += 1
+                        continue
+                    seen.add(key)
+                stmts.append(stmt)
+            codeBlock.stmts = stmts
+
+    def replace(self, var: Variable) -> Variable:
+        if(var is None):
+            return None
+        return self.replacement.get(var.id, var)
+
+    def replaceStmt(self, stmt: IRStmt):
+        if(isinstance(stmt, (Assign, SetAttr, GetAttr))):
+            stmt.target = self.replace(stmt.target)
+            stmt.source = self.replace(stmt.source)
+        elif(isinstance(stmt, New)):
+            stmt.target = self.replace(stmt.target)
+            if(isinstance(stmt, NewClass)):
+                stmt.bases = [self.replace(base) for base in stmt.bases]
+            elif(isinstance(stmt, NewStaticMethod)):
+                stmt.func = self.replace(stmt.func)
+            elif(isinstance(stmt, NewSuper)):
+                stmt.type = self.replace(stmt.type)
+                stmt.bound = self.replace(stmt.bound)
+        elif(isinstance(stmt, Call)):
+            stmt.target = self.replace(stmt.target)
+            stmt.callee = self.replace(stmt.callee)
+            stmt.posargs = [self.replace(arg) for arg in stmt.posargs]
+            stmt.kwargs = {kw:self.replace(arg) for kw, arg in stmt.kwargs.items()}
+        elif(isinstance(stmt, DelAttr)):
+            stmt.var = self.replace(stmt.var)
+
+    def statistics(self) -> Dict[str, int]:
+        before = len(self.variables)
+        after = before - len(self.replacement)
+        return {
+            "variables": before,
+            "variables after hvn": after,
+            "removed statements": self.removedStmts,
+            "reduction ratio": f"{1 - after / before:.2%}" if before else "0.00%",
+        }
+
+# code blocks of functions and classes are only reachable from statements that create them
+def allCodeBlocks(codeBlocks: List[CodeBlock]) -> List[CodeBlock]:
+    result = []
+    stack = list(codeBlocks)
+    while(stack):
+        codeBlock = stack.pop()
+        result.append(codeBlock)
+        for stmt in codeBlock.stmts:
+            if(isinstance(stmt, (NewFunction, NewClass))):
+                stack.append(stmt.codeBlock)
+    return result
+
+def usedVariables(stmt: IRStmt) -> List[Variable]:
+    if(isinstance(stmt, (Assign, SetAttr, GetAttr))):
+        return [stmt.target, stmt.source]
+    elif(isinstance(stmt, New)):
+        vars = [stmt.target]
+        if(isinstance(stmt, NewClass)):
+            vars += stmt.bases
+        elif(isinstance(stmt, NewStaticMethod)):
+            vars.append(stmt.func)
+        elif(isinstance(stmt, NewSuper)):
+            vars += [stmt.type, stmt.bound]
+        return vars
+    elif(isinstance(stmt, Call)):
+        return [stmt.target, stmt.callee] + list(stmt.posargs) + list(stmt.kwargs.values())
+    elif(isinstance(stmt, DelAttr)):
+        return [stmt.var]
+    return []
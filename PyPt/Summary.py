@@ -1,38 +1,401 @@
+from collections import defaultdict
+import hashlib
+import os
+import pickle
+import sys
+from typing import Any, Dict, List, Optional, Set, Tuple
+import typing
 
-from typing import Dict, List, Set, Tuple
+from .IR.ClassCodeBlock import ClassCodeBlock
+from .IR.CodeBlock import CodeBlock
+from .IR.FunctionCodeBlock import FunctionCodeBlock
+from .IR.IRStmts import Call, DelAttr, IRStmt, NewClass, NewStaticMethod, NewSuper, Variable
+from .IR.ModuleCodeBlock import ModuleCodeBlock
+from .PointerEquivalence import allCodeBlocks
+from .PTA.Analysis import Analysis
+from .PTA.IncrementalAnalysis import PTR_VAR, StateWriter, dependencies
+from .PTA.ObjectPool import OBJ_BUILTIN, OBJ_CLASS, OBJ_FAKE, OBJ_FUNCTION, OBJ_MODULE
+from .PTA.Objects import BuiltinObject, ClassObject, FunctionObject, Object
+from .PTA.Pointers import AttrPtr, Pointer, VarPtr
+from .PTA.SymbolTable import symbols
 
-from PyPt.PTA.ClassHiearchy import ClassHiearchy
+if typing.TYPE_CHECKING:
+    from .ModuleManager import ModuleManager
 
-from .PTA.Objects import ModuleObject
+# bump it when the analysis or what is saved changes, summaries of other versions are never read
+SUMMARY_VERSION = 1
 
-from .PTA.PointToSet import PointToSet
+BLOCK_MODULE = 0
+BLOCK_FUNCTION = 1
+BLOCK_CLASS = 2
 
+def fileDigest(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except(OSError):
+        return None
 
-# all modules', classes', functions' attribtues
-# relevant to return variable, 
-# 
+# every code block of the modules, so that a summary is built as if any of them could be called
+def libraryEntrys(moduleManager: 'ModuleManager') -> List[CodeBlock]:
+    return allCodeBlocks(moduleManager.allCodeBlocks())
+
+
+# The solved state of library modules, so that programs using them don't lower and solve them again.
+# It is built from an analysis that treats every code block of the library as reachable,
+# so whatever a program calls has been analyzed already. Loading it puts the analysis where solving the library left it:
+# point-to sets, flows, statements binding pointers, the class hiearchy and the callgraph.
+# The program then only adds its own facts, which flow into the library through parameters and attributes.
+# Pointers those can't reach never get new objects, so their flows and bindings are left out.
+# Code blocks of the library are kept as stubs without statements, they carry the names and ids objects refer to.
 class Summary:
-    name: str
-    classes: Dict[str, str] # class attributes, mro
-    functions: Dict[str, Dict[str, str]] # paramenter, return
-    modules: Dict[str, str] # 
-    builtins: List[str]
-    attrs: Dict[Tuple[str, str], Set[str]]
-    flow: List[Tuple[str, str]]
-    
-    # project: str
-    # pointsTo: PointToSet
-    # classHiearchy: ClassHiearchy
-    def __init__(self):
-        pass
-
-    def load():
-        pass
-
-    def export(self) -> Dict[str, str]:
-        # start from head module
-        head = ModuleObject()
-
-
-    
+    state: Dict[str, Any]
+    codeBlocks: Dict[str, CodeBlock]
+
+    def __init__(self, state: Dict[str, Any]):
+        self.state = state
+        self.codeBlocks = None
+
+    # module name -> (file, path, digest of the source)
+    @property
+    def modules(self) -> Dict[str, Tuple[str, Optional[List[str]], str]]:
+        return self.state["modules"]
+
+    @staticmethod
+    def load(path: str) -> 'Summary':
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+        except(Exception):
+            raise ValueError(f"Can't read summary {path}.")
+        if(not isinstance(state, dict) or state.get("version") != SUMMARY_VERSION):
+            raise ValueError(f"{path} is not a summary of this version.")
+        if(state["python"] != sys.version):
+            raise ValueError(f"{path} summarizes modules of another python.")
+        for name, (file, _, digest) in state["modules"].items():
+            if(fileDigest(file) != digest):
+                raise ValueError(f"{path} is out of date, {name} has changed since.")
+        return Summary(state)
+
+    def save(self, path: str):
+        # written aside and renamed, so other runs never read half of a summary
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(self.state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def moduleCodeBlock(self, name: str) -> ModuleCodeBlock:
+        return self.stubs()[name]
+
+    def stubs(self) -> Dict[str, CodeBlock]:
+        if(self.codeBlocks is None):
+            self.codeBlocks = {}
+            for record in self.state["blocks"]:
+                codeBlock = self._stub(*record)
+                self.codeBlocks[codeBlock.id] = codeBlock
+        return self.codeBlocks
+
+    def _stub(self, kind: int, *args) -> CodeBlock:
+        if(kind == BLOCK_MODULE):
+            name, globalNames = args
+            codeBlock = ModuleCodeBlock(name)
+            codeBlock.globalNames = set(globalNames)
+            return codeBlock
+
+        name, enclosing, id, newID, *args = args
+        enclosing = self.codeBlocks[enclosing]
+        if(kind == BLOCK_FUNCTION):
+            posargs, kwargs, vararg, kwarg = args
+            codeBlock = FunctionCodeBlock(name, enclosing, id)
+            codeBlock.posargs = [Variable(arg, codeBlock) for arg in posargs]
+            codeBlock.kwargs = {kw: Variable(arg, codeBlock) for kw, arg in kwargs.items()}
+            codeBlock.vararg = vararg and Variable(vararg, codeBlock)
+            codeBlock.kwarg = kwarg and Variable(kwarg, codeBlock)
+        else:
+            attributes, = args
+            codeBlock = ClassCodeBlock(name, enclosing, id)
+            codeBlock.declaredGlobal = set()
+            codeBlock.attributes = set(attributes)
+        codeBlock.newID = newID
+        return codeBlock
+
+    # An analysis that gave up precision or stopped over its budget would be taken as the whole library later.
+    @staticmethod
+    def build(moduleManager: 'ModuleManager', analysis: Analysis) -> 'Summary':
+        if(analysis.degradations):
+            raise ValueError(f"Can't summarize an analysis that had to {', '.join(analysis.degradations)}.")
+        return Summary(SummaryWriter(moduleManager, analysis).export())
+
+    # Puts the library's state into the analysis before it solves a program.
+    def restore(self, analysis: Analysis):
+        state = self.state
+        codeBlocks = self.stubs()
+        reader = SummaryReader(analysis, state, codeBlocks)
+
+        for index, objs in state["pointToSet"].items():
+            analysis.pointToSet.putAll(reader.pointer(index), {reader.object(obj) for obj in objs})
+        for source, targets in state["flows"].items():
+            source = reader.pointer(source)
+            for target in targets:
+                analysis.pointerFlow.put(source, reader.pointer(target))
+        for source, target, attr in state["gets"]:
+            analysis.attrGraph.putGet(reader.pointer(target), reader.pointer(source), attr)
+        for target, source, attr in state["sets"]:
+            analysis.attrGraph.putSet(reader.pointer(target), reader.pointer(source), attr)
+
+        stmts = [reader.stmt(*record) for record in state["stmts"]]
+        for opname, bindings in state["bindings"].items():
+            for ptr, stmt, *operands in bindings:
+                analysis.bindingStmts.bind(opname, reader.pointer(ptr), (stmts[stmt], *operands))
+
+        mros = [tuple(reader.object(cls) for cls in mro) for mro in state["mros"]]
+        classHiearchy = analysis.classHiearchy
+        for cls, indices in state["classMROs"].items():
+            classHiearchy.mros[reader.object(cls)] = {mros[index] for index in indices}
+        for base, subClasses in state["subClasses"].items():
+            classHiearchy.subClasses[reader.object(base)] = {(reader.object(cls), index) for cls, index in subClasses}
+        for cls, attrs in state["persistAttrs"].items():
+            persist = analysis.persist_attr[reader.object(cls)]
+            for attr, infos in attrs.items():
+                persist[attr] = {(reader.object(resolver), mros[mro], index) for resolver, mro, index in infos}
+        for resolver, attrs in state["resolvedAttrs"].items():
+            analysis.resolved_attr[reader.object(resolver)] = set(attrs)
+        for caller, callees in state["callgraph"].items():
+            analysis.callgraph[caller] |= set(callees)
+
+
+class SummaryWriter:
+    def __init__(self, moduleManager: 'ModuleManager', analysis: Analysis):
+        self.moduleManager = moduleManager
+        self.analysis = analysis
+        self.writer = StateWriter()
+        self.stmts = []
+        self.stmtIndex = {}
+        self.mros = []
+        self.mroIndex = {}
+
+    def export(self) -> Dict[str, Any]:
+        analysis = self.analysis
+        writer = self.writer
+        pts = analysis.pointToSet
+
+        modules = {}
+        blocks = []
+        for name, m in self.moduleManager.modules.items():
+            module = m.__codeBlock__
+            if(not isinstance(module, ModuleCodeBlock)):
+                continue
+            modules[name] = (m.__file__, m.__path__, fileDigest(m.__file__))
+            # enclosing code blocks come first
+            blocks += [self.block(codeBlock) for codeBlock in allCodeBlocks([module])]
+
+        pointToSet = {}
+        for ptr in pts.allPointers():
+            objs = pts.get(ptr)
+            if(objs):
+                pointToSet[writer.pointer(ptr)] = [writer.object(obj) for obj in objs]
+
+        open = self.openPointers()
+        pointerFlow = analysis.pointerFlow
+        flows = defaultdict(list)
+        for rep, targets in pointerFlow.forward.items():
+            for member in pointerFlow.members(rep):
+                if(member in open):
+                    flows[writer.pointer(member)] += [writer.pointer(target) for target in targets]
+        # merged pointers have the same point-to set, flows both ways keep it so
+        for rep, group in pointerFlow.groups.items():
+            if(rep in open):
+                for member in group:
+                    if(member != rep):
+                        flows[writer.pointer(rep)].append(writer.pointer(member))
+                        flows[writer.pointer(member)].append(writer.pointer(rep))
+
+        gets = [(writer.pointer(source), writer.pointer(target), attr)
+                for source, targets in self.keyed(analysis.attrGraph.get_forward, open) for target, attr in targets]
+        sets = [(writer.pointer(target), writer.pointer(source), attr)
+                for target, sources in self.keyed(analysis.attrGraph.set_backward, open) for source, attr in sources]
+
+        bindings = {}
+        for opname, binding in analysis.bindingStmts.bindings.items():
+            bindings[opname] = [(writer.pointer(ptr), self.stmt(stmt), *operands)
+                                for ptr, stmtInfos in self.keyed(binding, open) for stmt, *operands in stmtInfos]
+
+        classHiearchy = analysis.classHiearchy
+        classMROs = {writer.object(cls): [self.mro(mro) for mro in mros] for cls, mros in classHiearchy.mros.items()}
+        subClasses = {writer.object(base): [(writer.object(cls), index) for cls, index in subClasses]
+                        for base, subClasses in classHiearchy.subClasses.items()}
+        persistAttrs = {writer.object(cls): {attr: [(writer.object(resolver), self.mro(mro), index) for resolver, mro, index in infos]
+                                                for attr, infos in attrs.items()}
+                        for cls, attrs in analysis.persist_attr.items()}
+        resolvedAttrs = {writer.object(resolver): sorted(attrs) for resolver, attrs in analysis.resolved_attr.items()}
+        # objects are all written by now, classes need their bases
+        bases = {index: [writer.pointer(base) for base in obj.bases]
+                    for obj, index in list(writer.objectIndex.items()) if writer.objects[index][0] == OBJ_CLASS}
+
+        return {
+            "version": SUMMARY_VERSION,
+            "python": sys.version,
+            "modules": modules,
+            "blocks": blocks,
+            "objects": writer.objects,
+            "pointers": writer.pointers,
+            "bases": bases,
+            "pointToSet": pointToSet,
+            "flows": dict(flows),
+            "gets": gets,
+            "sets": sets,
+            "stmts": self.stmts,
+            "bindings": bindings,
+            "mros": self.mros,
+            "classMROs": classMROs,
+            "subClasses": subClasses,
+            "persistAttrs": persistAttrs,
+            "resolvedAttrs": resolvedAttrs,
+            "callgraph": {caller: sorted(callees) for caller, callees in analysis.callgraph.items() if callees},
+        }
+
+    # Pointers that may get objects from a program: parameters of functions it calls and attributes of objects it sets,
+    # with everything their point-to sets flow into or are depended on by.
+    def openPointers(self) -> Set[Pointer]:
+        analysis = self.analysis
+        successors = defaultdict(list)
+        for source, target in dependencies(analysis):
+            successors[source].append(target)
+
+        stack = []
+        for obj in analysis.objectPool.pool.values():
+            stack += obj.attrPtrs.values()
+            if(isinstance(obj, FunctionObject)):
+                stack += obj.posParams + list(obj.kwParams.values()) + [obj.varParam, obj.kwParam]
+        open = set()
+        while(stack):
+            ptr = stack.pop()
+            if(ptr is None or ptr in open):
+                continue
+            open.add(ptr)
+            stack += analysis.pointerFlow.successors(ptr)
+            stack += successors.get(ptr, ())
+        return open
+
+    # entries of a mapping keyed by pointer indices, for open pointers
+    def keyed(self, mapping: Dict[int, Any], open: Set[Pointer]) -> List[Tuple[Pointer, Any]]:
+        return [(symbols.pointer(index), values) for index, values in mapping.items() if symbols.pointer(index) in open]
+
+    def block(self, codeBlock: CodeBlock) -> Tuple:
+        if(isinstance(codeBlock, ModuleCodeBlock)):
+            return (BLOCK_MODULE, codeBlock.id, sorted(codeBlock.globalNames))
+        enclosing = codeBlock.enclosing
+        name = codeBlock.readable_name[len(enclosing.readable_name) + 1:]
+        id = int(codeBlock.id.rpartition(".$")[2])
+        record = (name, enclosing.id, id, codeBlock.newID)
+        if(isinstance(codeBlock, FunctionCodeBlock)):
+            return (BLOCK_FUNCTION, *record,
+                    [arg.name for arg in codeBlock.posargs],
+                    {kw: arg.name for kw, arg in codeBlock.kwargs.items()},
+                    codeBlock.vararg and codeBlock.vararg.name,
+                    codeBlock.kwarg and codeBlock.kwarg.name)
+        return (BLOCK_CLASS, *record, sorted(codeBlock.attributes))
+
+    def stmt(self, stmt: IRStmt) -> int:
+        index = self.stmtIndex.get(stmt)
+        if(index is not None):
+            return index
+        var = self.var
+        if(isinstance(stmt, Call)):
+            operands = (var(stmt.target), var(stmt.callee), [var(arg) for arg in stmt.posargs], {kw: var(arg) for kw, arg in stmt.kwargs.items()})
+        elif(isinstance(stmt, NewClass)):
+            operands = (var(stmt.target), [var(base) for base in stmt.bases], stmt.codeBlock.id)
+        elif(isinstance(stmt, DelAttr)):
+            operands = (var(stmt.var), stmt.attr)
+        elif(isinstance(stmt, NewStaticMethod)):
+            operands = (var(stmt.target), var(stmt.func))
+        elif(isinstance(stmt, NewSuper)):
+            operands = (var(stmt.target), var(stmt.type), var(stmt.bound))
+        index = self.stmtIndex[stmt] = len(self.stmts)
+        self.stmts.append((type(stmt).__name__, stmt.belongsTo.id, stmt.id, *operands))
+        return index
+
+    def var(self, var: Variable) -> Tuple[str, str]:
+        return var.name, var.belongsTo.id
+
+    def mro(self, mro: Tuple[ClassObject, ...]) -> int:
+        index = self.mroIndex.get(mro)
+        if(index is None):
+            index = self.mroIndex[mro] = len(self.mros)
+            self.mros.append(tuple(self.writer.object(cls) for cls in mro))
+        return index
+
+
+# Makes the objects, pointers and statements of a summary, on its stub code blocks.
+class SummaryReader:
+    def __init__(self, analysis: Analysis, state: Dict[str, Any], codeBlocks: Dict[str, CodeBlock]):
+        self.analysis = analysis
+        self.state = state
+        self.codeBlocks = codeBlocks
+        self.objects = {}
+        self.pointers = {}
+
+    def object(self, index: int) -> Object:
+        obj = self.objects.get(index)
+        if(obj is None):
+            obj = self.objects[index] = self._object(index, *self.state["objects"][index])
+        return obj
+
+    def _object(self, index: int, type: int, *args) -> Object:
+        pool = self.analysis.objectPool
+        if(type == OBJ_FAKE):
+            if(len(args) == 1):
+                return pool.create(OBJ_FAKE, args[0])
+            prefix, source, target, attr = args
+            return pool.create(OBJ_FAKE, self.object(prefix), (self.pointer(source), self.pointer(target), attr))
+        elif(type == OBJ_MODULE):
+            return pool.create(OBJ_MODULE, self.codeBlocks[args[0]])
+        elif(type == OBJ_FUNCTION):
+            return pool.add(FunctionObject.fromCodeBlock(self.codeBlocks[args[0]]))
+        elif(type == OBJ_CLASS):
+            codeBlock = self.codeBlocks[args[0]]
+            bases = [self.pointer(base) for base in self.state["bases"][index]]
+            return pool.add(ClassObject(f"Class({codeBlock.id})", codeBlock.readable_name, bases, codeBlock.attributes))
+        elif(type == OBJ_BUILTIN):
+            blockId, stmtId = args
+            return pool.add(BuiltinObject(f"Builtin({blockId}.${stmtId})"))
+        return pool.create(type, *[self.object(arg) for arg in args])
+
+    def pointer(self, index: int) -> Pointer:
+        ptr = self.pointers.get(index)
+        if(ptr is None):
+            type, *args = self.state["pointers"][index]
+            if(type == PTR_VAR):
+                ptr = VarPtr.get(*args)
+            else:
+                obj, attr = args
+                ptr = AttrPtr.create(self.object(obj), attr)
+            self.pointers[index] = ptr
+        return ptr
+
+    def var(self, record: Tuple[str, str]) -> Variable:
+        name, codeBlock = record
+        return Variable(name, self.codeBlocks[codeBlock])
 
+    # statements are made on the stub they belong to, but not kept in it:
+    # the program may make a stub reachable, everything in the summary has been done already.
+    def stmt(self, type: str, codeBlock: str, id: int, *operands) -> IRStmt:
+        var = self.var
+        codeBlock = self.codeBlocks[codeBlock]
+        if(type == "Call"):
+            target, callee, posargs, kwargs = operands
+            stmt = Call(var(target), var(callee), [var(arg) for arg in posargs], {kw: var(arg) for kw, arg in kwargs.items()}, codeBlock, id)
+        elif(type == "NewClass"):
+            target, bases, classBlock = operands
+            stmt = NewClass(var(target), [var(base) for base in bases], self.codeBlocks[classBlock], codeBlock, id)
+        elif(type == "DelAttr"):
+            target, attr = operands
+            stmt = DelAttr(var(target), attr, codeBlock, id)
+        elif(type == "NewStaticMethod"):
+            target, func = operands
+            stmt = NewStaticMethod(var(target), var(func), codeBlock, id)
+        elif(type == "NewSuper"):
+            target, superType, bound = operands
+            stmt = NewSuper(var(target), var(superType), var(bound), codeBlock, id)
+        codeBlock.stmts.pop()
+        return stmt
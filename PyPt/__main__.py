@@ -3,9 +3,21 @@ import json
 import os
 from PyPt.CSPTA.Analysis import Analysis as csAnalysis
 from PyPt.PTA.Analysis import Analysis
+from PyPt.PTA.BDDAnalysis import BDDAnalysis
+from PyPt.PTA.Budget import Budget
+from PyPt.PTA.Objects import HEAP_ABSTRACTIONS, HEAP_SITE
+from PyPt.PTA.Widening import Widening
+from PyPt.PTA.CallGraphAnalysis import CallGraphAnalysis
+from PyPt.PTA.IncrementalAnalysis import IncrementalAnalysis
 
 from PyPt.ModuleManager import ModuleManager
+from PyPt.ModuleResolver import ModuleResolver
+from PyPt.Summary import Summary, libraryEntrys
+from PyPt.IRCache import IRCache, MAX_SIZE
+from PyPt.PointerEquivalence import PointerEquivalence
 from PyPt.PTA.CallGraph import CallGraph
+from PyPt.PTA.WorkList import WORKLISTS
+from PyPt.PTA.PointToSet import POINT_TO_SETS
 
 
 if __name__ == "__main__":
@@ -31,6 +43,16 @@ if __name__ == "__main__":
         default=False,
         help="Enable context sensitive. It may cost longer time."
     )
+    argparser.add_argument("-k", "--context-depth",
+        type=int,
+        default=1,
+        help="How many call sites a context of -cs keeps."
+    )
+    argparser.add_argument("--selective",
+        action="store_true",
+        default=False,
+        help="With -cs, solve without contexts first and give contexts only to functions whose arguments flow to their return."
+    )
     argparser.add_argument("-o", "--output",
         required=True,
         help="The file path where output callgraph will be stored. The output format will be json."
@@ -44,6 +66,105 @@ if __name__ == "__main__":
     argparser.add_argument("--include",
         help="Specify a string, then output callgraph only contains callers that start with this string."
     )
+    argparser.add_argument("--worklist",
+        choices=list(WORKLISTS),
+        default="fifo",
+        help="The order in which the point-to analysis processes its worklist."
+    )
+    argparser.add_argument("--pts",
+        choices=list(POINT_TO_SETS),
+        default="set",
+        help="How point-to sets are stored, bitset, array and hybrid keep them compact."
+    )
+    argparser.add_argument("--bdd",
+        action="store_true",
+        default=False,
+        help="Keep the point-to relation in BDDs, for programs whose point-to sets don't fit in memory."
+    )
+    argparser.add_argument("--callgraph-only",
+        action="store_true",
+        default=False,
+        help="Leave point-to sets that can't change the callgraph incomplete, the callgraph is the same."
+    )
+    argparser.add_argument("--time-budget",
+        type=float,
+        metavar="SECONDS",
+        help="""Give up precision as the point-to analysis uses up this time: drop context sensitivity, widen large point-to sets,
+                collapse the elements of containers, then stop with a partial callgraph. The steps taken are listed under "$degraded" in the output."""
+    )
+    argparser.add_argument("--memory-budget",
+        type=int,
+        metavar="MB",
+        help="Like --time-budget, for the resident memory of the process."
+    )
+    argparser.add_argument("--widen",
+        type=int,
+        metavar="N",
+        help="When a pointer has more than N builtin objects of a type, replace the others by one object of that type. Functions and classes stay precise."
+    )
+    argparser.add_argument("--widen-kinds",
+        nargs="+",
+        metavar="TYPE",
+        help="Widen only builtin objects of these types, like list or dict."
+    )
+    argparser.add_argument("--heap",
+        choices=list(HEAP_ABSTRACTIONS),
+        default=HEAP_SITE,
+        help="""How builtin objects like lists, tuples and dicts are abstracted: one object per allocation site,
+                per type in each code block, or per type in the whole program. Classes, functions and modules are always per site."""
+    )
+    argparser.add_argument("--hvn",
+        action="store_true",
+        default=False,
+        help="Replace pointer-equivalent variables in the IR by one representative before the analysis."
+    )
+    argparser.add_argument("-j", "--jobs",
+        type=int,
+        default=1,
+        help="Generate the IR of modules in JOBS processes. Modules are found first, then generated in parallel."
+    )
+    argparser.add_argument("--ir-cache",
+        help="Keep the IR of modules in this directory, modules whose source is unchanged are not generated again."
+    )
+    argparser.add_argument("--ir-cache-size",
+        type=int,
+        default=MAX_SIZE >> 20,
+        help="The size in MB the IR cache is kept under, the least recently used modules are removed first."
+    )
+    argparser.add_argument("--resolver-cache",
+        metavar="FILE",
+        help="Keep listings of the directories modules are searched in this file, those unmodified are not listed again."
+    )
+    argparser.add_argument("--import-graph",
+        metavar="FILE",
+        help="Scan the import statements of the entries and the modules they import before generating the IR, and store the import graph in FILE."
+    )
+    argparser.add_argument("--lazy",
+        action="store_true",
+        default=False,
+        help="Find and generate an imported module only when the point-to analysis reaches the import."
+    )
+    argparser.add_argument("--lazy-functions",
+        action="store_true",
+        default=False,
+        help="Generate the body of a function only when the point-to analysis reaches it."
+    )
+    argparser.add_argument("--incremental",
+        metavar="STATE",
+        help="Keep the solved state in this file. The next run only redoes what the modules changed since may affect."
+    )
+    argparser.add_argument("--summary",
+        help="Use the summary of library modules in this file instead of analyzing their source again."
+    )
+    argparser.add_argument("--build-summary",
+        metavar="FILE",
+        help="Analyze every code block of the modules given by -m and store their summary in FILE."
+    )
+    argparser.add_argument("--stats",
+        action="store_true",
+        default=False,
+        help="Print statistics of the point-to analysis when it is done."
+    )
 
     args = argparser.parse_args()
 
@@ -51,9 +172,64 @@ if __name__ == "__main__":
         print("Error: No entry point is provided.")
         exit()
 
+    if(args.build_summary and not args.modules):
+        print("Error: The modules to summarize should be given by -m.")
+        exit()
+
+    if((args.lazy or args.lazy_functions) and (args.context_sensitive or args.incremental or args.hvn or args.build_summary)):
+        print("Error: --lazy and --lazy-functions can not be used with -cs, --incremental, --hvn or --build-summary.")
+        exit()
+
+    if((args.time_budget is not None or args.memory_budget is not None) and (args.bdd or args.incremental or args.build_summary)):
+        print("Error: --time-budget and --memory-budget can not be used with --bdd, --incremental or --build-summary.")
+        exit()
+
+    if(args.widen is None and args.widen_kinds):
+        print("Error: --widen-kinds is an option of --widen.")
+        exit()
+
+    if(args.widen is not None and (args.bdd or args.incremental or args.build_summary)):
+        print("Error: --widen can not be used with --bdd, --incremental or --build-summary.")
+        exit()
+
+    if(args.heap != HEAP_SITE and (args.bdd or args.incremental or args.build_summary)):
+        print("Error: --heap can not be used with --bdd, --incremental or --build-summary, they keep builtin objects per site.")
+        exit()
+
+    if(args.selective and not args.context_sensitive):
+        print("Error: --selective is a mode of -cs.")
+        exit()
+
+    summary = None
+    if(args.summary):
+        if(args.context_sensitive or args.bdd or args.incremental):
+            print("Error: A summary can only be used by the default point-to analysis.")
+            exit()
+        try:
+            summary = Summary.load(args.summary)
+        except ValueError as e:
+            print(f"Error: {e}")
+            exit()
+
     fp = open(args.output, "w")
 
-    mm = ModuleManager(args.path, verbose=True, dependency=not args.no_dependency)
+    irCache = IRCache(args.ir_cache, args.ir_cache_size << 20) if args.ir_cache else None
+    mm = ModuleManager(args.path, verbose=True, maxDepth=0 if args.no_dependency else 9999, jobs=args.jobs, irCache=irCache, summary=summary, lazy=args.lazy, lazyFunctions=args.lazy_functions, resolver=ModuleResolver(args.resolver_cache))
+    stats = {}
+    if(args.import_graph):
+        # scripts are named like the module manager names entries
+        graph = mm.importGraph()
+        scripts = [file for file in os.listdir(args.path) if os.path.splitext(file)[1] == ".py"] if args.all_files else []
+        for i, file in enumerate(scripts + (args.files or [])):
+            graph.addFile(f'__main{i or ""}__', os.path.join(args.path, file))
+        for module in args.modules or []:
+            graph.addModule(module)
+        with open(args.import_graph, "w") as f:
+            json.dump(graph.export(), f, indent=4)
+        graphStats = graph.statistics()
+        stats |= graphStats
+        print(", ".join(f"{value} {key}" for key, value in graphStats.items()))
+
     try:
         if(args.all_files):
             for file in os.listdir(args.path):
@@ -65,7 +241,10 @@ if __name__ == "__main__":
                 mm.addEntry(file=file)
         if(args.modules):
             for module in args.modules:
-                mm.addEntry(module=module)
+                if(args.build_summary):
+                    mm.addLibrary(module)
+                else:
+                    mm.addEntry(module=module)
     except ModuleNotFoundException as e:
         print(f"Error: {e}")
         exit()
@@ -73,19 +252,53 @@ if __name__ == "__main__":
         print(f"Error: {e}")
         exit()
 
+    if(irCache):
+        stats |= irCache.statistics()
+    if(args.hvn):
+        equivalence = PointerEquivalence(mm.allCodeBlocks())
+        equivalence.start()
+        stats |= equivalence.statistics()
+
     print("IR generation is done, start Point-to Analysis...                ")
+    budget = None
+    if(args.time_budget is not None or args.memory_budget is not None):
+        budget = Budget(seconds=args.time_budget, rss=args.memory_budget << 20 if args.memory_budget is not None else None)
+    widening = Widening(args.widen, args.widen_kinds) if args.widen is not None else None
     if(args.context_sensitive):
-        analysis = csAnalysis(verbose=True)
+        analysis = csAnalysis(verbose=True, worklist=args.worklist, pointToSet=args.pts, budget=budget, widening=widening, heap=args.heap, k=args.context_depth, selective=args.selective)
+    elif(args.bdd):
+        analysis = BDDAnalysis(verbose=True, worklist=args.worklist)
+    elif(args.incremental):
+        analysis = IncrementalAnalysis(args.incremental, verbose=True, worklist=args.worklist, pointToSet=args.pts)
+    elif(args.callgraph_only):
+        analysis = CallGraphAnalysis(verbose=True, worklist=args.worklist, pointToSet=args.pts, budget=budget, widening=widening, heap=args.heap)
     else:
-        analysis = Analysis(verbose=True)
+        analysis = Analysis(verbose=True, worklist=args.worklist, pointToSet=args.pts, budget=budget, widening=widening, heap=args.heap)
 
-    entrys = mm.getEntrys()
+    if(summary):
+        summary.restore(analysis)
+    entrys = libraryEntrys(mm) if args.build_summary else mm.getEntrys()
     analysis.analyze(entrys)
+    if(args.build_summary):
+        Summary.build(mm, analysis).save(args.build_summary)
     print("Point-to Analysis is done, start writing to file                ")
+    # modules may be found while analyzing, if they are loaded lazily
+    mm.resolver.save()
+    if(args.stats):
+        stats |= mm.resolver.statistics()
+        stats |= analysis.statistics()
+        for key, value in stats.items():
+            print(f"{key:<20}{value}")
+        if(analysis.widening is not None):
+            for name, kinds in analysis.widening.report():
+                print(f"widened {name}: " + ", ".join(f"{count} {kind}" for kind, count in sorted(kinds.items())))
     
-    callgraph = analysis.callgraph.export()
+    callgraph = {caller:sorted(callees) for caller, callees in analysis.callgraph.items() if callees}
     if(args.include):
         callgraph = {k:v for k, v in callgraph.items() if k.startswith(args.include)} 
+    if(budget and analysis.degradations):
+        print(f"Over budget, the analysis had to {', '.join(analysis.degradations)}.")
+        callgraph["$degraded"] = analysis.degradations
     json.dump(callgraph, fp, indent=4)
     fp.close()
 
@@ -0,0 +1,53 @@
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from PyPt.ModuleManager import ModuleManager
+from PyPt.PTA.Analysis import Analysis
+from PyPt.PTA.BDDAnalysis import BDDAnalysis
+
+# Time and memory of the BDD analysis against the one with sets, on a generated program where many variables point to
+# the same objects, and on the programs given.
+# Retained is what the analysis holds once it is done, peak is the most allocated while solving,
+# the IR is generated before.
+# Usage: python -m test.BenchBDD [variables, 2000 by default] [objects, 200 by default] [path to a program with a main.py]...
+
+# objects classes are created into one variable, which is copied to the variables, half of them in a chain
+def generate(directory: str, variables: int, objects: int) -> str:
+    lines = [f"class C{i}:\n    pass" for i in range(objects)]
+    lines += [f"a = C{i}()" for i in range(objects)]
+    lines += [f"b{i} = a" for i in range(variables // 2)]
+    lines += ["c0 = a"] + [f"c{i} = c{i - 1}" for i in range(1, variables - variables // 2)]
+    with open(os.path.join(directory, "main.py"), "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return directory
+
+def measure(path: str, create) -> tuple:
+    moduleManager = ModuleManager(path, maxDepth=0)
+    moduleManager.addEntry(file="main.py")
+    entrys = moduleManager.getEntrys()
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    analysis = create()
+    analysis.analyze(entrys)
+    seconds = time.perf_counter() - start
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    edges = sum(len(callees) for callees in analysis.callgraph.values())
+    return seconds, retained, peak, edges
+
+if __name__ == "__main__":
+    variables = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    objects = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [generate(directory, variables, objects)] + sys.argv[3:]
+        for path in paths:
+            print(path)
+            for label, create in [("sets", lambda: Analysis(collapseCycles=False)), ("bdd", BDDAnalysis)]:
+                seconds, retained, peak, edges = measure(path, create)
+                print(f"{label:<6} {seconds:>8.2f} s {retained / 1024:>10.1f} KiB retained {peak / 1024:>10.1f} KiB peak {edges:>6} callgraph edges")
@@ -0,0 +1,48 @@
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+from PyPt.CSPTA.Analysis import Analysis as CSPTA
+from PyPt.ModuleManager import ModuleManager
+from PyPt.PTA.Analysis import Analysis as PTA
+
+# Time and memory of the context sensitive analysis against the context insensitive one on test/resources.
+# Memory is the peak allocated while solving, the IR is generated before.
+# Usage: python -m test.BenchCSPTA [largest k, 2 by default]
+
+def cases():
+    resourcePath = os.path.join(os.path.dirname(__file__), "resources")
+    for category in sorted(os.listdir(resourcePath)):
+        for case in sorted(os.listdir(os.path.join(resourcePath, category))):
+            path = os.path.join(resourcePath, category, case)
+            if(os.path.isdir(path)):
+                yield path
+
+def measure(create) -> tuple:
+    seconds, peak, edges, pointers = 0.0, 0, 0, 0
+    for path in cases():
+        moduleManager = ModuleManager(path)
+        moduleManager.addEntry(file="main.py")
+        entrys = moduleManager.getEntrys()
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        analysis = create()
+        analysis.analyze(entrys)
+        seconds += time.perf_counter() - start
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        edges += sum(len(callees) for callees in analysis.callgraph.values())
+        pointers += analysis.statistics()["pointers"]
+    return seconds, peak, edges, pointers
+
+if __name__ == "__main__":
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    # the first run pays for warming up the interpreter, it isn't measured
+    measure(PTA)
+    runs = [("ci", PTA)] + [(f"cs k={i}", lambda i=i: CSPTA(k=i)) for i in range(k + 1)]
+    for label, create in runs:
+        seconds, peak, edges, pointers = measure(create)
+        print(f"{label:<8} {seconds:>8.2f} s {peak / 1024:>10.1f} KiB peak {pointers:>8} pointers {edges:>6} callgraph edges")
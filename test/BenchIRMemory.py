@@ -0,0 +1,50 @@
+import gc
+import os
+import sys
+import tracemalloc
+
+from PyPt.ModuleManager import ModuleManager
+from PyPt.PointerEquivalence import allCodeBlocks
+
+# Memory taken by the IR: bytes still allocated after IR generation, per statement.
+# Usage: python -m test.BenchIRMemory [stdlib module, email.parser by default]
+
+def measure(build) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    moduleManager = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stmts = sum(len(codeBlock.stmts) for codeBlock in allCodeBlocks(moduleManager.allCodeBlocks()))
+    return size, stmts
+
+def resources():
+    resourcePath = os.path.join(os.path.dirname(__file__), "resources")
+    managers = []
+    for category in sorted(os.listdir(resourcePath)):
+        for case in sorted(os.listdir(os.path.join(resourcePath, category))):
+            moduleManager = ModuleManager(os.path.join(resourcePath, category, case))
+            moduleManager.addEntry(file="main.py")
+            managers.append(moduleManager)
+    return Corpus(managers)
+
+def package(name: str):
+    def build():
+        moduleManager = ModuleManager(maxDepth=1)
+        moduleManager.addEntry(module=name)
+        return moduleManager
+    return build
+
+class Corpus:
+    def __init__(self, managers):
+        self.managers = managers
+
+    def allCodeBlocks(self):
+        return [codeBlock for moduleManager in self.managers for codeBlock in moduleManager.allCodeBlocks()]
+
+if __name__ == "__main__":
+    name = sys.argv[1] if len(sys.argv) > 1 else "email.parser"
+    for label, build in (("test/resources", resources), (name, package(name))):
+        size, stmts = measure(build)
+        print(f"{label:<20} {stmts:>8} stmts {size / 1024:>10.1f} KiB {size / max(stmts, 1):>8.1f} bytes/stmt")
@@ -0,0 +1,46 @@
+import os
+from typing import Callable, Dict, Set
+import unittest
+
+from PyPt.ModuleManager import ModuleManager
+
+# Shared by the tests of options that only lose precision: their callgraph is compared with the full one, as sets of
+# callees, on every program of test/resources.
+
+def analyze(path: str, analysis) -> Dict[str, Set[str]]:
+    moduleManager = ModuleManager(path)
+    moduleManager.addEntry(file="main.py")
+    analysis.analyze(moduleManager.getEntrys())
+    return {k:set(v) for k, v in analysis.callgraph.items() if v}
+
+class PrecisionTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.maxDiff = None
+
+    # every edge of first is in second
+    def assertSubgraph(self, first: Dict[str, Set[str]], second: Dict[str, Set[str]]):
+        for caller, callees in first.items():
+            self.assertLessEqual(callees, second.get(caller, set()), caller)
+
+    def _test(self, path: str):
+        raise NotImplementedError
+
+# a class of base for each directory of test/resources, with a test calling _test for each program in it
+def addResourceTests(namespace: dict, base: type):
+    def getTest(path: str) -> Callable:
+        return lambda self: self._test(path)
+
+    resourcePath = os.path.join(os.path.dirname(__file__), "resources")
+    for item in os.listdir(resourcePath):
+        itemPath = os.path.join(resourcePath, item)
+        if(not os.path.isdir(itemPath)):
+            continue
+        clsName = "".join([s.capitalize() for s in item.split("_")])
+        attrs = {}
+        for subitem in os.listdir(itemPath):
+            subitemPath = os.path.join(itemPath, subitem)
+            if(not os.path.isdir(subitemPath)):
+                continue
+            attrName = "test" + "".join([s.capitalize() for s in subitem.split("_")])
+            attrs[attrName] = getTest(subitemPath)
+        namespace[clsName] = type(clsName, (base, ), attrs)
@@ -0,0 +1,61 @@
+import os
+import resource
+import unittest
+from unittest import mock
+
+from PyPt.CSPTA.Analysis import Analysis as CSPTA
+from PyPt.PTA.Analysis import Analysis as PTA
+from PyPt.PTA.Budget import DEGRADE_STOP, LADDER, Budget, currentRSS
+from test.Precision import PrecisionTest, addResourceTests, analyze
+
+# Degrading only loses precision, the callgraph keeps every edge until the analysis stops,
+# after that it only has edges of the full one.
+
+class TestBase(PrecisionTest):
+    def _test(self, path: str):
+        full = analyze(path, PTA())
+        self.assertEqual(analyze(path, PTA(budget=Budget(seconds=1e9))), full)
+
+        # every step but stopping is taken at the first check, every builtin object is widened,
+        # only the analysis with contexts has any to drop
+        for analysis, taken in ((PTA(budget=Budget(seconds=1e9, interval=1, steps=(0, 0, 0, 2))), LADDER[1:-1]),
+                                (CSPTA(budget=Budget(seconds=1e9, interval=1, steps=(0, 0, 0, 2)), k=2), LADDER[:-1])):
+            analysis.widenLimit = 0
+            self.assertSubgraph(full, analyze(path, analysis))
+            self.assertEqual(analysis.degradations, list(taken))
+
+        analysis = PTA(budget=Budget(seconds=0, interval=16))
+        self.assertSubgraph(analyze(path, analysis), full)
+        if(analysis.degradations):
+            self.assertEqual(analysis.degradations[-1], DEGRADE_STOP)
+
+# The budget is checked from the first entry on, a small run doesn't get through before it is looked at.
+class TestChecks(unittest.TestCase):
+    def testSmallBudget(self):
+        path = os.path.join(os.path.dirname(__file__), "resources", "import", "library_callback")
+        analysis = PTA(budget=Budget(seconds=0.0001))
+        analyze(path, analysis)
+        self.assertLess(analysis.workList.popped, 4096)
+        self.assertGreater(analysis.budget.checks, 0)
+        self.assertEqual(analysis.degradations[-1], DEGRADE_STOP)
+
+    def testFirstEntry(self):
+        path = os.path.join(os.path.dirname(__file__), "resources", "import", "library_callback")
+        analysis = PTA(budget=Budget(seconds=1e9))
+        analyze(path, analysis)
+        self.assertGreater(analysis.budget.checks, 0)
+        self.assertEqual(analysis.degradations, [])
+
+    # without /proc the peak from getrusage is used, it is in bytes on macOS and in KiB elsewhere
+    def testPeakRSS(self):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        with mock.patch("builtins.open", side_effect=OSError):
+            for platform, scale in (("darwin", 1), ("linux", 1024)):
+                with mock.patch("sys.platform", platform):
+                    self.assertGreaterEqual(currentRSS(), peak * scale, platform)
+                    self.assertLess(currentRSS(), (peak + 1024 * 1024) * scale, platform)
+
+
+if __name__ == "__main__":
+    addResourceTests(globals(), TestBase)
+    unittest.main(verbosity=1)
@@ -0,0 +1,121 @@
+import os
+import tempfile
+from typing import Dict, Set
+import unittest
+
+from PyPt.CSPTA.Analysis import Analysis as CSPTA
+from PyPt.ModuleManager import ModuleManager
+from PyPt.PTA.Analysis import Analysis as PTA
+
+# Without call sites in contexts the analysis is the context insensitive one,
+# with longer contexts the callgraph may only lose edges.
+# Giving contexts only to the functions Zipper selects is between the two.
+
+IDENTITY = '''
+def ident(x):
+    return x
+def f(): pass
+def g(): pass
+def box(x):
+    b = Box()
+    b.v = x
+    return b.v
+class Box: pass
+def call(fn):
+    fn()
+a = ident(f)
+b = ident(g)
+a()
+c = box(f)
+d = box(g)
+c()
+call(f)
+call(g)
+'''
+
+# the parameters of ident and other are in a cycle, both wrappers pass what they are called with
+SHARED_PARAMS = '''
+def ident(x):
+    other(x)
+    return x
+def other(y):
+    ident(y)
+    return y
+def wrapIdent(z):
+    return ident(z)
+def wrapOther(z):
+    return other(z)
+def f(): pass
+def g(): pass
+a = wrapIdent(f)
+b = wrapIdent(g)
+c = wrapOther(f)
+d = wrapOther(g)
+'''
+
+def analyze(path: str, analysis) -> Dict[str, Set[str]]:
+    moduleManager = ModuleManager(path)
+    moduleManager.addEntry(file="main.py")
+    analysis.analyze(moduleManager.getEntrys())
+    return {k:set(v) for k, v in analysis.callgraph.items() if v}
+
+class TestIdentity(unittest.TestCase):
+    def testCallSites(self):
+        with tempfile.TemporaryDirectory() as path:
+            with open(os.path.join(path, "main.py"), "w") as f:
+                f.write(IDENTITY)
+            self.assertIn("__main__.g", analyze(path, PTA())["__main__"])
+            expected = {"__main__.ident", "__main__.box", "__main__.Box", "__main__.call", "__main__.f"}
+            self.assertEqual(analyze(path, CSPTA(k=1))["__main__"], expected)
+            selective = CSPTA(k=1, selective=True)
+            self.assertEqual(analyze(path, selective)["__main__"], expected)
+            self.assertEqual(selective.selected, {codeBlock for codeBlock, func in selective.zipper.functions.items() if func.readable_name in ("__main__.ident", "__main__.box")})
+
+    def testSharedParams(self):
+        with tempfile.TemporaryDirectory() as path:
+            with open(os.path.join(path, "main.py"), "w") as f:
+                f.write(SHARED_PARAMS)
+            selective = CSPTA(k=1, selective=True)
+            analyze(path, selective)
+            selected = {func.readable_name for codeBlock, func in selective.zipper.functions.items() if codeBlock in selective.selected}
+            self.assertLessEqual({"__main__.wrapIdent", "__main__.wrapOther"}, selected)
+
+class TestBase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.maxDiff = None
+
+    def assertSubgraph(self, first: Dict[str, Set[str]], second: Dict[str, Set[str]]):
+        for caller, callees in first.items():
+            self.assertLessEqual(callees, second.get(caller, set()), caller)
+
+    def _test(self, path: str):
+        ci = analyze(path, PTA())
+        self.assertEqual(analyze(path, CSPTA(k=0)), ci)
+        k1 = analyze(path, CSPTA(k=1))
+        self.assertSubgraph(k1, ci)
+        k2 = analyze(path, CSPTA(k=2))
+        self.assertSubgraph(k2, k1)
+        selective = analyze(path, CSPTA(k=2, selective=True))
+        self.assertSubgraph(selective, ci)
+        self.assertSubgraph(k2, selective)
+
+
+if __name__ == "__main__":
+    def getCSTest(path):
+        return lambda self: self._test(path)
+
+    resourcePath = os.path.join(os.path.dirname(__file__), "resources")
+    for item in os.listdir(resourcePath):
+        itemPath = os.path.join(resourcePath, item)
+        if(not os.path.isdir(itemPath)):
+            continue
+        clsName = "".join([s.capitalize() for s in item.split("_")])
+        attrs = {}
+        for subitem in os.listdir(itemPath):
+            subitemPath = os.path.join(itemPath, subitem)
+            if(not os.path.isdir(subitemPath)):
+                continue
+            attrName = "test" + "".join([s.capitalize() for s in subitem.split("_")])
+            attrs[attrName] = getCSTest(subitemPath)
+        globals()[clsName] = type(clsName, (TestBase, ), attrs)
+    unittest.main(verbosity=1)
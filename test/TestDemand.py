@@ -0,0 +1,80 @@
+import os
+from typing import Dict, List, Tuple
+import unittest
+
+from PyPt.PTA.Analysis import Analysis as PTA
+from PyPt.PTA.Budget import Budget
+from PyPt.PTA.DemandAnalysis import DemandAnalysis
+from PyPt.PTA.IncrementalAnalysis import programModules
+from PyPt.PTA.Pointers import VarPtr
+
+from PyPt.IR.IRStmts import Call, Variable
+from PyPt.ModuleManager import ModuleManager
+from PyPt.PointerEquivalence import usedVariables
+
+# A query should answer what the whole program says the variable points to.
+# Every query gets its own analysis for the callees of calls, so that what other queries demanded doesn't help it,
+# and one analysis answers every variable in turn.
+
+def variables(path: str) -> Tuple[List, Dict[str, Variable], List[str]]:
+    moduleManager = ModuleManager(path)
+    moduleManager.addEntry(file="main.py")
+    entrys = moduleManager.getEntrys()
+    vars, callees = {}, []
+    for codeBlocks in programModules(entrys).values():
+        for codeBlock in codeBlocks:
+            for stmt in codeBlock.stmts:
+                for var in usedVariables(stmt):
+                    if(var is not None):
+                        vars[var.id] = var
+                if(isinstance(stmt, Call)):
+                    callees.append(stmt.callee.id)
+    return entrys, vars, callees
+
+def ids(objs) -> List[str]:
+    return sorted(obj.id for obj in objs)
+
+class TestBase(unittest.TestCase):
+    def _test(self, path: str):
+        entrys, vars, callees = variables(path)
+        analysis = PTA()
+        analysis.analyze(entrys)
+        expected = {id: ids(analysis.pointToSet.get(analysis.pointerFlow.find(VarPtr.create(var)))) for id, var in vars.items()}
+
+        entrys, vars, _ = variables(path)
+        for id in callees:
+            self.assertEqual(ids(DemandAnalysis(entrys).query(vars[id])), expected[id], id)
+        demand = DemandAnalysis(entrys)
+        for id, var in vars.items():
+            self.assertEqual(ids(demand.query(var)), expected[id], id)
+
+        # a query over maxStmts gives up, the next one carries on
+        if(callees):
+            demand = DemandAnalysis(entrys, maxStmts=0)
+            if(demand.query(vars[callees[-1]]) is None):
+                demand.maxStmts = None
+                self.assertEqual(ids(demand.query(vars[callees[-1]])), expected[callees[-1]])
+            # a limit that isn't reached answers like no limit, with or without a time budget
+            for demand in (DemandAnalysis(entrys, maxStmts=100000), DemandAnalysis(entrys, maxStmts=100000, budget=Budget(seconds=1e9))):
+                self.assertEqual(ids(demand.query(vars[callees[-1]])), expected[callees[-1]])
+
+
+if __name__ == "__main__":
+    def getDemandTest(path):
+        return lambda self: self._test(path)
+
+    resourcePath = os.path.join(os.path.dirname(__file__), "resources")
+    for item in os.listdir(resourcePath):
+        itemPath = os.path.join(resourcePath, item)
+        if(not os.path.isdir(itemPath)):
+            continue
+        clsName = "".join([s.capitalize() for s in item.split("_")])
+        attrs = {}
+        for subitem in os.listdir(itemPath):
+            subitemPath = os.path.join(itemPath, subitem)
+            if(not os.path.isdir(subitemPath)):
+                continue
+            attrName = "test" + "".join([s.capitalize() for s in subitem.split("_")])
+            attrs[attrName] = getDemandTest(subitemPath)
+        globals()[clsName] = type(clsName, (TestBase, ), attrs)
+    unittest.main(verbosity=1)
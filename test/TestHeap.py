@@ -0,0 +1,35 @@
+from typing import Set
+import unittest
+
+from PyPt.CSPTA.Analysis import Analysis as CSPTA
+from PyPt.PTA.Analysis import Analysis as PTA
+from PyPt.PTA.Objects import HEAP_BLOCK, HEAP_SITE, HEAP_TYPE, BuiltinObject
+from test.Precision import PrecisionTest, addResourceTests, analyze
+
+# Merging builtin objects only loses precision, the coarser the heap abstraction the more edges the callgraph has.
+# Objects other than builtin ones are kept per allocation site.
+
+def objects(analysis, builtin: bool) -> Set[str]:
+    return {obj.id for obj in analysis.objectPool.pool.values() if isinstance(obj, BuiltinObject) == builtin}
+
+class TestBase(PrecisionTest):
+    def _test(self, path: str):
+        site = PTA()
+        callgraphs = {HEAP_SITE: analyze(path, site)}
+        for heap in (HEAP_BLOCK, HEAP_TYPE):
+            analysis = PTA(heap=heap)
+            callgraphs[heap] = analyze(path, analysis)
+            self.assertLessEqual(objects(analysis, False), objects(site, False))
+            self.assertLessEqual(len(objects(analysis, True)), len(objects(site, True)))
+            for obj in analysis.objectPool.pool.values():
+                if(isinstance(obj, BuiltinObject)):
+                    self.assertTrue(obj.id.endswith(f"${obj.type})"), obj.id)
+
+        self.assertSubgraph(callgraphs[HEAP_SITE], callgraphs[HEAP_BLOCK])
+        self.assertSubgraph(callgraphs[HEAP_BLOCK], callgraphs[HEAP_TYPE])
+        self.assertSubgraph(analyze(path, CSPTA(k=2)), analyze(path, CSPTA(heap=HEAP_TYPE, k=2)))
+
+
+if __name__ == "__main__":
+    addResourceTests(globals(), TestBase)
+    unittest.main(verbosity=1)
@@ -0,0 +1,65 @@
+import os
+import unittest
+
+from PyPt.ImportGraph import scanImports
+from PyPt.ModuleManager import ModuleManager
+
+# The graph scanned from the entry should have every module the module manager generates, and tell who imports them.
+
+SOURCE = b'''
+import a.b as c, d
+from . import e
+from ..f import (g,  # comment
+    h as i)
+from j import \\
+    k
+if x:
+    from l.m import *
+import n; import o
+'''
+
+class TestScan(unittest.TestCase):
+    def testScan(self):
+        self.assertEqual(scanImports(SOURCE), [
+            (0, "a.b", None), (0, "d", None),
+            (1, "", ["e"]),
+            (2, "f", ["g", "h"]),
+            (0, "j", ["k"]),
+            (0, "l.m", ["*"]),
+            (0, "n", None),
+        ])
+
+class TestBase(unittest.TestCase):
+    def _test(self, path: str):
+        moduleManager = ModuleManager(path)
+        moduleManager.addEntry(file="main.py")
+        graph = moduleManager.importGraph()
+        graph.addFile("__main__", os.path.join(path, "main.py"))
+        generated = {name for name, m in moduleManager.modules.items() if m.__codeBlock__ is not None}
+        self.assertLessEqual(generated, set(graph.files))
+        # a module is in the component of what it imports, or after it
+        order = {name: i for i, component in enumerate(graph.components()) for name in component}
+        for name, imported in graph.imports.items():
+            for other in imported:
+                self.assertLessEqual(order[other], order[name])
+
+
+if __name__ == "__main__":
+    def getGraphTest(path):
+        return lambda self: self._test(path)
+
+    resourcePath = os.path.join(os.path.dirname(__file__), "resources")
+    for item in os.listdir(resourcePath):
+        itemPath = os.path.join(resourcePath, item)
+        if(not os.path.isdir(itemPath)):
+            continue
+        clsName = "".join([s.capitalize() for s in item.split("_")])
+        attrs = {}
+        for subitem in os.listdir(itemPath):
+            subitemPath = os.path.join(itemPath, subitem)
+            if(not os.path.isdir(subitemPath)):
+                continue
+            attrName = "test" + "".join([s.capitalize() for s in subitem.split("_")])
+            attrs[attrName] = getGraphTest(subitemPath)
+        globals()[clsName] = type(clsName, (TestBase, ), attrs)
+    unittest.main(verbosity=1)
@@ -0,0 +1,87 @@
+import ast
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Tuple
+import unittest
+
+from PyPt.PTA.Analysis import Analysis as PTA
+from PyPt.PTA.IncrementalAnalysis import IncrementalAnalysis
+
+from PyPt.ModuleManager import ModuleManager
+
+# Differential test: after every edit, the incremental analysis should produce
+# the same point-to sets and callgraph as analyzing the edited program from scratch.
+# Edits remove one top-level statement of one file, and put it back in the next run.
+
+def result(analysis: PTA) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    pts = analysis.pointToSet
+    pointToSet = {ptr.id: sorted(obj.id for obj in pts.get(ptr)) for ptr in pts.allPointers() if pts.get(ptr)}
+    callgraph = {k:sorted(v) for k, v in analysis.callgraph.items() if v}
+    return pointToSet, callgraph
+
+def analyze(path: str, analysis: PTA):
+    moduleManager = ModuleManager(path)
+    moduleManager.addEntry(file="main.py")
+    analysis.analyze(moduleManager.getEntrys())
+    return result(analysis)
+
+# (file, source without one of its top-level statements)
+def edits(path: str) -> List[Tuple[str, str]]:
+    edits = []
+    for root, _, files in os.walk(path):
+        for file in sorted(files):
+            if(not file.endswith(".py")):
+                continue
+            file = os.path.join(root, file)
+            with open(file, "r") as f:
+                tree = ast.parse(f.read())
+            body = tree.body
+            for i in range(len(body)):
+                tree.body = body[:i] + body[i + 1:]
+                edits.append((file, ast.unparse(tree)))
+    return edits
+
+class TestBase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.maxDiff = None
+
+    def _test(self, path: str):
+        with tempfile.TemporaryDirectory(prefix="pypt-inc-") as tmp:
+            work = os.path.join(tmp, "case")
+            shutil.copytree(path, work)
+            state = os.path.join(tmp, "state")
+            self.assertEqual(analyze(work, IncrementalAnalysis(state)), analyze(work, PTA()))
+            # unchanged
+            analysis = IncrementalAnalysis(state)
+            self.assertEqual(analyze(work, analysis), analyze(work, PTA()))
+            self.assertEqual(analysis.changedModules, set())
+
+            for file, edited in edits(work):
+                with open(file, "r") as f:
+                    original = f.read()
+                for source in (edited, original):
+                    with open(file, "w") as f:
+                        f.write(source)
+                    self.assertEqual(analyze(work, IncrementalAnalysis(state)), analyze(work, PTA()), f"{file}:\n{source}")
+
+
+if __name__ == "__main__":
+    def getIncrementalTest(path):
+        return lambda self: self._test(path)
+
+    resourcePath = os.path.join(os.path.dirname(__file__), "resources")
+    for item in os.listdir(resourcePath):
+        itemPath = os.path.join(resourcePath, item)
+        if(not os.path.isdir(itemPath)):
+            continue
+        clsName = "".join([s.capitalize() for s in item.split("_")])
+        attrs = {}
+        for subitem in os.listdir(itemPath):
+            subitemPath = os.path.join(itemPath, subitem)
+            if(not os.path.isdir(subitemPath)):
+                continue
+            attrName = "test" + "".join([s.capitalize() for s in subitem.split("_")])
+            attrs[attrName] = getIncrementalTest(subitemPath)
+        globals()[clsName] = type(clsName, (TestBase, ), attrs)
+    unittest.main(verbosity=1)
@@ -0,0 +1,196 @@
+import gc
+import os
+import tempfile
+from typing import Dict, List
+import unittest
+from unittest import mock
+
+from PyPt.PTA.Analysis import Analysis as PTA
+from PyPt.PTA.BDDAnalysis import BDDAnalysis
+from PyPt.PTA.CallGraphAnalysis import CallGraphAnalysis
+from PyPt.PTA.CompactSets import ArraySet, BitSet, HybridSet
+
+from PyPt.IR.IRStmts import allStmts, getStmt
+from PyPt.IRCache import IRCache
+from PyPt.ModuleManager import ModuleManager
+from PyPt.PointerEquivalence import PointerEquivalence
+
+# Every mode of the analysis should produce the same callgraph as the default one.
+MODES = {
+    "Lifo":                 {"worklist": "lifo"},
+    "Priority":             {"worklist": "priority"},
+    "Topological":          {"worklist": "topological"},
+    "NoCycleCollapse":      {"collapseCycles": False},
+    "Hvn":                  {"hvn": True},
+    "Bitset":               {"pointToSet": "bitset"},
+    "Array":                {"pointToSet": "array"},
+    "Hybrid":               {"pointToSet": "hybrid"},
+    "Shared":               {"pointToSet": "shared"},
+    "Bdd":                  {"bdd": True},
+    "Jobs":                 {"jobs": 2},
+    "IrCache":              {"irCache": True},
+    "IrCacheJobs":          {"irCache": True, "jobs": 2},
+    "Lazy":                 {"lazy": True},
+    "LazyJobs":             {"lazy": True, "jobs": 2},
+    "LazyFunctions":        {"lazyFunctions": True},
+    "LazyModulesFunctions": {"lazy": True, "lazyFunctions": True},
+    "CallGraphOnly":        {"callGraphOnly": True},
+    "CallGraphOnlyLazy":    {"callGraphOnly": True, "lazy": True, "lazyFunctions": True},
+}
+
+# made for the modes with an IR cache when the module's tests start, removed when they end
+IR_CACHE = None
+
+def setUpModule():
+    global IR_CACHE
+    IR_CACHE = tempfile.TemporaryDirectory(prefix="pypt-ir-")
+
+def tearDownModule():
+    IR_CACHE.cleanup()
+
+def analyze(path: str, hvn=False, bdd=False, jobs=1, irCache=False, lazy=False, lazyFunctions=False, callGraphOnly=False, **options) -> Dict[str, List[str]]:
+    cache = None
+    if(irCache):
+        # the first run fills the cache, the callgraph comes from modules read from it
+        cache = IRCache(IR_CACHE.name)
+        ModuleManager(path, jobs=jobs, irCache=cache).addEntry(file="main.py")
+        misses = cache.misses
+    moduleManager = ModuleManager(path, jobs=jobs, irCache=cache, lazy=lazy, lazyFunctions=lazyFunctions)
+    moduleManager.addEntry(file="main.py")
+    if(irCache):
+        assert(cache.misses == misses)
+    if(hvn):
+        PointerEquivalence(moduleManager.allCodeBlocks()).start()
+    if(bdd):
+        analysis = BDDAnalysis(**options)
+    elif(callGraphOnly):
+        analysis = CallGraphAnalysis(**options)
+    else:
+        analysis = PTA(**options)
+    analysis.analyze(moduleManager.getEntrys())
+    return {k:sorted(v) for k, v in analysis.callgraph.items() if v}
+
+class TestBase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.maxDiff = None
+
+    def _test(self, options: dict, path: str):
+        self.assertEqual(analyze(path, **options), analyze(path))
+
+# Every analysis numbers its pointers and objects from 0, running one doesn't grow those run after it.
+class TestRepeated(unittest.TestCase):
+    def testSymbols(self):
+        path = os.path.join(os.path.dirname(__file__), "resources", "import", "library_callback")
+        sizes = []
+        for _ in range(3):
+            moduleManager = ModuleManager(path)
+            moduleManager.addEntry(file="main.py")
+            analysis = PTA(pointToSet="bitset")
+            analysis.analyze(moduleManager.getEntrys())
+            sizes.append((len(analysis.symbols.pointers), len(analysis.symbols.objects), analysis.pointToSet.statistics()["point-to bytes"]))
+        self.assertEqual(sizes, sizes[:1] * 3)
+
+# Stmts can be looked up by their uids while their modules are, but aren't kept by it.
+class TestStmtLookup(unittest.TestCase):
+    def testWeak(self):
+        path = os.path.join(os.path.dirname(__file__), "resources", "import", "library_callback")
+        moduleManager = ModuleManager(path)
+        moduleManager.addEntry(file="main.py")
+        stmts = [stmt for codeBlock in moduleManager.allCodeBlocks() for stmt in codeBlock.stmts]
+        for stmt in stmts:
+            self.assertIs(getStmt(stmt.uid), stmt)
+        uids = [stmt.uid for stmt in stmts]
+        del moduleManager, stmts, stmt
+        gc.collect()
+        self.assertFalse(any(uid in allStmts for uid in uids))
+
+# Modules whose imports the scanner mispredicts are linked with what their generators asked instead.
+class TestMispredicted(unittest.TestCase):
+    def testReplayed(self):
+        path = os.path.join(os.path.dirname(__file__), "resources", "import", "library_callback")
+        # nothing is prefetched, so every module is scanned
+        with mock.patch("PyPt.ModuleManager.ImportScanner.scan", return_value=[]), \
+                mock.patch("PyPt.ModuleManager.ModuleManager.prefetch"):
+            callgraph = analyze(path, jobs=2)
+        self.assertEqual(callgraph, analyze(path))
+
+# Collecting the shared set table often drops nothing pointers refer to.
+class TestSharedCollect(unittest.TestCase):
+    def testCollect(self):
+        path = os.path.join(os.path.dirname(__file__), "resources", "assignment", "recursive_tuple")
+        with mock.patch("PyPt.PTA.PointToSet.COLLECT_THRESHOLD", 1):
+            moduleManager = ModuleManager(path)
+            moduleManager.addEntry(file="main.py")
+            analysis = PTA(pointToSet="shared")
+            analysis.analyze(moduleManager.getEntrys())
+        self.assertGreater(analysis.pointToSet.table.collections, 0)
+        self.assertEqual({k:sorted(v) for k, v in analysis.callgraph.items() if v}, analyze(path))
+
+# What is new to a compact set is a compact set of the same kind, whatever order objects come in.
+class TestCompactSets(unittest.TestCase):
+    class Indexed:
+        def __init__(self, index: int):
+            self.index = index
+
+    def testDelta(self):
+        objs = [self.Indexed(i) for i in (9, 2, 5, 2)]
+        for setType in (BitSet, ArraySet, HybridSet):
+            s = setType()
+            s.addAll(objs[2:3])
+            delta = s.addAll(objs)
+            self.assertEqual(sorted(delta.indices()), [2, 9], setType)
+            for index in (2, 9):
+                self.assertTrue(delta.contains(index), setType)
+            self.assertFalse(delta.contains(5), setType)
+            self.assertEqual(list(s.indices()), [2, 5, 9], setType)
+
+    def testHybridEqual(self):
+        objs = [self.Indexed(1), self.Indexed(3)]
+        small, bits = HybridSet(), HybridSet()
+        small.addAll(objs)
+        bits.impl = BitSet()
+        bits.addAll(objs)
+        self.assertEqual(bits, small)
+        self.assertEqual(small, bits)
+        bits.addAll([self.Indexed(4)])
+        self.assertNotEqual(bits, small)
+
+# Merged pointers of the BDD relation all point to the union, each gains what it didn't have.
+class TestBDDMerge(unittest.TestCase):
+    def testMerge(self):
+        path = os.path.join(os.path.dirname(__file__), "resources", "import", "library_callback")
+        moduleManager = ModuleManager(path)
+        moduleManager.addEntry(file="main.py")
+        analysis = BDDAnalysis()
+        analysis.analyze(moduleManager.getEntrys())
+        pts = analysis.pointToSet
+        pointers = sorted(pts.allPointers(), key=lambda ptr: len(pts.get(ptr)))[-3:]
+        before = {ptr: set(pts.get(ptr)) for ptr in pointers}
+        union = set().union(*before.values())
+        deltas = pts.merge(pointers[0], pointers[1:])
+        self.assertEqual({ptr: set(objs) for ptr, objs in deltas.items()}, {ptr: union - before[ptr] for ptr in pointers[1:]})
+        for ptr in pointers:
+            self.assertEqual(set(pts.get(ptr)), union)
+
+
+
+if __name__ == "__main__":
+    def getModeTest(options, path):
+        return lambda self: self._test(options, path)
+
+    resourcePath = os.path.join(os.path.dirname(__file__), "resources")
+    for mode, options in MODES.items():
+        attrs = {}
+        for item in os.listdir(resourcePath):
+            itemPath = os.path.join(resourcePath, item)
+            if(not os.path.isdir(itemPath)):
+                continue
+            for subitem in os.listdir(itemPath):
+                subitemPath = os.path.join(itemPath, subitem)
+                if(not os.path.isdir(subitemPath)):
+                    continue
+                attrName = "test" + "".join([s.capitalize() for s in f"{item}_{subitem}".split("_")])
+                attrs[attrName] = getModeTest(options, subitemPath)
+        clsName = mode + "Mode"
+        globals()[clsName] = type(clsName, (TestBase, ), attrs)
+    unittest.main(verbosity=1)
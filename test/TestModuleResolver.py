@@ -0,0 +1,75 @@
+import os
+import sys
+import tempfile
+import unittest
+
+from PyPt.ModuleResolver import ModuleResolver, _find_module
+
+# The resolver should find what the path finder of importlib finds, for modules that exist and those that don't.
+
+def find(finder, name, path):
+    try:
+        fp, pathname, stuff = finder(name, path)
+    except ImportError:
+        return None
+    if(fp):
+        fp.close()
+    return pathname, stuff
+
+def names(path):
+    names = set()
+    for directory in path:
+        try:
+            entries = os.listdir(directory)
+        except OSError:
+            continue
+        names.update(entry.partition(".")[0] for entry in entries)
+    return sorted(names) + ["__init__", "no_such_module"]
+
+class TestModuleResolver(unittest.TestCase):
+    def _test(self, path):
+        resolver = ModuleResolver()
+        for name in names(path):
+            self.assertEqual(find(resolver.find_module, name, path), find(_find_module, name, path), name)
+
+    def testStdlib(self):
+        self._test([os.path.dirname(os.__file__)])
+
+    def testSysPath(self):
+        self._test(sys.path[1:])
+
+    def testResources(self):
+        resourcePath = os.path.join(os.path.dirname(__file__), "resources")
+        for item in os.listdir(resourcePath):
+            itemPath = os.path.join(resourcePath, item)
+            if(os.path.isdir(itemPath)):
+                for subitem in os.listdir(itemPath):
+                    self._test([os.path.join(itemPath, subitem)])
+
+    def testSaved(self):
+        with tempfile.TemporaryDirectory(prefix="pypt-resolver-") as tmp:
+            work = os.path.join(tmp, "work")
+            os.makedirs(os.path.join(work, "pkg"))
+            for file in ("mod.py", os.path.join("pkg", "__init__.py")):
+                open(os.path.join(work, file), "w").close()
+            file = os.path.join(tmp, "listings")
+            resolver = ModuleResolver(file)
+            self.assertEqual(find(resolver.find_module, "pkg", [work]), find(_find_module, "pkg", [work]))
+            resolver.save()
+
+            # unchanged directories are not listed again
+            resolver = ModuleResolver(file)
+            self.assertEqual(find(resolver.find_module, "mod", [work]), find(_find_module, "mod", [work]))
+            self.assertEqual((resolver.listed, resolver.reused), (0, 1))
+            resolver.save()
+
+            # a module added since is found
+            open(os.path.join(work, "added.py"), "w").close()
+            os.utime(work, ns=(0, 0))
+            resolver = ModuleResolver(file)
+            self.assertEqual(find(resolver.find_module, "added", [work]), find(_find_module, "added", [work]))
+            self.assertEqual(resolver.listed, 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=1)
@@ -44,7 +44,7 @@ class Test:
         entrys = moduleManager.getEntrys()
         analysis = analysisType()
         analysis.analyze(entrys)
-        output = analysis.callgraph.export()
+        output = analysis.callgraph
 
         # get expected output
         expectedPath = os.path.join(path, "callgraph.json")
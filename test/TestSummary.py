@@ -0,0 +1,98 @@
+import os
+import tempfile
+from typing import Dict, List, Tuple
+import unittest
+
+from PyPt.PTA.Analysis import Analysis as PTA
+from PyPt.PTA.Budget import Budget
+
+from PyPt.ModuleManager import ModuleManager
+from PyPt.PointerEquivalence import allCodeBlocks
+from PyPt.Summary import Summary, libraryEntrys
+from test.TestIncremental import result
+
+# The modules a script imports are summarized first, then the script is analyzed with the summary.
+# A summary treats every code block of the library as reachable,
+# so the result should be that of analyzing the script from scratch along with every code block of its modules.
+
+def library(path: str) -> List[str]:
+    moduleManager = ModuleManager(path)
+    moduleManager.addEntry(file="main.py")
+    # in the order they are imported, so that submodules are bound to packages in the same order
+    return [name for name in moduleManager.modules if not name.startswith("__main")]
+
+def summarize(path: str, modules: List[str], file: str):
+    moduleManager = ModuleManager(path)
+    for module in modules:
+        moduleManager.addLibrary(module)
+    analysis = PTA()
+    analysis.analyze(libraryEntrys(moduleManager))
+    Summary.build(moduleManager, analysis).save(file)
+
+def analyzeWithSummary(path: str, file: str, **options) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    summary = Summary.load(file)
+    moduleManager = ModuleManager(path, summary=summary, **options)
+    moduleManager.addEntry(file="main.py")
+    analysis = PTA()
+    summary.restore(analysis)
+    analysis.analyze(moduleManager.getEntrys())
+    return result(analysis)
+
+def analyzeFromScratch(path: str) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    moduleManager = ModuleManager(path)
+    moduleManager.addEntry(file="main.py")
+    entrys = moduleManager.getEntrys()
+    modules = [m.__codeBlock__ for name, m in moduleManager.modules.items() if not name.startswith("__main")]
+    analysis = PTA()
+    analysis.analyze(entrys + allCodeBlocks(modules))
+    return result(analysis)
+
+# A summary of an analysis over its budget would be taken as the whole library.
+class TestDegraded(unittest.TestCase):
+    def testRefused(self):
+        path = os.path.join(os.path.dirname(__file__), "resources", "import", "library_callback")
+        moduleManager = ModuleManager(path)
+        for module in library(path):
+            moduleManager.addLibrary(module)
+        analysis = PTA(budget=Budget(seconds=1e9, interval=1, steps=(0, 0, 0, 2)))
+        analysis.analyze(libraryEntrys(moduleManager))
+        self.assertTrue(analysis.degradations)
+        with self.assertRaises(ValueError):
+            Summary.build(moduleManager, analysis)
+
+class TestBase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.maxDiff = None
+
+    def _test(self, path: str):
+        modules = library(path)
+        if(not modules):
+            return
+        with tempfile.TemporaryDirectory(prefix="pypt-summary-") as tmp:
+            file = os.path.join(tmp, "summary")
+            summarize(path, modules, file)
+            expected = analyzeFromScratch(path)
+            self.assertEqual(analyzeWithSummary(path, file), expected)
+            # modules generated in workers star import at the end, so their temporaries are numbered otherwise
+            self.assertEqual(analyzeWithSummary(path, file, jobs=2)[1], expected[1])
+
+
+if __name__ == "__main__":
+    def getSummaryTest(path):
+        return lambda self: self._test(path)
+
+    resourcePath = os.path.join(os.path.dirname(__file__), "resources")
+    for item in os.listdir(resourcePath):
+        itemPath = os.path.join(resourcePath, item)
+        if(not os.path.isdir(itemPath)):
+            continue
+        clsName = "".join([s.capitalize() for s in item.split("_")])
+        attrs = {}
+        for subitem in os.listdir(itemPath):
+            subitemPath = os.path.join(itemPath, subitem)
+            if(not os.path.isdir(subitemPath)):
+                continue
+            attrName = "test" + "".join([s.capitalize() for s in subitem.split("_")])
+            attrs[attrName] = getSummaryTest(subitemPath)
+        globals()[clsName] = type(clsName, (TestBase, ), attrs)
+    unittest.main(verbosity=1)
@@ -0,0 +1,32 @@
+import unittest
+
+from PyPt.CSPTA.Analysis import Analysis as CSPTA
+from PyPt.PTA.Analysis import Analysis as PTA
+from PyPt.PTA.Objects import BuiltinObject
+from PyPt.PTA.Widening import Widening, isSummary
+from test.Precision import PrecisionTest, addResourceTests, analyze
+
+# Widening only loses precision, the callgraph keeps every edge.
+# Only builtin objects of the kinds given are widened, each into the summary of its own kind.
+
+class TestBase(PrecisionTest):
+    def _test(self, path: str):
+        full = analyze(path, PTA())
+        self.assertEqual(analyze(path, PTA(widening=Widening(1 << 30))), full)
+
+        for analysis in (PTA(widening=Widening(0)), PTA(widening=Widening(1, ["list", "dict"])), CSPTA(widening=Widening(0), k=2)):
+            self.assertSubgraph(full, analyze(path, analysis))
+            kinds = analysis.widening.kinds
+            for obj, summary in analysis.widened.items():
+                self.assertIsInstance(obj, BuiltinObject)
+                self.assertTrue(isSummary(summary))
+                self.assertEqual(summary.type, obj.type or "builtin")
+                if(kinds is not None):
+                    self.assertIn(obj.type, kinds)
+            replaced = sum(sum(kinds.values()) for _, kinds in analysis.widening.report())
+            self.assertGreaterEqual(replaced, len(analysis.widened))
+
+
+if __name__ == "__main__":
+    addResourceTests(globals(), TestBase)
+    unittest.main(verbosity=1)
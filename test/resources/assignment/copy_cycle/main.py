@@ -0,0 +1,19 @@
+class A:
+    def m(self):
+        pass
+
+def f(x, n):
+    if n:
+        return g(x, n)
+    return x
+
+def g(y, n):
+    return f(y, n)
+
+a = A()
+b = a
+while True:
+    c = b
+    b = c
+r = f(b, 1)
+r.m()
@@ -0,0 +1,12 @@
+import pkg
+
+def load():
+    import pkg.sub
+    return pkg.sub.make()
+
+def unused():
+    import unused_module
+    unused_module.run()
+
+obj = load()
+obj.method()
@@ -0,0 +1,6 @@
+class Made:
+    def method(self):
+        pass
+
+def make():
+    return Made()
@@ -0,0 +1,16 @@
+from module import register, run, apply, Base
+
+def handler():
+    pass
+
+def identity(x):
+    return x
+
+class Derived(Base):
+    def hook(self):
+        pass
+
+register(handler)
+run()
+apply(identity, handler)
+Derived().template()
@@ -0,0 +1,18 @@
+registered = None
+
+def register(handler):
+    global registered
+    registered = handler
+
+def run():
+    return registered()
+
+def apply(func, arg):
+    return func(arg)
+
+class Base:
+    def template(self):
+        return self.hook()
+
+    def hook(self):
+        pass
@@ -0,0 +1,8 @@
+r = object.__repr__
+
+class A(object):
+    def m(self):
+        pass
+
+a = A()
+a.m()